@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks of the emission calculators and /api/compute_ghg_emissions.
+
+Runs in-process (no server needed) against the reference data in
+backend/data. Activity rows are generated from the fuel and freight
+combinations that resolve to an emission factor in the loaded reference
+tables, as fuel-only, freight-only and mixed workloads, and each size is
+timed through:
+- Co2FossilFuelCalculator.calculate_co2_emissions
+- Ch4Calculator.calculate_ch4_emissions
+- GhgEmissionsEngine.calculate (all gases in one pass)
+- POST /api/compute_ghg_emissions through the Flask test client (JSON parse
+  to serialized response; the result cache is disabled)
+
+Results are written as JSON and compared with a baseline file, if present.
+Timings depend on the machine, so the baseline is not committed: record one
+with --save-baseline on the machine that runs the comparison. A benchmark whose throughput (rows per CPU second of the best run) dropped by
+more than --tolerance is reported as a regression and the script exits with
+status 1.
+
+Usage:
+    python run_benchmarks.py                                  # 1k, 10k, 100k and 1M rows
+    python run_benchmarks.py --sizes 1k,10k --workloads mixed # quick run
+    python run_benchmarks.py --save-baseline                  # store the results as the new baseline
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+# Add the backend directory to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_path = os.path.join(script_dir, '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Components.resolved_emission_factors import Resolved_Emission_Factors
+    from Services.Co2FossilFuelCalculator import Co2FossilFuelCalculator
+    from Services.SupplierEmissionsCalculator import SupplierEmissionsCalculator
+
+    # Import CH4 Calculator - handling space in filename
+    spec = importlib.util.spec_from_file_location(
+        "ch4_calculator", os.path.join(backend_path, "Services", "CH4 Calculator.py"))
+    ch4_calculator_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ch4_calculator_module)
+    Ch4Calculator = ch4_calculator_module.Ch4Calculator
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+WORKLOADS = ('fuel', 'freight', 'mixed')
+BENCHMARKS = ('co2_calculator', 'ch4_calculator', 'ghg_emissions_engine', 'compute_endpoint')
+DEFAULT_OUTPUT = os.path.join(script_dir, 'benchmark_results.json')
+DEFAULT_BASELINE = os.path.join(script_dir, 'baseline.json')
+
+# Input units tried for every fuel and freight reference row; only
+# combinations resolving to a non-zero factor are used
+FUEL_UNITS = ('US Gallon', 'Litre', 'UK Gallon', 'Barrel', 'Kilogram', 'Metric Ton', 'Short Ton',
+              'Standard Cubic Foot', 'Cubic Meter', 'Kilowatt Hour', 'MMBtu')
+FREIGHT_UNITS = ('Tonne Mile', 'Tonne Kilometer', 'Short Ton Mile', 'Short Ton Kilometer')
+
+
+def parse_sizes(value):
+    """'1k,10k,1m' -> [1000, 10000, 1000000]"""
+    multipliers = {'k': 1000, 'm': 1000000}
+    sizes = []
+    for size in value.lower().split(','):
+        size = size.strip()
+        multiplier = multipliers.get(size[-1:], 1)
+        sizes.append(int(float(size.rstrip('km')) * multiplier))
+    return sizes
+
+
+def size_label(rows):
+    return f'{rows // 1000000}m' if rows >= 1000000 and rows % 1000000 == 0 else \
+        f'{rows // 1000}k' if rows >= 1000 and rows % 1000 == 0 else str(rows)
+
+
+def valid_combinations(registry):
+    """
+    Fuel and freight activity combinations that resolve to an emission factor.
+
+    Returns:
+        dict: 'fuel' -> [(fuel, region, mode_of_transport, unit)],
+              'freight' -> [(vehicle_and_size, region, mode_of_transport, unit)]
+    """
+    engine = registry.get('ghg_emissions_engine')
+    combinations = {'fuel': set(), 'freight': set()}
+
+    fuel_rows = [(row['Fuel'], row) for row in registry.get('ef_fuel_use_co2').data] + \
+        [(row['Transport and Fuel'], row) for row in registry.get('ef_fuel_use_ch4_n2o').data]
+    for fuel, row in fuel_rows:
+        for unit in FUEL_UNITS:
+            if any(engine.get_factors(Resolved_Emission_Factors.FUEL, fuel, row['Region'], unit)):
+                combinations['fuel'].add((fuel, row['Region'], row['Mode of Transport'], unit))
+
+    for row in registry.get('ef_freight_co2').data:
+        for unit in FREIGHT_UNITS:
+            if any(engine.get_factors(Resolved_Emission_Factors.FREIGHT, row['Vehicle and Size'], row['Region'], unit)):
+                combinations['freight'].add((row['Vehicle and Size'], row['Region'], row['Mode of Transport'], unit))
+    return {kind: sorted(values) for kind, values in combinations.items()}
+
+
+def generate_rows(combinations, workload, rows, seed):
+    """
+    Synthetic activity rows in the /api/compute_ghg_emissions format.
+
+    Each row picks a random valid combination (fuel or freight, alternating
+    randomly for 'mixed') and random amounts; the same seed gives the same rows.
+    """
+    rng = random.Random(f'{seed}-{workload}-{rows}')
+    activity_rows = []
+    for i in range(rows):
+        kind = workload if workload != 'mixed' else rng.choice(('fuel', 'freight'))
+        key, region, mode_of_transport, unit = rng.choice(combinations[kind])
+        if kind == 'fuel':
+            activity_rows.append({
+                'Source_Description': f'Synthetic fuel use {i}', 'Region': region,
+                'Mode_of_Transport': mode_of_transport, 'Scope': 'Scope 1',
+                'Type_Of_Activity_Data': 'Fuel Use', 'Fuel_Used': key,
+                'Fuel_Amount': round(rng.uniform(10, 5000), 2), 'Unit_Of_Fuel_Amount': unit
+            })
+        else:
+            activity_rows.append({
+                'Source_Description': f'Synthetic freight leg {i}', 'Region': region,
+                'Mode_of_Transport': mode_of_transport, 'Scope': 'Scope 3',
+                'Type_Of_Activity_Data': 'Distance', 'Vehicle_Type': key,
+                'Distance_Travelled': round(rng.uniform(5, 8000), 1),
+                'Total_Weight_Of_Freight_InTonne': round(rng.uniform(0.5, 40), 2), 'Units_of_Measurement': unit
+            })
+    return {
+        'supplier_data': {'Supplier_and_Container': 'Benchmark Supplier', 'Container_Weight': 12.5,
+                          'Number_Of_Containers': 100},
+        'activity_rows': activity_rows
+    }
+
+
+def measure(function, repeat):
+    """
+    Run function `repeat` times; the result of each run is dropped before the next.
+
+    Returns:
+        list: (wall seconds, process CPU seconds) of every run
+    """
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        result = function()
+        durations.append((time.perf_counter() - start, time.process_time() - cpu_start))
+        del result
+    return durations
+
+
+def default_repeat(rows):
+    # Enough runs for a stable minimum on small sizes (50 at 1k rows), one at 1M rows
+    return max(1, min(50, 200000 // rows))
+
+
+def run_benchmarks(sizes, workloads, benchmarks, repeat, seed, full_profile_max_rows):
+    registry = backend_app.reference_data.current
+    registry.preload()
+    engine = registry.get('ghg_emissions_engine')
+    combinations = valid_combinations(registry)
+    print(f"📋 {len(combinations['fuel'])} fuel and {len(combinations['freight'])} freight combinations "
+          f"(reference version {registry.version})")
+
+    calculators = {
+        'co2_calculator': lambda inputs: Co2FossilFuelCalculator(
+            reference_ef_fuel_use_co2=registry.get('ef_fuel_use_co2'),
+            reference_ef_freight_co2=registry.get('ef_freight_co2'),
+            reference_unit_conversion=registry.get('unit_conversion'),
+            resolved_factors=engine.resolved_factors['CO2']).calculate_co2_emissions(inputs),
+        'ch4_calculator': lambda inputs: Ch4Calculator(
+            reference_ef_fuel_use_ch4_n2o=registry.get('ef_fuel_use_ch4_n2o'),
+            reference_ef_freight_co2=registry.get('ef_freight_co2'),
+            reference_unit_conversion=registry.get('unit_conversion'),
+            resolved_factors=engine.resolved_factors['CH4']).calculate_ch4_emissions(inputs),
+        'ghg_emissions_engine': lambda inputs: engine.calculate(inputs),
+    }
+
+    # Every request must compute: identical payloads would otherwise be answered
+    # from the cache (restored afterwards, the suite also runs inside test scripts)
+    cache_max_entries = backend_app.result_cache.max_entries
+    backend_app.result_cache.max_entries = 0
+    client = backend_app.app.test_client()
+
+    results = {}
+    try:
+        for rows in sizes:
+            runs = repeat or default_repeat(rows)
+            for workload in workloads:
+                payload = generate_rows(combinations, workload, rows, seed)
+                supplier_inputs = [SupplierEmissionsCalculator.build_supplier_input(payload['supplier_data'], row_data)
+                                   for row_data in payload['activity_rows']]
+                timings = {}
+                for benchmark in benchmarks:
+                    if benchmark in calculators:
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            timings[benchmark] = measure(lambda: calculators[benchmark](supplier_inputs), runs)
+                        continue
+                    body = json.dumps(payload).encode()
+                    profiles = ['summary'] + (['full'] if rows <= full_profile_max_rows else [])
+                    for profile in profiles:
+                        def post():
+                            response = client.post(f'/api/compute_ghg_emissions?profile={profile}', data=body,
+                                                   content_type='application/json')
+                            assert response.status_code == 200, response.get_data(as_text=True)[:200]
+                            return response
+                        timings[f'{benchmark}[{profile}]'] = measure(post, runs)
+                    del body
+                del supplier_inputs, payload
+
+                # Throughput is computed from CPU time, which unlike wall time does not
+                # include the time the process waits for a CPU on a busy machine
+                for benchmark, durations in timings.items():
+                    wall_seconds = [wall for wall, _ in durations]
+                    cpu_best = min(cpu for _, cpu in durations)
+                    key = f'{benchmark}/{workload}/{size_label(rows)}'
+                    results[key] = {
+                        'benchmark': benchmark,
+                        'workload': workload,
+                        'rows': rows,
+                        'repeat': len(durations),
+                        'seconds_min': round(min(wall_seconds), 6),
+                        'seconds_median': round(statistics.median(wall_seconds), 6),
+                        'cpu_seconds_min': round(cpu_best, 6),
+                        'rows_per_second': round(rows / cpu_best, 1)
+                    }
+                    print(f"   {key:<52} {min(wall_seconds) * 1000:>11.1f} ms  {rows / cpu_best:>12,.0f} rows/s (CPU)")
+    finally:
+        backend_app.result_cache.max_entries = cache_max_entries
+    return results, registry.version
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare throughput with a baseline.
+
+    Returns:
+        list: Keys of benchmarks slower than the baseline by more than tolerance
+    """
+    regressions = []
+    print(f"\n📊 Compared with baseline of {baseline.get('created_at', 'unknown date')}")
+    if baseline.get('environment') != environment():
+        print("   ⚠️  Baseline was recorded in a different environment; differences may not be regressions")
+    for key, result in results.items():
+        reference = baseline.get('results', {}).get(key)
+        if reference is None:
+            continue
+        ratio = result['rows_per_second'] / reference['rows_per_second']
+        status = '✅'
+        if ratio < 1 - tolerance:
+            status = '❌'
+            regressions.append(key)
+        print(f"   {status} {key:<52} {ratio:>6.2f}x baseline throughput")
+    return regressions
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=parse_sizes, default=list(DEFAULT_SIZES),
+                        help='Comma-separated row counts, e.g. 1k,10k,100k,1m')
+    parser.add_argument('--workloads', type=lambda value: value.split(','), default=list(WORKLOADS),
+                        help=f"Comma-separated workloads ({', '.join(WORKLOADS)})")
+    parser.add_argument('--benchmarks', type=lambda value: value.split(','), default=list(BENCHMARKS),
+                        help=f"Comma-separated benchmarks ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--repeat', type=int, default=0,
+                        help='Runs per benchmark (default: 50 at 1k rows, 20 at 10k, 2 at 100k, 1 at 1M)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the synthetic rows')
+    parser.add_argument('--full-profile-max-rows', type=int, default=100000,
+                        help="Largest size also posted with ?profile=full (its response grows ~2 kB per row)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Results file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file compared against, if it exists')
+    parser.add_argument('--save-baseline', action='store_true', help='Also write the results to the baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed throughput drop relative to the baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.workloads if name not in WORKLOADS] + \
+        [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown workload or benchmark: {', '.join(unknown)}")
+
+    print("🚀 Running calculator benchmarks")
+    print("=" * 60)
+    results, reference_version = run_benchmarks(args.sizes, args.workloads, args.benchmarks, args.repeat,
+                                                args.seed, args.full_profile_max_rows)
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'reference_version': reference_version,
+        'seed': args.seed,
+        'results': results
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f"💾 Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+    print("\n🎉 BENCHMARKS COMPLETE")
+
+
+if __name__ == '__main__':
+    main()
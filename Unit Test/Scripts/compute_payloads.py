@@ -0,0 +1,71 @@
+"""
+Compute payloads shared by the test scripts.
+
+Activity rows are built from reference rows that have an emission factor, so
+every row calculates: Scope 3 freight legs over ef_freight_co2 rows with a
+CO2 factor and, optionally, Scope 1 road fuel use over ef_fuel_use_co2 rows.
+build_payload() returns a /api/compute_ghg_emissions body and
+build_suppliers() the supplier list of /api/compute_ghg_emissions/batch.
+"""
+
+
+def factor_rows(registry):
+    """Freight and fuel reference rows the activity rows are built from."""
+    freight_rows = [row for row in registry.get('ef_freight_co2').data if row['CO2']][:20]
+    fuel_rows = list(registry.get('ef_fuel_use_co2').data)[:10]
+    return freight_rows, fuel_rows
+
+
+def freight_activity_row(row, index):
+    """Freight leg over an ef_freight_co2 reference row."""
+    return {
+        'Source_Description': f'Leg {index}', 'Region': row['Region'], 'Mode_of_Transport': row['Mode of Transport'],
+        'Scope': 'Scope 3', 'Vehicle_Type': row['Vehicle and Size'], 'Distance_Travelled': 100 + index % 50,
+        'Total_Weight_Of_Freight_InTonne': 2.5, 'Units_of_Measurement': 'Tonne Mile'
+    }
+
+
+def fuel_activity_row(row, index):
+    """Road fuel use over an ef_fuel_use_co2 reference row."""
+    return {
+        'Source_Description': f'Fuel {index}', 'Region': row['Region'], 'Mode_of_Transport': 'Road',
+        'Scope': 'Scope 1', 'Fuel_Used': row['Fuel'], 'Fuel_Amount': 40 + index % 7,
+        'Unit_Of_Fuel_Amount': 'US Gallon'
+    }
+
+
+def build_activity_rows(registry, row_count, fuel_every=0, offset=0):
+    """
+    Activity rows cycling through the factor rows.
+
+    Args:
+        registry: Reference_Registry to take the factor rows from
+        row_count (int): Number of rows
+        fuel_every (int): Every fuel_every-th row is a fuel row; 0 for freight only
+        offset (int): Index of the first row, to build different rows for each supplier
+    """
+    freight_rows, fuel_rows = factor_rows(registry)
+    activity_rows = []
+    for index in range(offset, offset + row_count):
+        if fuel_every and index % fuel_every == fuel_every - 1:
+            activity_rows.append(fuel_activity_row(fuel_rows[index % len(fuel_rows)], index))
+        else:
+            activity_rows.append(freight_activity_row(freight_rows[index % len(freight_rows)], index))
+    return activity_rows
+
+
+def supplier_data(name, containers=100):
+    return {'Supplier_and_Container': name, 'Container_Weight': 12.5, 'Number_Of_Containers': containers}
+
+
+def build_payload(registry, row_count, supplier='Test Supplier', fuel_every=0):
+    """/api/compute_ghg_emissions body with row_count activity rows (see build_activity_rows)."""
+    return {'supplier_data': supplier_data(supplier),
+            'activity_rows': build_activity_rows(registry, row_count, fuel_every)}
+
+
+def build_suppliers(registry, count=6, row_count=7):
+    """Supplier payloads 'Supplier 0'... of a batch, each with its own freight and fuel rows."""
+    return [{'supplier_data': supplier_data(f'Supplier {i}', 100 + i),
+             'activity_rows': build_activity_rows(registry, row_count, fuel_every=4, offset=i * row_count)}
+            for i in range(count)]
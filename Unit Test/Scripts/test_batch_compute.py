@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-supplier batch compute endpoint.
+
+Posts several supplier payloads to /api/compute_ghg_emissions/batch and
+checks that every per-supplier result matches the single-supplier endpoint,
+that the portfolio total is the sum of the supplier results, that failing
+payloads are reported without failing the batch, and that the process pool
+gives the same results as in-process computation, is only forked by start()
+and has its workers load a new reference version themselves.
+"""
+
+import sys
+import os
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    import Services.BatchComputePool as batch_compute_module
+    from Services.BatchComputePool import BatchComputePool
+    from compute_payloads import build_suppliers
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def test_batch_matches_single_supplier_endpoint():
+    """Each supplier result equals the single-supplier response; totals add up."""
+
+    print("🧪 Testing /api/compute_ghg_emissions/batch")
+    print("=" * 60)
+
+    client = backend_app.app.test_client()
+    suppliers = build_suppliers(backend_app.reference_data.current)
+    payload = suppliers + [{'supplier_data': {}, 'activity_rows': [{'Distance_Travelled': 'not a number'}]}]
+
+    response = client.post('/api/compute_ghg_emissions/batch', json={'suppliers': payload})
+    assert response.status_code == 200, response.get_json()
+    batch = response.get_json()
+    assert batch['reference_version'] == backend_app.reference_data.current.version
+    assert len(batch['results']) == len(payload)
+
+    expected_total = 0.0
+    for index, supplier in enumerate(suppliers):
+        single = client.post('/api/compute_ghg_emissions', json=supplier).get_json()
+        supplier_result = batch['results'][index]
+        assert supplier_result['status'] == 'success' and supplier_result['index'] == index
+        assert supplier_result['supplier_and_container'] == f'Supplier {index}'
+        assert supplier_result['result'] == single, f"Supplier {index} differs from the single endpoint"
+        expected_total += single['total_emissions']
+    print(f"✅ {len(suppliers)} supplier results match the single-supplier endpoint")
+
+    failed = batch['results'][-1]
+    assert failed['status'] == 'error' and 'could not convert' in failed['error']
+    portfolio = batch['portfolio_total']
+    assert portfolio['suppliers'] == len(payload) and portfolio['failed_suppliers'] == 1
+    assert abs(portfolio['total_emissions'] - expected_total) < 1e-9
+    print(f"✅ Portfolio total {portfolio['total_emissions']:.6f} with 1 failed supplier reported")
+
+    too_many = [{'supplier_data': {}, 'activity_rows': []}] * (backend_app.config.BATCH_MAX_SUPPLIERS + 1)
+    assert client.post('/api/compute_ghg_emissions/batch', json={'suppliers': too_many}).status_code == 413
+    assert client.post('/api/compute_ghg_emissions/batch', json={'suppliers': []}).status_code == 400
+    print("✅ Batch size limit and empty batches rejected")
+    return True
+
+
+def test_process_pool_matches_in_process():
+    """Pool workers compute the same results as the request thread."""
+
+    registry = backend_app.reference_data.current
+    suppliers = build_suppliers(registry)
+    in_process = BatchComputePool(0).map(registry, suppliers)
+
+    pool = BatchComputePool(2, backend_app.config)
+    try:
+        # Never forked on demand, from a process that may be running threads
+        assert pool.map(registry, suppliers) == in_process and pool.executor is None
+        assert pool.start(registry) and not pool.start(registry)
+        pooled = pool.map(registry, suppliers)
+        assert pool.executor is not None, "Pool did not start worker processes"
+        assert pooled == in_process
+        assert pool.map(registry, suppliers) == in_process
+    finally:
+        pool.shutdown()
+    assert not BatchComputePool(0).start(registry)
+    print("✅ Process pool results match in-process results")
+    return True
+
+
+def test_worker_reference_version():
+    """Workers load a payload's reference version, or report that it is gone."""
+
+    registry = backend_app.reference_data.current
+    suppliers = build_suppliers(registry)
+    expected = BatchComputePool(0).map(registry, suppliers[:1])[0]
+
+    class OldRegistry:
+        version = 'old-version'
+
+    try:
+        batch_compute_module._init_worker(backend_app.config, registry)
+        assert batch_compute_module._calculate_supplier(registry.version, suppliers[0]) == expected
+        # Inherited before a reload: the current version is loaded from the snapshot
+        batch_compute_module._worker_calculator.registry = OldRegistry()
+        assert batch_compute_module._calculate_supplier(registry.version, suppliers[0]) == expected
+        assert batch_compute_module._worker_calculator.registry.version == registry.version
+
+        result = batch_compute_module._calculate_supplier('stale-version', suppliers[0])
+        assert result['status'] == 'error' and 'stale-version' in result['error'], result
+    finally:
+        batch_compute_module._worker_config = None
+        batch_compute_module._worker_calculator = None
+    print("✅ Workers load a reloaded reference version and reject an unknown one")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_batch_matches_single_supplier_endpoint() and test_process_pool_matches_in_process()
+               and test_worker_reference_version())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
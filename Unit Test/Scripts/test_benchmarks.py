@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark suite (Unit Test/Benchmarks/run_benchmarks.py).
+
+Checks that the synthetic workloads only use activity combinations with an
+emission factor, are reproducible from their seed, that a small run times
+every benchmark, and that the baseline comparison flags throughput drops
+beyond the tolerance.
+"""
+
+import sys
+import os
+import contextlib
+import io
+
+# Add the benchmarks directory to the Python path (it adds the backend itself)
+benchmarks_path = os.path.join(os.path.dirname(__file__), '..', 'Benchmarks')
+sys.path.insert(0, benchmarks_path)
+
+try:
+    import run_benchmarks
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def test_synthetic_workloads():
+    """Generated rows use valid combinations and depend only on the seed."""
+
+    print("🧪 Testing benchmark workloads")
+    print("=" * 60)
+
+    registry = run_benchmarks.backend_app.reference_data.current
+    combinations = run_benchmarks.valid_combinations(registry)
+    assert combinations['fuel'] and combinations['freight']
+
+    payload = run_benchmarks.generate_rows(combinations, 'mixed', 2000, seed=7)
+    assert payload == run_benchmarks.generate_rows(combinations, 'mixed', 2000, seed=7)
+    assert payload != run_benchmarks.generate_rows(combinations, 'mixed', 2000, seed=8)
+    rows = payload['activity_rows']
+    fuel_rows = [row for row in rows if 'Fuel_Used' in row]
+    assert len(rows) == 2000 and 0 < len(fuel_rows) < 2000
+    assert all('Fuel_Used' in row for row in run_benchmarks.generate_rows(
+        combinations, 'fuel', 100, seed=7)['activity_rows'])
+
+    stats = {}
+    report = run_benchmarks.SupplierEmissionsCalculator(registry).calculate(
+        payload['supplier_data'], rows, profile='summary', stats=stats)
+    assert report['processed_rows'] == 2000
+    assert stats['factors_not_found'] == 0 and stats['rows_without_factor_key'] == 0
+    print(f"✅ {len(combinations['fuel'])} fuel and {len(combinations['freight'])} freight combinations, "
+          f"every generated row has a factor")
+
+    assert run_benchmarks.parse_sizes('1k,10K,2.5k,1m,750') == [1000, 10000, 2500, 1000000, 750]
+    assert [run_benchmarks.size_label(rows) for rows in (1000, 100000, 1000000, 2500)] == ['1k', '100k', '1m', '2500']
+    return True
+
+
+def test_small_run_and_compare():
+    """A small run times every benchmark; slower results are flagged against the baseline."""
+
+    result_cache = run_benchmarks.backend_app.result_cache
+    cache_max_entries = result_cache.max_entries
+    with contextlib.redirect_stdout(io.StringIO()):
+        results, version = run_benchmarks.run_benchmarks(
+            [500], ['freight'], list(run_benchmarks.BENCHMARKS), repeat=1, seed=1, full_profile_max_rows=500)
+    assert set(results) == {'co2_calculator/freight/500', 'ch4_calculator/freight/500',
+                            'ghg_emissions_engine/freight/500', 'compute_endpoint[summary]/freight/500',
+                            'compute_endpoint[full]/freight/500'}
+    assert all(result['rows'] == 500 and result['rows_per_second'] > 0 for result in results.values())
+    assert version == run_benchmarks.backend_app.reference_data.current.version
+    # The result cache is only disabled while the benchmarks run
+    assert result_cache.max_entries == cache_max_entries > 0
+
+    baseline = {'environment': run_benchmarks.environment(), 'results': {
+        key: dict(result, rows_per_second=result['rows_per_second'] * factor)
+        for (key, result), factor in zip(sorted(results.items()), (1.0, 2.0, 1.2, 0.5, 1.0))}}
+    with contextlib.redirect_stdout(io.StringIO()):
+        regressions = run_benchmarks.compare(results, baseline, tolerance=0.25)
+    assert regressions == [sorted(results)[1]]
+    print("✅ Every benchmark timed; a 50% throughput drop is reported as a regression")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_synthetic_workloads() and test_small_run_and_compare()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
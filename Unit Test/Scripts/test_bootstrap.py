@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for /api/bootstrap and the compressed dropdown responses.
+
+Checks that the bootstrap payload holds exactly what the individual dropdown
+endpoints return plus the reference version, that large precomputed bodies
+are sent gzip-compressed when the client accepts it, and the ETag/304
+behaviour of both encodings.
+"""
+
+import sys
+import os
+import gzip
+import json
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def test_bootstrap_matches_endpoints():
+    """Every catalog in the bootstrap payload equals its own endpoint."""
+
+    print("🧪 Testing /api/bootstrap")
+    print("=" * 60)
+
+    client = backend_app.app.test_client()
+    response = client.get('/api/bootstrap')
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert data['reference_version'] == backend_app.reference_data.current.version
+    assert data['suppliers'] == client.get('/api/suppliers').get_json()['suppliers']
+    assert data['fuel_types'] == client.get('/api/fuel_types').get_json()['fuel_types']
+    assert set(data['lookups']) == set(backend_app.config.LOOKUP_NAMES)
+    for name, values in data['lookups'].items():
+        assert values == client.get(f'/api/lookup/{name}').get_json()['values'], name
+    print(f"✅ Suppliers, fuel types and {len(data['lookups'])} lookups in one response")
+    return True
+
+
+def test_compressed_variants():
+    """gzip is served when accepted, decodes to the plain body and has its own ETag."""
+
+    client = backend_app.app.test_client()
+    plain = client.get('/api/bootstrap')
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    compressed = client.get('/api/bootstrap', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert len(compressed.data) < len(plain.data)
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+
+    refused = client.get('/api/bootstrap', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+
+    # Small dropdown bodies are not worth compressing
+    small = client.get('/api/lookup/scope', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers and small.get_json()['values']
+    print(f"✅ gzip body {len(compressed.data)} bytes (plain {len(plain.data)} bytes)")
+    return True
+
+
+def test_conditional_requests():
+    """If-None-Match with the ETag of either encoding answers 304."""
+
+    client = backend_app.app.test_client()
+    for headers in ({}, {'Accept-Encoding': 'gzip'}):
+        response = client.get('/api/bootstrap', headers=headers)
+        assert response.headers['Cache-Control'] == f'public, max-age={backend_app.config.LOOKUP_CACHE_MAX_AGE}'
+        cached = client.get('/api/bootstrap', headers={**headers, 'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304 and not cached.data
+    assert json.loads(client.get('/api/bootstrap').data)['reference_version']
+    print("✅ 304 Not Modified for both encodings")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_bootstrap_matches_endpoints() and test_compressed_variants()
+               and test_conditional_requests())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
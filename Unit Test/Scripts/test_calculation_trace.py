@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for explain-mode calculation tracing.
+
+Checks that the factor lineage recorded by GhgEmissionsEngine and by the
+per-gas calculators reproduces the resolved factors, and that calculations
+write nothing to stdout when no trace is given.
+"""
+
+import sys
+import os
+import io
+import contextlib
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.Supplier_Input import Supplier_Input
+    from Components.reference_ef import Reference_EF_Freight_CO2, Reference_EF_Fuel_Use_CO2, Reference_EF_Fuel_Use_CH4_N2O, Reference_Unit_Conversion
+    from Services.Co2FossilFuelCalculator import Co2FossilFuelCalculator
+    from Services.GhgEmissionsEngine import GhgEmissionsEngine
+    from Services.CalculationTrace import CalculationTrace
+    from config import get_config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def load_references():
+    config = get_config()
+    return {
+        'reference_ef_freight_co2': Reference_EF_Freight_CO2(config.get_csv_path('ef_freight_co2')),
+        'reference_ef_fuel_use_co2': Reference_EF_Fuel_Use_CO2(config.get_csv_path('ef_fuel_use_co2')),
+        'reference_ef_fuel_use_ch4_n2o': Reference_EF_Fuel_Use_CH4_N2O(config.get_csv_path('ef_fuel_use_ch4_n2o')),
+        'reference_unit_conversion': Reference_Unit_Conversion(config.get_csv_path('unit_conversion')),
+    }
+
+
+def make_input(**fields):
+    return Supplier_Input(
+        Supplier_and_Container='Test Supplier', Container_Weight=1.0, Number_Of_Containers=1,
+        Source_Description='Trace test', Region=fields.pop('Region', 'US'),
+        Mode_of_Transport='Road', Scope='Scope 3', Type_Of_Activity_Data='Fuel Use', **fields)
+
+
+def build_supplier_inputs(references):
+    freight_row = references['reference_ef_freight_co2'].data[0]
+    fuel_row = references['reference_ef_fuel_use_co2'].data[0]
+    return [
+        make_input(Region=freight_row['Region'], Vehicle_Type=freight_row['Vehicle and Size'],
+                   Distance_Travelled=100.0, Total_Weight_Of_Freight_InTonne=2.0,
+                   Units_of_Measurement='Tonne Mile'),
+        make_input(Region=fuel_row['Region'], Fuel_Used=fuel_row['Fuel'], Fuel_Amount=50.0,
+                   Unit_Of_Fuel_Amount='US Gallon'),
+        make_input(Region='')
+    ]
+
+
+def test_engine_trace_lineage():
+    """Every traced row must explain the factor the engine applied."""
+
+    print("🧪 Testing GhgEmissionsEngine explain lineage")
+    print("=" * 60)
+
+    references = load_references()
+    engine = GhgEmissionsEngine.from_references(**references)
+    supplier_inputs = build_supplier_inputs(references)
+
+    trace = CalculationTrace()
+    results = engine.calculate(supplier_inputs, trace=trace)
+    explained = trace.to_dict()
+
+    assert explained['row_count'] == len(supplier_inputs)
+    for entry in explained['rows']:
+        row_index = entry['row_index']
+        if entry['calculation_path'] is None:
+            assert entry['factors'] == {}
+            continue
+        for gas, lineage in entry['factors'].items():
+            result = results[gas][row_index]
+            assert entry['emissions'][gas] == result[f'{gas.lower()}_emissions']
+            if lineage['source_row'] is None:
+                # No reference row for this gas, e.g. a CO2-only fuel
+                assert lineage['resolved_factor'] == 0.0
+                continue
+            expected = (lineage['reference_factor'] or 0.0) * lineage['numerator']['conversion'] * \
+                lineage['denominator']['conversion']
+            assert abs(lineage['resolved_factor'] - expected) < 1e-12
+            if result['emission_factor'] > 0:
+                assert lineage['resolved_factor'] == result['emission_factor'], \
+                    f"{gas}: traced factor differs from applied factor for row {row_index}"
+        print(f"✅ Row {row_index} ({entry['calculation_path']}): lineage matches applied factors")
+
+    return True
+
+
+def test_calculator_trace_and_silence():
+    """Calculators record lineage only when traced and never print."""
+
+    references = load_references()
+    supplier_inputs = build_supplier_inputs(references)
+    calculator_references = {
+        'reference_ef_fuel_use_co2': references['reference_ef_fuel_use_co2'],
+        'reference_ef_freight_co2': references['reference_ef_freight_co2'],
+        'reference_unit_conversion': references['reference_unit_conversion']
+    }
+
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        untraced = Co2FossilFuelCalculator(
+            **calculator_references).calculate_co2_emissions(supplier_inputs)
+    assert stdout.getvalue() == '', "Calculator wrote to stdout without a trace"
+    print("✅ No stdout output when tracing is disabled")
+
+    trace = CalculationTrace()
+    traced = Co2FossilFuelCalculator(
+        trace=trace, **calculator_references).calculate_co2_emissions(supplier_inputs)
+    assert traced == untraced, "Tracing changed the calculation results"
+
+    assert [entry['calculation_path'] for entry in trace.entries] == ['freight', 'fuel']
+    for entry, result in zip(trace.entries, traced):
+        assert entry['gas'] == 'CO2'
+        assert entry['resolved_factor'] == result['emission_factor']
+    print(f"✅ {len(trace.entries)} calculator factor resolutions traced")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_engine_trace_lineage() and test_calculator_trace_and_silence()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
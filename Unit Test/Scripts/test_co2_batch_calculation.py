@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for Co2FossilFuelCalculator.calculate_co2_emissions_batch.
+
+Builds activity rows for every freight and fuel combination in the reference
+data (plus rows with missing or invalid values), runs them through both the
+per-row calculate_co2_emissions path and the vectorized batch path, and checks
+that emissions, emission factors and statuses agree row by row.
+"""
+
+import sys
+import os
+import io
+import math
+import time
+import contextlib
+
+import numpy as np
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.Supplier_Input import Supplier_Input
+    from Components.reference_ef import Reference_EF_Freight_CO2, Reference_EF_Fuel_Use_CO2, Reference_Unit_Conversion
+    from Services.Co2FossilFuelCalculator import Co2FossilFuelCalculator
+    from Services.BatchEmissionCalculator import BatchEmissionCalculator
+    from config import get_config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def create_calculator():
+    config = get_config()
+    return Co2FossilFuelCalculator(
+        reference_ef_fuel_use_co2=Reference_EF_Fuel_Use_CO2(
+            config.get_csv_path('ef_fuel_use_co2')),
+        reference_ef_freight_co2=Reference_EF_Freight_CO2(
+            config.get_csv_path('ef_freight_co2')),
+        reference_unit_conversion=Reference_Unit_Conversion(
+            config.get_csv_path('unit_conversion'))
+    )
+
+
+def build_supplier_inputs(calculator):
+    """Supplier inputs covering every reference combination and the edge cases."""
+    inputs = []
+
+    def add(**fields):
+        inputs.append(Supplier_Input(
+            Supplier_and_Container='Test Supplier', Container_Weight=1.0, Number_Of_Containers=1,
+            Source_Description='Batch test', Region=fields.pop('Region', 'US'),
+            Mode_of_Transport='Road', Scope='Scope 3', Type_Of_Activity_Data='Fuel Use', **fields))
+
+    for row in calculator.reference_ef_freight_co2.data:
+        for unit in ['Tonne Mile', 'Tonne Kilometer', 'Short Ton Mile', 'Mile', '']:
+            add(Region=row['Region'], Vehicle_Type=row['Vehicle and Size'], Distance_Travelled=250.0,
+                Total_Weight_Of_Freight_InTonne=12.5, Units_of_Measurement=unit)
+
+    for row in calculator.reference_ef_fuel_use_co2.data:
+        for unit in ['US Gallon', 'Litre', 'UK Gallon', 'Kilogram', '']:
+            add(Region=row['Region'], Fuel_Used=row['Fuel'], Fuel_Amount=1000.0,
+                Unit_Of_Fuel_Amount=unit)
+
+    # Missing distance, unknown vehicle, no usable data at all, unparseable values
+    add(Vehicle_Type='Rail', Units_of_Measurement='Tonne Mile', Distance_Travelled=None,
+        Total_Weight_Of_Freight_InTonne=5.0)
+    add(Vehicle_Type='No Such Vehicle', Units_of_Measurement='Mile', Distance_Travelled=1.0,
+        Total_Weight_Of_Freight_InTonne=1.0)
+    add(Region='')
+    add(Region='Other', Fuel_Used='Jet Fuel', Fuel_Amount='not a number',
+        Unit_Of_Fuel_Amount='US Gallon')
+    return inputs
+
+
+def test_batch_matches_per_row():
+    """Batch results must match the per-row path within float tolerance."""
+
+    print("🧪 Testing batch CO2 calculation against the per-row path")
+    print("=" * 60)
+
+    calculator = create_calculator()
+    supplier_inputs = build_supplier_inputs(calculator)
+
+    # The per-row path prints debug output for every row
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = calculator.calculate_co2_emissions(supplier_inputs)
+
+    columns = BatchEmissionCalculator.columns_from_supplier_inputs(
+        supplier_inputs)
+    actual = calculator.calculate_co2_emissions_batch(**columns)
+
+    assert len(actual['co2_emissions']) == len(expected)
+    for i, row in enumerate(expected):
+        assert math.isclose(actual['co2_emissions'][i], row['co2_emissions'], rel_tol=1e-12), \
+            f"Row {i}: {actual['co2_emissions'][i]} != {row['co2_emissions']}"
+        assert math.isclose(actual['emission_factor'][i], row['emission_factor'], rel_tol=1e-12), \
+            f"Row {i}: factor {actual['emission_factor'][i]} != {row['emission_factor']}"
+        assert actual['status'][i] == row['status'], \
+            f"Row {i}: status {actual['status'][i]!r} != {row['status']!r}"
+
+    calculated = int((actual['co2_emissions'] > 0).sum())
+    print(f"✅ {len(expected)} rows match ({calculated} with emissions)")
+    return True
+
+
+def test_batch_accepts_numpy_columns():
+    """Float arrays with NaN for missing values are accepted directly."""
+
+    print("\n🧪 Testing NumPy column input")
+    print("=" * 60)
+
+    calculator = create_calculator()
+    row_count = 100000
+    vehicle = calculator.reference_ef_freight_co2.data[0]
+
+    start = time.perf_counter()
+    results = calculator.calculate_co2_emissions_batch(
+        vehicle_type=[vehicle['Vehicle and Size']] * row_count,
+        region=[vehicle['Region']] * row_count,
+        units_of_measurement=['Tonne Kilometer'] * row_count,
+        distance_travelled=np.linspace(1.0, 500.0, row_count),
+        total_weight=np.full(row_count, 10.0))
+    elapsed = time.perf_counter() - start
+
+    assert len(results['co2_emissions']) == row_count
+    assert np.all(results['calculation_path'] == 'freight')
+    print(f"✅ {row_count:,} rows calculated in {elapsed:.3f}s")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_batch_matches_per_row() and test_batch_accepts_numpy_columns()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar reference table storage.
+
+Checks that the row dicts produced on demand from each Columnar_Table are
+identical to the csv.DictReader rows the reference classes used to keep, that
+numeric emission factor columns are parsed into float arrays, and that the
+vectorized filters agree with a plain row scan.
+"""
+
+import sys
+import os
+import csv
+import math
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.reference_ef import (Reference_EF_Public, Reference_EF_Freight_CO2, Reference_EF_Freight_CH4_NO2,
+                                         Reference_EF_Road, Reference_EF_Fuel_Use_CH4_N2O, Reference_EF_Fuel_Use_CO2)
+    from Components.reference_lookups import ReferenceLookup
+    from Components.Reference_Source_Product_Matrix import Reference_Source_Product_Matrix
+    from config import get_config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+REFERENCE_TABLES = [
+    ('ef_fuel_use_co2', Reference_EF_Fuel_Use_CO2),
+    ('ef_fuel_use_ch4_n2o', Reference_EF_Fuel_Use_CH4_N2O),
+    ('ef_road', Reference_EF_Road),
+    ('ef_public', Reference_EF_Public),
+    ('ef_freight_co2', Reference_EF_Freight_CO2),
+    ('ef_freight_ch4_no2', Reference_EF_Freight_CH4_NO2),
+]
+
+
+def read_dict_rows(csv_path, key_column=None):
+    """Rows exactly as csv.DictReader produced them before the column store."""
+    with open(csv_path, 'r', encoding='utf-8-sig') as file:
+        return [row for row in csv.DictReader(file)
+                if key_column is None or row.get(key_column)]
+
+
+def test_row_views_match_dict_reader():
+    """Row dicts built from the column store must equal the original DictReader rows."""
+
+    print("🧪 Testing columnar row views")
+    print("=" * 60)
+
+    config = get_config()
+    for csv_key, reference_class in REFERENCE_TABLES:
+        csv_path = config.get_csv_path(csv_key)
+        reference = reference_class(csv_path)
+        expected = read_dict_rows(csv_path, reference_class.KEY_COLUMN)
+
+        assert len(reference.data) == len(expected)
+        assert list(reference.data) == expected
+        assert reference.data[0] == expected[0]
+        assert reference.data[-1] == expected[-1]
+        print(f"✅ {reference_class.__name__}: {len(expected)} rows identical")
+
+    lookups_path = config.get_csv_path('lookups')
+    for column in config.LOOKUP_COLUMNS:
+        lookup = ReferenceLookup(lookups_path, column)
+        assert list(lookup.data) == read_dict_rows(lookups_path, column)
+    print("✅ ReferenceLookup rows identical")
+
+    matrix_path = config.get_csv_path('source_product_matrix')
+    matrix = Reference_Source_Product_Matrix(matrix_path)
+    assert list(matrix.data) == read_dict_rows(matrix_path)
+    print("✅ Reference_Source_Product_Matrix rows identical")
+    return True
+
+
+def test_numeric_columns_and_interning():
+    """Emission factor columns are float arrays; repeated strings are stored once."""
+
+    print("\n🧪 Testing numeric columns and string interning")
+    print("=" * 60)
+
+    config = get_config()
+    reference = Reference_EF_Freight_CO2(config.get_csv_path('ef_freight_co2'))
+    table = reference.table
+
+    for column in ('CO2', 'CH4', 'N2O'):
+        values = table.numeric[column]
+        assert len(values) == len(table)
+        for row, value in zip(reference.data, values):
+            if row[column]:
+                assert value == float(row[column])
+            else:
+                assert math.isnan(value)
+    print("✅ CO2/CH4/N2O parsed into float arrays")
+
+    regions = table.categories['Region']
+    assert len(regions) == len(set(regions)) < len(table)
+    print(f"✅ Region stored as {len(regions)} categories for {len(table)} rows")
+    return True
+
+
+def test_vectorized_filter_matches_scan():
+    """mask_where must select the same rows as a case-insensitive scan."""
+
+    print("\n🧪 Testing vectorized filtering")
+    print("=" * 60)
+
+    config = get_config()
+    reference = Reference_EF_Freight_CO2(config.get_csv_path('ef_freight_co2'))
+    table = reference.table
+
+    for region in ('US', ' uk ', 'Other', 'Nowhere'):
+        expected = [i for i, row in enumerate(reference.data)
+                    if row['Region'].strip().lower() == region.strip().lower()]
+        assert table.positions_where('Region', region) == expected
+        assert int(table.mask_where('Region', region).sum()) == len(expected)
+        print(f"✅ Region '{region.strip()}': {len(expected)} rows")
+
+    assert table.positions_where('No Such Column', 'US') == []
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_row_views_match_dict_reader()
+               and test_numeric_columns_and_interning()
+               and test_vectorized_filter_matches_scan())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the response profiles and compression of /api/compute_ghg_emissions.
+
+Checks that ?profile=summary and ?profile=compact-columnar report the same
+totals as the full response while leaving out the repeated per-row sections,
+that the compact rows hold the per-row results of the full response, that
+large responses are gzip-compressed when accepted, and compares the payload
+size and serialization time of the profiles for a 5000-row submission.
+"""
+
+import sys
+import os
+import gzip
+import json
+import time
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Services.SupplierEmissionsCalculator import SupplierEmissionsCalculator
+    from compute_payloads import build_payload
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def strip_details(summary):
+    """summary_by_transport_scope_activity of the full profile without the details lists."""
+    return {mode: {scope: {activity: {gas: {'total_emissions': gas_summary['total_emissions']}
+                                      for gas, gas_summary in gases.items()}
+                           for activity, gases in activities.items()}
+                   for scope, activities in scopes.items()}
+            for mode, scopes in summary.items()}
+
+
+def test_profiles_match_full():
+    """summary and compact-columnar carry the totals of full, without repeated rows."""
+
+    print("🧪 Testing compute_ghg_emissions profiles")
+    print("=" * 60)
+
+    client = backend_app.app.test_client()
+    payload = build_payload(backend_app.reference_data.current, 200, 'Profile Supplier', fuel_every=4)
+    full = client.post('/api/compute_ghg_emissions', json=payload).get_json()
+    assert 'detailed_results' in full['transport_emissions'] and 'co2_emissions_results' in full
+
+    for profile in ('summary', 'compact-columnar'):
+        data = client.post(f'/api/compute_ghg_emissions?profile={profile}', json=payload).get_json()
+        for key in ('processed_rows', 'manufacturing_emissions', 'manufacturing_details', 'total_emissions',
+                    'total_co2_emissions', 'total_ch4_emissions', 'reference_version'):
+            assert data[key] == full[key], (profile, key)
+        for gas in ('co2', 'ch4', 'n2o'):
+            assert data['transport_emissions'][gas] == full['transport_emissions'][gas]
+        assert data['transport_emissions']['summary_by_transport_scope_activity'] == \
+            strip_details(full['transport_emissions']['summary_by_transport_scope_activity'])
+        assert 'detailed_results' not in data['transport_emissions']
+        assert 'co2_emissions_results' not in data and 'ch4_emissions_results' not in data
+    print("✅ summary and compact-columnar totals equal the full response")
+
+    rows = data['transport_emissions']['rows']
+    assert all(len(column) == len(payload['activity_rows']) for column in rows.values())
+    for gas in ('co2', 'ch4', 'n2o'):
+        detailed = full['transport_emissions']['detailed_results'][gas]
+        assert rows[f'{gas}_emissions'] == [result[f'{gas}_emissions'] for result in detailed]
+        assert rows[f'{gas}_emission_factor'] == [result['emission_factor'] for result in detailed]
+        assert rows[f'{gas}_status'] == [result['status'] for result in detailed]
+    assert rows['source_description'] == [row['Source_Description'] for row in payload['activity_rows']]
+    print(f"✅ compact-columnar rows hold the per-row results ({len(rows)} columns)")
+
+    response = client.post('/api/compute_ghg_emissions?profile=everything', json=payload)
+    assert response.status_code == 400 and 'everything' in response.get_json()['error']
+    return True
+
+
+def test_compression():
+    """Large compute responses are gzip-compressed when the client accepts it."""
+
+    client = backend_app.app.test_client()
+    payload = build_payload(backend_app.reference_data.current, 200, 'Profile Supplier', fuel_every=4)
+    plain = client.post('/api/compute_ghg_emissions', json=payload)
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+    compressed = client.post('/api/compute_ghg_emissions', json=payload, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+    print(f"✅ gzip: {len(compressed.data)} bytes instead of {len(plain.data)}")
+    return True
+
+
+def test_5000_row_payload_sizes():
+    """Payload size and serialization time of each profile for 5000 rows."""
+
+    registry = backend_app.reference_data.current
+    payload = build_payload(registry, 5000, 'Profile Supplier', fuel_every=4)
+    calculator = SupplierEmissionsCalculator(registry)
+    sizes = {}
+    for profile in SupplierEmissionsCalculator.PROFILES:
+        start = time.perf_counter()
+        report = calculator.calculate(payload['supplier_data'], payload['activity_rows'], profile=profile)
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        body = backend_app.app.json.dumps(report, separators=(',', ':')).encode()
+        serialize_ms = (time.perf_counter() - start) * 1000
+        sizes[profile] = len(body)
+        print(f"   {profile:17} build {build_ms:7.1f} ms, serialize {serialize_ms:7.1f} ms, "
+              f"{len(body) / 1024:8.1f} KB, gzip {len(gzip.compress(body, 6)) / 1024:7.1f} KB")
+    assert sizes['summary'] * 100 < sizes['full']
+    assert sizes['compact-columnar'] * 5 < sizes['full']
+    print("✅ summary and compact-columnar payloads are a fraction of full")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_profiles_match_full() and test_compression() and test_5000_row_payload_sizes()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
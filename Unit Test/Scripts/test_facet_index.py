@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the facet index behind /api/vehicle_and_size and /api/facets.
+
+Checks Facet_Index.query against a full scan of the rows for every facet
+table and many filter combinations, that the vehicle dropdowns are answered
+at load time, and the /api/vehicle_and_size and /api/facets responses.
+"""
+
+import sys
+import os
+import itertools
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Components.reference_registry import FACET_PREFIX
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def scan(rows, field, filters):
+    """The facet answer computed the way the endpoints used to: a scan of every row."""
+    return sorted({row[field] for row in rows
+                   if row[field] and all(row.get(column, '').strip().lower() == value.strip().lower()
+                                         for column, value in filters.items())})
+
+
+def test_query_matches_full_scan():
+    """Facet answers equal a scan of the rows for one and two filters."""
+
+    print("🧪 Testing Facet_Index")
+    print("=" * 60)
+
+    registry = backend_app.reference_data.current
+    queries = 0
+    for table_name in backend_app.config.FACET_TABLES:
+        facet_index = registry.get(FACET_PREFIX + table_name)
+        rows = list(registry.get(table_name).data)
+        columns = facet_index.columns[:4]
+        for field, filter_column in itertools.permutations(columns, 2):
+            values = [value for value in facet_index.table.categories[filter_column]][:6] + ['  unknown ']
+            for value in values:
+                assert facet_index.query(field, {filter_column: value}) == \
+                    scan(rows, field, {filter_column: value}), (table_name, field, filter_column, value)
+                queries += 1
+        if len(columns) >= 3:
+            field, first, second = columns[:3]
+            for first_value, second_value in itertools.islice(
+                    itertools.product(facet_index.table.categories[first], facet_index.table.categories[second]), 50):
+                filters = {first: first_value.upper(), second: f' {second_value} '}
+                assert facet_index.query(field, filters) == scan(rows, field, filters)
+                queries += 1
+        assert facet_index.query(columns[0]) == scan(rows, columns[0], {})
+    print(f"✅ {queries} facet queries match a full scan")
+    return True
+
+
+def test_vehicle_and_size_precomputed():
+    """Every (region, mode) pair of the freight table is answered at load time."""
+
+    registry = backend_app.reference_data.current
+    facet_index = registry.get(FACET_PREFIX + 'ef_freight_co2')
+    table = facet_index.table
+    pairs = set(zip(table.normalized_column('Region'), table.normalized_column('Mode of Transport')))
+    for region, mode in pairs:
+        assert ('Vehicle and Size', (('Mode of Transport', mode), ('Region', region))) in facet_index.answers
+
+    client = backend_app.app.test_client()
+    rows = list(registry.get('ef_freight_co2').data)
+    for region, mode in sorted(pairs):
+        for activity_type in ('', 'Fuel Use', 'Weight Distance (e.g. Freight Transport)'):
+            data = client.get('/api/vehicle_and_size', query_string={
+                'region': region.upper(), 'mode_of_transport': mode, 'type_of_activity_data': activity_type
+            }).get_json()
+            expected = scan(rows, 'Vehicle and Size', {'Region': region, 'Mode of Transport': mode})
+            assert data['vehicle_and_size'] == expected and data['total_matches'] == len(expected)
+            assert data['data_source'] == 'Reference_EF_Freight_CO2'
+    assert client.get('/api/vehicle_and_size?region=US').status_code == 400
+    print(f"✅ {len(pairs)} (region, mode) vehicle lists precomputed and served")
+    return True
+
+
+def test_facets_endpoint():
+    """Generic /api/facets query and its errors."""
+
+    client = backend_app.app.test_client()
+    data = client.get('/api/facets', query_string={
+        'table': 'ef_freight_co2', 'field': 'Vehicle and Size', 'Region': 'us', 'Mode of Transport': 'ROAD'
+    }).get_json()
+    expected = client.get('/api/vehicle_and_size?region=US&mode_of_transport=Road').get_json()
+    assert data['values'] == expected['vehicle_and_size'] and data['values']
+
+    data = client.get('/api/facets', query_string={'table': 'source_product_matrix', 'field': 'PRODUCT LINE',
+                                                   'SUPPLIER': 'anchor glass'}).get_json()
+    assert data['values'] == ['Liquor Bottles']
+
+    assert client.get('/api/facets?table=ef_freight_co2').status_code == 400
+    assert client.get('/api/facets?table=unknown&field=Region').status_code == 404
+    response = client.get('/api/facets?table=ef_road&field=Region&Colour=red')
+    assert response.status_code == 400 and 'Colour' in response.get_json()['error']
+    print("✅ /api/facets answers cascading dropdown queries")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_query_matches_full_scan() and test_vehicle_and_size_precomputed() and test_facets_endpoint()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
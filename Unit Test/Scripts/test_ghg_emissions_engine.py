@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass GhgEmissionsEngine.
+
+Runs the same activity rows through the engine and through the separate
+Co2FossilFuelCalculator / Ch4Calculator passes, and checks that the CO2 and
+CH4 results are identical and that N2O is calculated from the same records.
+"""
+
+import sys
+import os
+import io
+import time
+import contextlib
+import importlib.util
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.Supplier_Input import Supplier_Input
+    from Components.reference_ef import Reference_EF_Freight_CO2, Reference_EF_Fuel_Use_CO2, Reference_EF_Fuel_Use_CH4_N2O, Reference_Unit_Conversion
+    from Services.Co2FossilFuelCalculator import Co2FossilFuelCalculator
+    from Services.GhgEmissionsEngine import GhgEmissionsEngine
+    from config import get_config
+
+    # Import CH4 Calculator - handling space in filename
+    spec = importlib.util.spec_from_file_location(
+        "ch4_calculator", os.path.join(backend_path, "Services", "CH4 Calculator.py"))
+    ch4_calculator_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ch4_calculator_module)
+    Ch4Calculator = ch4_calculator_module.Ch4Calculator
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def load_references():
+    config = get_config()
+    return {
+        'reference_ef_freight_co2': Reference_EF_Freight_CO2(config.get_csv_path('ef_freight_co2')),
+        'reference_ef_fuel_use_co2': Reference_EF_Fuel_Use_CO2(config.get_csv_path('ef_fuel_use_co2')),
+        'reference_ef_fuel_use_ch4_n2o': Reference_EF_Fuel_Use_CH4_N2O(config.get_csv_path('ef_fuel_use_ch4_n2o')),
+        'reference_unit_conversion': Reference_Unit_Conversion(config.get_csv_path('unit_conversion')),
+    }
+
+
+def build_supplier_inputs(references):
+    inputs = []
+
+    def add(**fields):
+        inputs.append(Supplier_Input(
+            Supplier_and_Container='Test Supplier', Container_Weight=1.0, Number_Of_Containers=1,
+            Source_Description='Engine test', Region=fields.pop('Region', 'US'),
+            Mode_of_Transport='Road', Scope='Scope 3', Type_Of_Activity_Data='Fuel Use', **fields))
+
+    for row in references['reference_ef_freight_co2'].data:
+        for unit in ['Tonne Mile', 'Tonne Kilometer', 'Short Ton Mile', '']:
+            add(Region=row['Region'], Vehicle_Type=row['Vehicle and Size'], Distance_Travelled=321.0,
+                Total_Weight_Of_Freight_InTonne=4.5, Units_of_Measurement=unit)
+    for row in references['reference_ef_fuel_use_co2'].data:
+        add(Region=row['Region'], Fuel_Used=row['Fuel'], Fuel_Amount=500.0,
+            Unit_Of_Fuel_Amount='US Gallon')
+    for row in references['reference_ef_fuel_use_ch4_n2o'].data:
+        add(Region=row['Region'], Fuel_Used=row['Transport and Fuel'], Fuel_Amount=75.0,
+            Unit_Of_Fuel_Amount='Litre')
+    add(Region='')
+    add(Vehicle_Type='Rail', Region='UK', Distance_Travelled=None,
+        Total_Weight_Of_Freight_InTonne=1.0, Units_of_Measurement='Tonne Mile')
+    add(Region='Other', Fuel_Used='Jet Fuel', Fuel_Amount='bad amount',
+        Unit_Of_Fuel_Amount='US Gallon')
+    return inputs
+
+
+def test_engine_matches_separate_calculators():
+    """The fused pass must reproduce the separate CO2 and CH4 calculator results."""
+
+    print("🧪 Testing GhgEmissionsEngine against the separate calculators")
+    print("=" * 60)
+
+    references = load_references()
+    supplier_inputs = build_supplier_inputs(references)
+    engine = GhgEmissionsEngine.from_references(**references)
+
+    co2_calculator = Co2FossilFuelCalculator(
+        reference_ef_fuel_use_co2=references['reference_ef_fuel_use_co2'],
+        reference_ef_freight_co2=references['reference_ef_freight_co2'],
+        reference_unit_conversion=references['reference_unit_conversion'])
+    ch4_calculator = Ch4Calculator(
+        reference_ef_fuel_use_ch4_n2o=references['reference_ef_fuel_use_ch4_n2o'],
+        reference_ef_freight_co2=references['reference_ef_freight_co2'],
+        reference_unit_conversion=references['reference_unit_conversion'])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        expected_co2 = co2_calculator.calculate_co2_emissions(supplier_inputs)
+        expected_ch4 = ch4_calculator.calculate_ch4_emissions(supplier_inputs)
+        separate_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = engine.calculate(supplier_inputs)
+    engine_elapsed = time.perf_counter() - start
+
+    assert results['CO2'] == expected_co2, "CO2 results differ"
+    assert results['CH4'] == expected_ch4, "CH4 results differ"
+    print(f"✅ CO2 and CH4 identical for {len(supplier_inputs)} rows")
+
+    n2o_calculated = [r for r in results['N2O'] if r['status'] == 'Success']
+    assert n2o_calculated, "Expected N2O emissions for rows with N2O factors"
+    assert len(results['N2O']) == len(supplier_inputs)
+    print(f"✅ N2O calculated for {len(n2o_calculated)} rows")
+
+    print(f"⏱️  Separate passes: {separate_elapsed:.4f}s, fused engine: {engine_elapsed:.4f}s")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_engine_matches_separate_calculators()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
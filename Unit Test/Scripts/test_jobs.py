@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous job API (/api/jobs).
+
+Checks that a queued job reports progress in rows done of rows total while it
+runs, that its result equals the /api/compute_ghg_emissions response for the
+same payload, that another JobStore on the same database file (as used by
+another worker process) answers status queries, that failing payloads end in
+the 'failed' status, that finished jobs expire after their TTL, and that jobs
+left queued or running by a process that exited are failed or expire by age,
+while importing the app or opening the store elsewhere leaves the jobs of
+live processes alone.
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import subprocess
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Services.JobStore import JobStore
+    from Services.JobRunner import JobRunner
+    from compute_payloads import build_payload
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def wait_for(client, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'Job {job_id} did not finish')
+
+
+def test_job_result_matches_compute():
+    """A job's result equals the synchronous compute response."""
+
+    print("🧪 Testing /api/jobs")
+    print("=" * 60)
+
+    client = backend_app.app.test_client()
+    payload = build_payload(backend_app.reference_data.current, 2500, 'Job Supplier')
+    response = client.post('/api/jobs', json=payload)
+    assert response.status_code == 202
+    created = response.get_json()
+    assert created['status'] in ('queued', 'running', 'succeeded') and created['rows_total'] == 2500
+    assert created['status_url'] == f"/api/jobs/{created['job_id']}"
+
+    job = wait_for(client, created['job_id'])
+    assert job['status'] == 'succeeded' and job['rows_done'] == 2500 and job['progress'] == 1.0
+    expected = client.post('/api/compute_ghg_emissions', json=payload).get_json()
+    assert job['result'] == expected
+    assert job['expires_at'] == job['finished_at'] + backend_app.config.JOB_RESULT_TTL
+
+    raw = client.get(job['result_url'])
+    assert json.loads(raw.data) == expected
+    assert 'result' not in client.get(f"/api/jobs/{job['job_id']}?include_result=0").get_json()
+
+    summary_job = wait_for(client, client.post('/api/jobs?profile=summary', json=payload).get_json()['job_id'])
+    assert summary_job['result']['total_emissions'] == expected['total_emissions']
+    assert 'detailed_results' not in summary_job['result']['transport_emissions']
+    print(f"✅ Job result equals /api/compute_ghg_emissions ({job['rows_total']} rows)")
+    return True
+
+
+def test_progress_and_shared_store():
+    """Progress is recorded per chunk and readable through another store instance."""
+
+    registry = backend_app.reference_data.current
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'jobs.sqlite3')
+        store = JobStore(path)
+        other_worker_store = JobStore(path)
+        observed = []
+        record_progress = store.progress
+
+        def progress(job_id, rows_done):
+            record_progress(job_id, rows_done)
+            observed.append((rows_done, other_worker_store.get(job_id)['rows_done'],
+                             other_worker_store.get(job_id)['status']))
+
+        store.progress = progress
+        runner = JobRunner(store, workers=1)
+        payload = build_payload(registry, 3500, 'Job Supplier')
+        job_id = store.create(json.dumps(payload).encode(), 3500, 'summary', registry.version)
+        assert other_worker_store.get(job_id)['status'] == 'queued'
+        runner.submit(job_id, registry, 'summary').result()
+        runner.shutdown()
+
+        assert observed == [(1000, 1000, 'running'), (2000, 2000, 'running'),
+                            (3000, 3000, 'running'), (3500, 3500, 'running')]
+        job = other_worker_store.get(job_id)
+        assert job['status'] == 'succeeded' and job['rows_done'] == 3500
+        assert json.loads(other_worker_store.get_result(job_id))['processed_rows'] == 3500
+        assert other_worker_store.get_payload(job_id) == b''
+    print("✅ Progress reported every 1000 rows and visible to other workers")
+    return True
+
+
+def test_failures_and_expiry():
+    """Invalid payloads fail, unknown ids are 404, finished jobs expire."""
+
+    client = backend_app.app.test_client()
+    payload = build_payload(backend_app.reference_data.current, 10, 'Job Supplier')
+    payload['activity_rows'][3]['Distance_Travelled'] = 'far'
+    job = wait_for(client, client.post('/api/jobs', json=payload).get_json()['job_id'])
+    assert job['status'] == 'failed' and 'far' in job['error'] and 'result' not in job
+    assert client.get(f"/api/jobs/{job['job_id']}/result").status_code == 404
+
+    assert client.post('/api/jobs', json={'activity_rows': 'none'}).status_code == 400
+    assert client.post('/api/jobs?profile=huge', json=payload).status_code == 400
+    assert client.get('/api/jobs/unknown').status_code == 404
+
+    backend_app.job_store.remove_expired(0)
+    assert client.get(f"/api/jobs/{job['job_id']}").status_code == 404
+    print("✅ Failed jobs report their error; finished jobs expire")
+    return True
+
+
+def test_unfinished_jobs():
+    """Jobs of exited processes are failed, those of live ones kept; never-finished jobs expire by age."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'jobs.sqlite3')
+        # A store created before jobs recorded their owner
+        with sqlite3.connect(path) as connection:
+            connection.execute('CREATE TABLE jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, '
+                               'profile TEXT NOT NULL, rows_total INTEGER NOT NULL, rows_done INTEGER NOT NULL '
+                               'DEFAULT 0, error TEXT, reference_version TEXT NOT NULL, created_at REAL NOT NULL, '
+                               'started_at REAL, finished_at REAL, payload BLOB NOT NULL, result BLOB)')
+            connection.execute("INSERT INTO jobs (job_id, status, profile, rows_total, reference_version, "
+                               "created_at, payload) VALUES ('legacy', 'running', 'summary', 10, 'v1', 0, x'')")
+        connection.close()
+        store = JobStore(path)
+
+        other_worker = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+        exited_worker = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited_worker.wait()
+        try:
+            live = store.create(b'{}', 10, 'summary', 'v1', owner_pid=other_worker.pid)
+            store.start(live)
+            queued = store.create(b'{}', 10, 'summary', 'v1', owner_pid=exited_worker.pid)
+            running = store.create(b'{}', 10, 'summary', 'v1', owner_pid=exited_worker.pid)
+            store.start(running)
+            done = store.create(b'{}', 10, 'summary', 'v1', owner_pid=exited_worker.pid)
+            store.succeed(done, b'{}')
+
+            # Importing the app elsewhere (another worker, a test, a CLI) fails nothing
+            subprocess.run([sys.executable, '-c', 'import app'], cwd=backend_path, check=True,
+                           env=dict(os.environ, JOB_STORE_PATH=path), capture_output=True)
+            assert [store.get(job_id)['status'] for job_id in (live, queued, running, 'legacy')] == \
+                ['running', 'queued', 'running', 'running']
+
+            assert JobStore(path).fail_orphaned('Interrupted by a server restart') == 3
+            for job_id in (queued, running, 'legacy'):
+                job = store.get(job_id)
+                assert job['status'] == 'failed' and job['error'] == 'Interrupted by a server restart'
+                assert job['finished_at'] is not None and store.get_payload(job_id) == b''
+            assert store.get(live)['status'] == 'running' and store.get_payload(live) == b'{}'
+            assert store.get(done)['status'] == 'succeeded'
+            assert store.fail_orphaned('Interrupted by a server restart') == 0
+        finally:
+            other_worker.kill()
+            other_worker.wait()
+        assert store.fail_orphaned('Interrupted: the worker computing it exited') == 1
+        assert store.get(live)['status'] == 'failed'
+
+        stale = store.create(b'{}', 10, 'summary', 'v1')
+        store.start(stale)
+        assert store.remove_expired(3600) == 0
+        time.sleep(0.01)
+        assert store.remove_expired(3600, unfinished_ttl_seconds=0) == 1
+        assert store.get(stale) is None and store.get(done) is not None
+    print("✅ Jobs of exited processes marked as failed, unfinished jobs expire by creation time")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_job_result_matches_compute() and test_progress_and_shared_store()
+               and test_failures_and_expiry() and test_unfinished_jobs())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the pre-serialized dropdown responses.
+
+Checks that /api/lookup/<name>, /api/fuel_types and /api/suppliers return
+the values computed from the reference tables, carry an ETag derived from
+the reference data version and Cache-Control, answer a matching
+If-None-Match with 304, and that the ETag changes when a reload swaps in a
+new version.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Components.reference_registry import create_reference_registry, LOOKUP_PREFIX
+    from Components.reference_reloader import Reference_Reloader
+    from config import Config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def test_dropdown_responses():
+    """Bodies equal the reference values; ETag and 304 handling."""
+
+    print("🧪 Testing pre-serialized dropdown responses")
+    print("=" * 60)
+
+    client = backend_app.app.test_client()
+    registry = backend_app.reference_data.current
+    config = backend_app.config
+
+    for name, column in config.LOOKUP_NAMES.items():
+        response = client.get(f'/api/lookup/{name}')
+        assert response.status_code == 200
+        assert response.get_json() == {'lookup': name,
+                                       'values': registry.get(LOOKUP_PREFIX + column).get_all()}
+        assert response.headers['ETag'] == f'"{registry.version}-lookup-{name}"'
+        assert response.headers['Cache-Control'] == f'public, max-age={config.LOOKUP_CACHE_MAX_AGE}'
+    print(f"✅ {len(config.LOOKUP_NAMES)} lookup responses match the reference tables")
+
+    fuel_types = client.get('/api/fuel_types').get_json()['fuel_types']
+    assert fuel_types == sorted({row['Fuel'] for row in registry.get('ef_fuel_use_co2').data
+                                 if row['Fuel'].strip()})
+    suppliers = client.get('/api/suppliers').get_json()['suppliers']
+    assert suppliers and all(supplier == supplier.strip() for supplier in suppliers)
+    print(f"✅ {len(fuel_types)} fuel types and {len(suppliers)} suppliers served")
+
+    for path in ('/api/lookup/Region', '/api/lookup/scope', '/api/fuel_types', '/api/suppliers'):
+        etag = client.get(path).headers['ETag']
+        response = client.get(path, headers={'If-None-Match': etag})
+        assert response.status_code == 304 and response.data == b'', path
+        assert response.headers['ETag'] == etag
+        assert client.get(path, headers={'If-None-Match': '"stale"'}).status_code == 200
+    assert client.get('/api/lookup/unknown').status_code == 404
+    print("✅ Matching If-None-Match answered with 304")
+    return True
+
+
+def test_etag_changes_on_reload():
+    """A reload that changes Supplier_List.csv changes the version (ETag) and the body."""
+
+    directory = tempfile.mkdtemp()
+    try:
+        data_dir = os.path.join(directory, 'data')
+        shutil.copytree(Config.DATA_DIR, data_dir)
+
+        class LookupTestConfig(Config):
+            DATA_DIR = data_dir
+            REFERENCE_SNAPSHOT_PATH = ''
+
+        config = LookupTestConfig()
+        reloader = Reference_Reloader(lambda: create_reference_registry(config))
+        before = reloader.current.get('lookup_responses').get('lookup/region')
+        previous_version = reloader.current.version
+
+        with open(config.get_csv_path('supplier_list'), 'a', encoding='utf-8') as file:
+            file.write('"Test Supplier - Test Product - Test City"\n')
+        assert reloader.reload(wait=True)['status'] == 'swapped'
+
+        registry = reloader.current
+        assert registry.version != previous_version
+        assert registry.get('lookup_responses').get('lookup/region') == before
+        assert b'Test Supplier - Test Product - Test City' in registry.get('lookup_responses').get('suppliers')
+        print(f"✅ Reload swapped in version {registry.version} with the new supplier")
+    finally:
+        shutil.rmtree(directory)
+    return True
+
+
+if __name__ == '__main__':
+    success = test_dropdown_responses() and test_etag_changes_on_reload()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Test script for the background mail queue behind /api/contact-admin.
+
+Runs against a local SMTP stand-in (a small threaded SMTP server speaking
+just enough of the protocol for smtplib) and checks that queued messages are
+delivered in batches over one reused connection, that temporary failures are
+retried with backoff while permanent rejections are not, that an unreachable
+server ends in failure after the retries, and that the endpoint returns as
+soon as the message is queued even when the mail server is slow.
+"""
+
+import sys
+import os
+import socketserver
+import threading
+import time
+from email import message_from_string
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Services.MailQueue import MailQueue
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Local SMTP server recording the messages it accepts."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, data_replies=(), delay=0.0):
+        """
+        Args:
+            data_replies (iterable): Replies to the first DATA commands (e.g. '451 Try again',
+                None to accept the message); every later message is accepted
+            delay (float): Seconds to wait before answering each DATA
+        """
+        super().__init__(('127.0.0.1', 0), SMTPStandInHandler)
+        self.data_replies = list(data_replies)
+        self.delay = delay
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SMTPStandInHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost SMTP stand-in')
+        envelope = {}
+        while True:
+            line = self.rfile.readline().decode().rstrip('\r\n')
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif command in ('HELO', 'NOOP', 'RSET'):
+                envelope = {} if command == 'RSET' else envelope
+                self.reply('250 OK')
+            elif command == 'MAIL':
+                envelope = {'sender': line.split(':', 1)[1].strip('<> '), 'recipients': []}
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                envelope['recipients'].append(line.split(':', 1)[1].strip('<> '))
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data_line = self.rfile.readline().decode()
+                    if data_line in ('.\r\n', ''):
+                        break
+                    lines.append(data_line[1:] if data_line.startswith('..') else data_line)
+                time.sleep(server.delay)
+                with server.lock:
+                    data_reply = server.data_replies.pop(0) if server.data_replies else None
+                    if data_reply is None:
+                        server.messages.append(dict(envelope, data=''.join(lines)))
+                self.reply(data_reply or '250 Queued')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+def make_queue(port, **options):
+    return MailQueue('127.0.0.1', port, starttls=False, timeout=5, **options)
+
+
+def test_batched_delivery_over_one_connection():
+    """25 queued messages are delivered over a single connection."""
+
+    print("🧪 Testing MailQueue")
+    print("=" * 60)
+
+    server = SMTPStandIn()
+    mail_queue = make_queue(server.port, batch_size=10)
+    try:
+        for i in range(25):
+            assert mail_queue.enqueue('system@example.com', ['admin@example.com'], f'Subject: Message {i}\r\n\r\nBody {i}')
+        assert mail_queue.wait_idle(timeout=10)
+        assert len(server.messages) == 25 and server.connections == 1
+        assert [message_from_string(m['data'])['Subject'] for m in server.messages] == \
+            [f'Message {i}' for i in range(25)]
+        assert mail_queue.stats() == {'pending': 0, 'sent': 25, 'failed': 0, 'retried': 0, 'connections': 1}
+    finally:
+        mail_queue.close()
+        server.shutdown()
+    print("✅ 25 messages delivered over one SMTP connection")
+    return True
+
+
+def test_retry_with_backoff():
+    """Temporary failures are retried; permanent rejections and dead servers fail."""
+
+    server = SMTPStandIn(data_replies=['451 Try again later', '421 Busy', None, '550 Mailbox unavailable'])
+    mail_queue = make_queue(server.port, backoff_seconds=0.05)
+    try:
+        start = time.perf_counter()
+        mail_queue.enqueue('system@example.com', ['admin@example.com'], 'Subject: Retried\r\n\r\nBody')
+        assert mail_queue.wait_idle(timeout=10)
+        elapsed = time.perf_counter() - start
+        assert mail_queue.sent == 1 and mail_queue.retried == 2 and elapsed >= 0.05 + 0.1
+        assert message_from_string(server.messages[0]['data'])['Subject'] == 'Retried'
+
+        mail_queue.enqueue('system@example.com', ['nobody@example.com'], 'Subject: Rejected\r\n\r\nBody')
+        assert mail_queue.wait_idle(timeout=10)
+        assert mail_queue.failed == 1 and mail_queue.retried == 2
+    finally:
+        mail_queue.close()
+        server.shutdown()
+    print("✅ 4xx replies retried with backoff, 5xx rejected without retry")
+
+    unused = SMTPStandIn()
+    port = unused.port
+    unused.shutdown()
+    unused.server_close()
+    mail_queue = make_queue(port, max_retries=2, backoff_seconds=0.01)
+    try:
+        mail_queue.enqueue('system@example.com', ['admin@example.com'], 'Subject: Lost\r\n\r\nBody')
+        assert mail_queue.wait_idle(timeout=10)
+        assert mail_queue.stats()['failed'] == 1 and mail_queue.retried == 2
+    finally:
+        mail_queue.close()
+    print("✅ Unreachable server: message fails after 2 retries")
+    return True
+
+
+def test_endpoint_does_not_block():
+    """/api/contact-admin returns before a slow mail server has answered."""
+
+    server = SMTPStandIn(delay=1.0)
+    config = backend_app.config
+    previous_queue = backend_app.mail_queue
+    original_settings = (config.ADMIN_TOKEN, config.MAIL_ADMIN_EMAIL, config.MAIL_SENDER)
+    backend_app.mail_queue = make_queue(server.port)
+    try:
+        client = backend_app.app.test_client()
+        form = {'firstName': 'Ada', 'lastName': 'Lovelace', 'email': 'ada@example.com',
+                'supplierName': 'Anchor Glass', 'location': 'Tampa', 'description': 'Please add us',
+                'subject': 'Account'}
+        # Nothing is queued until the addresses are configured
+        config.MAIL_ADMIN_EMAIL = config.MAIL_SENDER = ''
+        assert client.post('/api/contact-admin', json=form).status_code == 503
+        config.MAIL_ADMIN_EMAIL, config.MAIL_SENDER = 'admin@example.com', 'calculator@example.com'
+
+        start = time.perf_counter()
+        response = client.post('/api/contact-admin', json=form)
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 202 and elapsed < 0.5, elapsed
+        assert client.post('/api/contact-admin', json=dict(form, email='')).status_code == 400
+
+        assert backend_app.mail_queue.wait_idle(timeout=10)
+        message = message_from_string(server.messages[0]['data'])
+        assert message['Reply-To'] == 'ada@example.com' and message['Subject'] == 'New Account Request: Account'
+        assert server.messages[0]['recipients'] == ['admin@example.com']
+        assert server.messages[0]['sender'] == 'calculator@example.com'
+        assert client.get('/api/contact-admin/queue').status_code == 403
+        config.ADMIN_TOKEN = 'secret'
+        response = client.get('/api/contact-admin/queue', headers={'X-Admin-Token': 'secret'})
+        assert response.get_json()['sent'] == 1
+    finally:
+        config.ADMIN_TOKEN, config.MAIL_ADMIN_EMAIL, config.MAIL_SENDER = original_settings
+        backend_app.mail_queue.close()
+        backend_app.mail_queue = previous_queue
+        server.shutdown()
+    print(f"✅ Endpoint answered in {elapsed * 1000:.1f} ms while the server took 1 s")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_batched_delivery_over_one_connection() and test_retry_with_backoff()
+               and test_endpoint_does_not_block())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Test script for the /metrics endpoint and Services.Metrics.
+
+Checks the Prometheus text format of counters and histograms (cumulative
+buckets, label escaping), that a /api/compute_ghg_emissions request adds its
+latency, per-stage timings, rows, factor lookup hits/misses and zero-emission
+rows, that the series of other workers published through WorkerExchange are
+included with their pid and start time, and that the engine's lookup counts
+match the rows posted.
+"""
+
+import sys
+import os
+import json
+import re
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Services.Metrics import Metrics
+    from Services.SupplierEmissionsCalculator import SupplierEmissionsCalculator
+    from Services.WorkerExchange import WorkerExchange
+    from compute_payloads import build_activity_rows, supplier_data
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def sample_values(text, pid=None):
+    """
+    Metric line -> value of a Prometheus text exposition; with a pid, only the
+    series of that process, with the pid label removed.
+    """
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            if pid is not None:
+                if f'pid="{pid}"' not in name:
+                    continue
+                name = name.replace(f'{{pid="{pid}"}}', '').replace(f'pid="{pid}",', '')
+            samples[name] = float(value)
+    return samples
+
+
+def build_payload(registry):
+    # 5 rows with a factor, 3 without one and 2 without the fields to look one up
+    found = build_activity_rows(registry, 1)[0]
+    not_found = dict(found, Source_Description='Unknown vehicle', Vehicle_Type='Hovercraft')
+    missing_fields = {'Source_Description': 'No vehicle', 'Mode_of_Transport': 'Road', 'Scope': 'Scope 3'}
+    return {'supplier_data': supplier_data('Metrics Supplier'),
+            'activity_rows': [found] * 5 + [not_found] * 3 + [missing_fields] * 2}
+
+
+def test_render_format():
+    """Counters and histograms render in the Prometheus text format."""
+
+    print("🧪 Testing Services.Metrics")
+    print("=" * 60)
+
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.counter('jobs_total', 'Jobs done', ('queue',))
+    metrics.histogram('latency_seconds', 'Latency')
+    metrics.inc('jobs_total', queue='a "quoted"\\name')
+    metrics.inc('jobs_total', 2, queue='a "quoted"\\name')
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        metrics.observe('latency_seconds', seconds)
+
+    text = metrics.render()
+    assert '# TYPE jobs_total counter' in text and '# HELP latency_seconds Latency' in text
+    samples = sample_values(text)
+    assert samples['jobs_total{queue="a \\"quoted\\"\\\\name"}'] == 3
+    assert samples['latency_seconds_bucket{le="0.1"}'] == 2
+    assert samples['latency_seconds_bucket{le="1.0"}'] == 3
+    assert samples['latency_seconds_bucket{le="+Inf"}'] == 4
+    assert samples['latency_seconds_count'] == 4 and abs(samples['latency_seconds_sum'] - 3.65) < 1e-9
+    try:
+        metrics.inc('jobs_total')
+        raise AssertionError('Missing label accepted')
+    except KeyError:
+        pass
+    print("✅ Cumulative buckets, sums, counts and escaped labels")
+    return True
+
+
+def test_compute_metrics():
+    """A compute request adds latency, stage timings, rows and lookup counts."""
+
+    client = backend_app.app.test_client()
+    pid = os.getpid()
+    before = sample_values(client.get('/metrics').get_data(as_text=True), pid)
+    response = client.post('/api/compute_ghg_emissions?profile=summary',
+                           json=build_payload(backend_app.reference_data.current))
+    assert response.status_code == 200
+
+    metrics_response = client.get('/metrics')
+    assert metrics_response.status_code == 200 and metrics_response.mimetype == 'text/plain'
+    after = sample_values(metrics_response.get_data(as_text=True), pid)
+    assert 0 < after['process_start_time_seconds'] <= time.time()
+
+    def added(sample):
+        return after.get(sample, 0) - before.get(sample, 0)
+
+    route = 'http_request_duration_seconds_count{method="POST",route="/api/compute_ghg_emissions",status="200"}'
+    assert added(route) == 1
+    for stage in ('parse', 'supplier_input', 'emissions', 'summary', 'serialization'):
+        assert added(f'ghg_compute_stage_duration_seconds_count{{stage="{stage}"}}') == 1
+        assert after[f'ghg_compute_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}}'] >= 1
+    assert added('ghg_compute_rows_total') == 10
+    assert added('ghg_factor_cache_lookups_total{result="hit"}') + added(
+        'ghg_factor_cache_lookups_total{result="miss"}') == 8
+    assert added('ghg_factor_lookups_total{result="found"}') == 5
+    assert added('ghg_factor_lookups_total{result="not_found"}') == 3
+    assert added('ghg_zero_emission_rows_total{reason="no_factor"}') == 3
+    assert added('ghg_zero_emission_rows_total{reason="missing_fields"}') == 2
+
+    # Answered from the result cache: latency is recorded, no calculation is
+    client.post('/api/compute_ghg_emissions?profile=summary', json=build_payload(backend_app.reference_data.current))
+    cached = sample_values(client.get('/metrics').get_data(as_text=True), pid)
+    assert cached[route] == after[route] + 1
+    assert cached['ghg_compute_rows_total'] == after['ghg_compute_rows_total']
+
+    assert re.search(r'route="unmatched"', client.get('/metrics').get_data(as_text=True)) is None
+    client.get('/api/does-not-exist')
+    assert 'route="unmatched",status="404"' in client.get('/metrics').get_data(as_text=True)
+    print("✅ /metrics reports compute latency, stages, rows and lookups")
+    return True
+
+
+def test_worker_metrics():
+    """Series of every worker are reported, labelled by pid, through the exchange."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        exchange = WorkerExchange(directory)
+        worker = Metrics(buckets=(0.1,), process_label='pid')
+        worker.counter('jobs_total', 'Jobs done', ('queue',))
+        worker.histogram('latency_seconds', 'Latency')
+        worker.inc('jobs_total', 4, queue='a')
+        worker.observe('latency_seconds', 0.05)
+        exported = worker.export()
+        # Another worker's export as published (pid 1 stands in for it)
+        with open(os.path.join(directory, 'metrics-1.json'), 'w') as file:
+            json.dump(exported, file)
+        exchange.publish('metrics', exported)
+        assert set(exchange.collect('metrics')) == {1, os.getpid()}
+
+        worker.inc('jobs_total', queue='a')
+        samples = sample_values(worker.render(exchange.collect('metrics')))
+        assert samples['jobs_total{pid="1",queue="a"}'] == 4
+        assert samples[f'jobs_total{{pid="{os.getpid()}",queue="a"}}'] == 5, "own values are live"
+        assert samples['latency_seconds_bucket{pid="1",le="0.1"}'] == 1
+        assert samples['process_start_time_seconds{pid="1"}'] == exported['started_at']
+
+        exchange.remove_worker(1)
+        assert set(exchange.collect('metrics')) == {os.getpid()}
+        worker.reset()
+        samples = sample_values(worker.render())
+        assert f'jobs_total{{pid="{os.getpid()}",queue="a"}}' not in samples
+        assert samples[f'process_start_time_seconds{{pid="{os.getpid()}"}}'] >= exported['started_at']
+    print("✅ Workers' series merged with a pid label and a start time gauge")
+    return True
+
+
+def test_calculator_stats():
+    """SupplierEmissionsCalculator fills in stage timings and engine counts."""
+
+    registry = backend_app.reference_data.current
+    payload = build_payload(registry)
+    stats = {}
+    SupplierEmissionsCalculator(registry).calculate(payload['supplier_data'], payload['activity_rows'],
+                                                    profile='summary', stats=stats)
+    assert set(stats['stages']) == {'supplier_input', 'emissions', 'summary'}
+    assert all(seconds >= 0 for seconds in stats['stages'].values())
+    assert stats['factor_cache_hits'] + stats['factor_cache_misses'] == 8
+    assert stats['factors_not_found'] == 3 and stats['rows_without_factor_key'] == 2
+
+    # Counts accumulate over the chunks of a progress-reporting calculation
+    chunked = {}
+    SupplierEmissionsCalculator(registry).calculate(payload['supplier_data'], payload['activity_rows'] * 300,
+                                                    profile='summary', progress=lambda done, total: None,
+                                                    stats=chunked)
+    assert chunked['factors_not_found'] == 900 and chunked['rows_without_factor_key'] == 600
+    print("✅ Stage timings and lookup counts per calculation")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_render_format() and test_compute_metrics() and test_worker_metrics()
+               and test_calculator_stats())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Test script for the prefork serving entry point (backend/serve.py).
+
+Starts serve.py with two workers on a free port and checks that the workers
+answer requests, that the reference data loaded in the master is shared
+copy-on-write (most of each worker's memory is shared with the master and
+the other worker), that each worker computes batches on its own process
+pool, that /metrics and the profiler cover both workers, that a killed
+worker is replaced (its pool exits and the job it was computing is failed,
+other workers' jobs are not), and that SIGTERM shuts everything
+down cleanly.
+Linux only (reads /proc).
+"""
+
+import sys
+import os
+import http.client
+import json
+import signal
+import socket
+import sqlite3
+import subprocess
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import serve
+    from Services.JobStore import JobStore
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def request(port, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = dict(headers or {}, **({'Content-Type': 'application/json'} if body is not None else {}))
+    connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def memory(pid):
+    """Rss, shared and private memory (kB) of a process from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as smaps:
+        for line in smaps:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'):
+                values[key] = int(value.split()[0])
+    return {'rss': values['Rss'], 'shared': values['Shared_Clean'] + values['Shared_Dirty'],
+            'private': values['Private_Clean'] + values['Private_Dirty']}
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as children:
+        return [int(pid) for pid in children.read().split()]
+
+
+def start_server(port, log, state_dir):
+    env = dict(os.environ, FLASK_ENV='production', PORT=str(port), SERVER_WORKERS='2', SERVER_THREADS='4',
+               BATCH_WORKERS='2', WORKER_STATE_DIR=state_dir, WORKER_SYNC_INTERVAL='0.2',
+               ADMIN_TOKEN='secret', JOB_STORE_PATH=os.path.join(state_dir, 'jobs', 'jobs.sqlite3'))
+    process = subprocess.Popen([sys.executable, 'serve.py'], cwd=backend_path, env=env,
+                               stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if request(port, 'GET', '/api/bootstrap')[0] == 200:
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise AssertionError('serve.py did not start')
+
+
+def test_prefork_server():
+    """Two workers serve requests and share the reference data with the master."""
+
+    print("🧪 Testing serve.py")
+    print("=" * 60)
+
+    port = free_port()
+    with tempfile.TemporaryFile('w+') as log, tempfile.TemporaryDirectory() as state_dir:
+        process = start_server(port, log, state_dir)
+        try:
+            payload = {
+                'supplier_data': {'Supplier_and_Container': 'Prefork Supplier', 'Container_Weight': 12.5,
+                                  'Number_Of_Containers': 100},
+                'activity_rows': [{'Source_Description': 'Leg', 'Region': 'US', 'Mode_of_Transport': 'Road',
+                                   'Scope': 'Scope 3', 'Vehicle_Type': 'Light-Duty Truck',
+                                   'Distance_Travelled': 100, 'Total_Weight_Of_Freight_InTonne': 2.5,
+                                   'Units_of_Measurement': 'Tonne Mile'}]
+            }
+            for _ in range(40):
+                status, body = request(port, 'POST', '/api/compute_ghg_emissions', payload)
+                assert status == 200 and json.loads(body)['status'] == 'success'
+                assert request(port, 'GET', '/api/vehicle_and_size?region=US&mode_of_transport=Road')[0] == 200
+
+            workers = worker_pids(process.pid)
+            assert len(workers) == 2
+            master_memory = memory(process.pid)
+            for pid in workers:
+                worker_memory = memory(pid)
+                print(f"   worker {pid}: {worker_memory['rss']} kB resident, "
+                      f"{worker_memory['shared']} kB shared, {worker_memory['private']} kB private")
+                assert worker_memory['shared'] > worker_memory['private']
+            print(f"   master {process.pid}: {master_memory['rss']} kB resident")
+            print("✅ Workers serve requests from shared copy-on-write memory")
+
+            # Batch processes are forked by each worker when it starts
+            pools = {pid: worker_pids(pid) for pid in workers}
+            assert all(len(children) >= 2 for children in pools.values()), pools
+            for _ in range(4):
+                status, body = request(port, 'POST', '/api/compute_ghg_emissions/batch',
+                                       {'suppliers': [payload] * 8})
+                assert status == 200 and json.loads(body)['portfolio_total']['failed_suppliers'] == 0
+            print("✅ Batches computed on the workers' process pools")
+
+            # Whichever worker answers, /metrics reports both (labelled by pid)
+            time.sleep(0.5)
+            text = request(port, 'GET', '/metrics')[1].decode()
+            started = {int(line.split('"')[1]) for line in text.splitlines()
+                       if line.startswith('process_start_time_seconds{')}
+            assert started == set(workers), (started, workers)
+            computed = sum(float(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+                           if line.startswith('http_request_duration_seconds_count{')
+                           and 'route="/api/compute_ghg_emissions"' in line)
+            assert computed == 40, computed
+            print("✅ /metrics reports the requests of both workers")
+
+            admin = {'X-Admin-Token': 'secret'}
+            assert request(port, 'POST', '/api/admin/profiler/start', headers=admin)[0] == 200
+            time.sleep(0.5)
+            stats = json.loads(request(port, 'GET', '/api/admin/profiler/stats', headers=admin)[1])
+            assert set(stats['workers']) == {str(pid) for pid in workers}
+            assert all(worker['running'] for worker in stats['workers'].values())
+            request(port, 'POST', '/api/admin/profiler/stop', headers=admin)
+            time.sleep(0.5)
+            stats = json.loads(request(port, 'GET', '/api/admin/profiler/stats', headers=admin)[1])
+            assert not stats['running'], stats
+            print("✅ Profiler started and stopped in both workers")
+
+            # A job of each worker; only the one of the killed worker may be failed
+            job_store = os.path.join(state_dir, 'jobs', 'jobs.sqlite3')
+            store = JobStore(job_store)
+            worker_jobs = {}
+            for pid in workers:
+                worker_jobs[pid] = store.create(b'{}', 10, 'summary', 'v1', owner_pid=pid)
+                store.start(worker_jobs[pid])
+
+            # Stop the worker that took a job while the job is unfinished (a
+            # stopped worker may hold the store's write lock), then kill it
+            job_payload = dict(payload, activity_rows=payload['activity_rows'] * 20000)
+            for _ in range(10):
+                job_id = json.loads(request(port, 'POST', '/api/jobs', job_payload)[1])['job_id']
+                with sqlite3.connect(job_store) as connection:
+                    victim = connection.execute('SELECT owner_pid FROM jobs WHERE job_id = ?', (job_id,)).fetchone()[0]
+                connection.close()
+                os.kill(victim, signal.SIGSTOP)
+                if json.loads(request(port, 'GET', f'/api/jobs/{job_id}')[1])['status'] in ('queued', 'running'):
+                    break
+                os.kill(victim, signal.SIGCONT)
+            else:
+                raise AssertionError('Every job finished before its worker was stopped')
+            survivor = next(pid for pid in workers if pid != victim)
+
+            os.kill(victim, signal.SIGKILL)
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and (len(worker_pids(process.pid)) < 2
+                                                   or victim in worker_pids(process.pid)):
+                time.sleep(0.1)
+            replaced = worker_pids(process.pid)
+            assert len(replaced) == 2 and victim not in replaced and survivor in replaced
+            assert not [name for name in os.listdir(state_dir) if name.endswith(f'-{victim}.json')]
+            assert request(port, 'GET', '/api/bootstrap')[0] == 200
+            job = json.loads(request(port, 'GET', f'/api/jobs/{job_id}')[1])
+            assert job['status'] == 'failed' and 'exited' in job['error'], job
+            assert store.get(worker_jobs[victim])['status'] == 'failed'
+            assert store.get(worker_jobs[survivor])['status'] == 'running', "A live worker's job was failed"
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and any(os.path.exists(f'/proc/{pid}') for pid in pools[victim]):
+                time.sleep(0.1)
+            assert not any(os.path.exists(f'/proc/{pid}') for pid in pools[victim])
+            print("✅ A killed worker is replaced, its job failed and its process pool exits")
+        finally:
+            process.send_signal(signal.SIGTERM)
+            return_code = process.wait(timeout=30)
+        assert return_code == 0
+        log.seek(0)
+        assert 'Serving on' in log.read()
+    print("✅ SIGTERM stops the master and its workers")
+    return True
+
+
+def test_pooled_server_config():
+    """Worker and thread counts come from config.py, in the class named by FLASK_ENV."""
+
+    from config import get_config, DevelopmentConfig, ProductionConfig
+    config = get_config('production')
+    assert isinstance(config, ProductionConfig)
+    # app.py and serve.py both take the configuration class from FLASK_ENV
+    flask_env = os.environ.get('FLASK_ENV')
+    try:
+        os.environ['FLASK_ENV'] = 'production'
+        assert isinstance(get_config(), ProductionConfig)
+        os.environ.pop('FLASK_ENV')
+        assert isinstance(get_config(), DevelopmentConfig)
+    finally:
+        if flask_env is not None:
+            os.environ['FLASK_ENV'] = flask_env
+    assert config.SERVER_WORKERS >= 1 and config.SERVER_THREADS >= 1
+    assert issubclass(serve.PooledWSGIServer, serve.BaseWSGIServer)
+    print(f"✅ Defaults: {config.SERVER_WORKERS} workers x {config.SERVER_THREADS} threads")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_pooled_server_config() and test_prefork_server()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Test script for request profiling: the sampling profiler served by
+/api/admin/profiler and ?cprofile=1 on /api/compute_ghg_emissions.
+
+Checks that the sampling profiler only records the stacks of threads serving
+requests, in the collapsed-stack format with the calculator frames, that it
+can be started, stopped and cleared through the admin endpoints (only with
+the admin token), also in the other workers of serve.py whose stacks are
+summed into the dump, and that a ?cprofile=1 request returns its top functions
+while being disabled unless COMPUTE_CPROFILE_ENABLED is set.
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Services.SamplingProfiler import SamplingProfiler
+    from Services.CallProfile import CallProfile
+    from Services.WorkerExchange import WorkerExchange
+    from compute_payloads import build_payload
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def busy_request(profiler, stop):
+    profiler.enter()
+    try:
+        while not stop.is_set():
+            sum(i * i for i in range(1000))
+    finally:
+        profiler.leave()
+
+
+def test_sampling_profiler():
+    """Only threads marked with enter() are sampled."""
+
+    print("🧪 Testing SamplingProfiler")
+    print("=" * 60)
+
+    profiler = SamplingProfiler(interval=0.002)
+    stop = threading.Event()
+    marked = threading.Thread(target=busy_request, args=(profiler, stop))
+    unmarked = threading.Thread(target=lambda: stop.wait())
+    assert profiler.start() and not profiler.start()
+    marked.start()
+    unmarked.start()
+    time.sleep(0.3)
+    stop.set()
+    marked.join()
+    unmarked.join()
+    profiler.stop()
+
+    stats = profiler.stats()
+    assert not stats['running'] and stats['samples'] > 10 and stats['dropped_samples'] == 0
+    lines = profiler.collapsed().splitlines()
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == stats['samples']
+    assert all('busy_request (' in line for line in lines)
+    assert all(';' in line.rsplit(' ', 1)[0] for line in lines)
+    print(f"✅ {stats['samples']} samples of the request thread in {stats['sampling_seconds'] * 1000:.1f} ms")
+
+    bounded = SamplingProfiler(max_stacks=0)
+    bounded.enter()
+    bounded.sample()
+    assert bounded.stats()['dropped_samples'] == 1 and bounded.collapsed() == ''
+    profiler.clear()
+    assert profiler.stats()['samples'] == 0 and profiler.collapsed() == ''
+    print("✅ Bounded distinct stacks, clear() resets")
+    return True
+
+
+def test_profiler_endpoints():
+    """Requests are sampled between /api/admin/profiler/start and /stop."""
+
+    client = backend_app.app.test_client()
+    payload = build_payload(backend_app.reference_data.current, 3000, 'Profiled Supplier')
+    profiler = backend_app.sampling_profiler
+    profiler.interval = 0.002
+    config = backend_app.config
+    original_token = config.ADMIN_TOKEN
+    try:
+        config.ADMIN_TOKEN = ''
+        assert client.post('/api/admin/profiler/start').status_code == 403
+        config.ADMIN_TOKEN = 'secret'
+        assert client.post('/api/admin/profiler/start').status_code == 403
+        client.environ_base['HTTP_X_ADMIN_TOKEN'] = 'secret'
+
+        assert client.post('/api/admin/profiler/start').get_json()['running']
+        for row_count in range(3000, 3010):
+            # Different payloads so the result cache does not answer
+            assert client.post('/api/compute_ghg_emissions', json=dict(
+                payload, activity_rows=payload['activity_rows'][:row_count])).status_code == 200
+        stats = client.post('/api/admin/profiler/stop').get_json()
+        assert not stats['running'] and stats['samples'] > 0
+
+        response = client.get('/api/admin/profiler?reset=1')
+        assert response.status_code == 200 and response.mimetype == 'text/plain'
+        assert int(response.headers['X-Profiler-Samples']) == stats['samples']
+        stacks = response.get_data(as_text=True)
+        assert 'compute_ghg_emissions (app.py:' in stacks
+        assert 'calculate (Services/GhgEmissionsEngine.py:' in stacks or \
+            'calculate (Services/SupplierEmissionsCalculator.py:' in stacks
+        assert client.get('/api/admin/profiler/stats').get_json()['samples'] == 0
+        assert client.delete('/api/admin/profiler').status_code == 200
+        assert client.post('/api/admin/profiler/pause').status_code == 404
+    finally:
+        config.ADMIN_TOKEN = original_token
+    print(f"✅ {stats['samples']} samples from compute requests, collapsed stacks served")
+    return True
+
+
+def test_profiler_across_workers():
+    """Under serve.py requests reach every worker and dumps sum their stacks."""
+
+    client = backend_app.app.test_client()
+    config = backend_app.config
+    original_token = config.ADMIN_TOKEN
+    directory = tempfile.mkdtemp()
+    try:
+        config.ADMIN_TOKEN = 'secret'
+        client.environ_base['HTTP_X_ADMIN_TOKEN'] = 'secret'
+        exchange = backend_app.worker_exchange = WorkerExchange(directory)
+        # Another worker's published profiler (pid 1 stands in for it)
+        other = {'stats': dict(backend_app.sampling_profiler.stats(), running=True, samples=5),
+                 'stacks': {'handle (werkzeug/serving.py:1);compute (app.py:2)': 5}}
+        with open(os.path.join(directory, 'profiler-1.json'), 'w') as file:
+            json.dump(other, file)
+
+        assert client.delete('/api/admin/profiler').status_code == 200
+        response = client.get('/api/admin/profiler')
+        assert response.headers['X-Profiler-Workers'] == '2' and response.headers['X-Profiler-Samples'] == '5'
+        assert response.get_data(as_text=True) == 'handle (werkzeug/serving.py:1);compute (app.py:2) 5\n'
+        stats = client.get('/api/admin/profiler/stats').get_json()
+        assert stats['running'] and set(stats['workers']) == {'1', str(os.getpid())}
+
+        # Requests are stored for the other workers and applied here at once
+        assert client.post('/api/admin/profiler/start').status_code == 200
+        assert exchange.get_control('profiler')['running'] and backend_app.sampling_profiler.running
+        generation = exchange.get_control('profiler')['generation']
+        client.get('/api/admin/profiler?reset=1')
+        assert exchange.get_control('profiler')['generation'] == generation + 1
+
+        # A stop requested through another worker is applied on the next sync,
+        # which publishes this worker's state
+        exchange.set_control('profiler', dict(exchange.get_control('profiler'), running=False))
+        backend_app.sync_worker_state()
+        assert not backend_app.sampling_profiler.running
+        published = exchange.collect('profiler')[os.getpid()]
+        assert published['stats']['running'] is False
+        assert set(exchange.collect('metrics')) == {os.getpid()}
+    finally:
+        backend_app.sampling_profiler.stop()
+        backend_app.worker_exchange = None
+        config.ADMIN_TOKEN = original_token
+        shutil.rmtree(directory)
+    print("✅ Profiler requests reach every worker; stacks summed over workers")
+    return True
+
+
+def test_compute_cprofile():
+    """?cprofile=1 returns the request's top functions when enabled."""
+
+    client = backend_app.app.test_client()
+    payload = build_payload(backend_app.reference_data.current, 500, 'Profiled Supplier')
+    config = backend_app.config
+    enabled = config.COMPUTE_CPROFILE_ENABLED
+    original_token = config.ADMIN_TOKEN
+    try:
+        config.ADMIN_TOKEN = 'secret'
+        client.environ_base['HTTP_X_ADMIN_TOKEN'] = 'secret'
+        config.COMPUTE_CPROFILE_ENABLED = False
+        assert client.post('/api/compute_ghg_emissions?cprofile=1', json=payload).status_code == 403
+
+        config.COMPUTE_CPROFILE_ENABLED = True
+        expected = client.post('/api/compute_ghg_emissions', json=payload).get_json()
+        response = client.post('/api/compute_ghg_emissions?cprofile=1', json=payload)
+        assert response.status_code == 200 and 'X-Result-Cache' not in response.headers
+        report = response.get_json()
+        cprofile = report.pop('cprofile')
+        assert report == expected
+        assert cprofile['sort'] == 'cumulative' and len(cprofile['functions']) == config.COMPUTE_CPROFILE_TOP
+        assert cprofile['wall_seconds'] >= cprofile['profiled_seconds'] > 0
+        cumtimes = [function['cumtime'] for function in cprofile['functions']]
+        assert cumtimes == sorted(cumtimes, reverse=True)
+        names = [function['function'] for function in cprofile['functions']]
+        assert any(name.startswith('calculate (Services/SupplierEmissionsCalculator.py:') for name in names)
+
+        by_time = client.post('/api/compute_ghg_emissions?cprofile=tottime', json=payload).get_json()['cprofile']
+        tottimes = [function['tottime'] for function in by_time['functions']]
+        assert by_time['sort'] == 'tottime' and tottimes == sorted(tottimes, reverse=True)
+        assert client.post('/api/compute_ghg_emissions?cprofile=slowest', json=payload).status_code == 400
+    finally:
+        config.COMPUTE_CPROFILE_ENABLED = enabled
+        config.ADMIN_TOKEN = original_token
+
+    call_profile = CallProfile(top=5, sort='calls')
+    assert call_profile.run(sorted, [3, 1, 2]) == [1, 2, 3]
+    assert call_profile.to_dict()['functions'][0]['calls'] >= 1
+    print(f"✅ cProfile of one request: {cprofile['function_count']} functions, "
+          f"top {names[0]} ({cprofile['functions'][0]['cumtime']:.3f} s)")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_sampling_profiler() and test_profiler_endpoints() and test_profiler_across_workers()
+               and test_compute_cprofile())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the hash-indexed reference lookups.
+
+Verifies that every Reference_EF_* get_by_* method returns exactly the rows a
+full case-insensitive scan of the loaded data would return, for every
+(key, region) pair in the reference files plus a few mixed-case variants.
+"""
+
+import sys
+import os
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.reference_ef import (Reference_EF_Public, Reference_EF_Freight_CO2, Reference_EF_Freight_CH4_NO2,
+                                         Reference_EF_Road, Reference_EF_Fuel_Use_CH4_N2O, Reference_EF_Fuel_Use_CO2)
+    from config import get_config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+# (csv key, reference class, key column, lookup method name)
+REFERENCE_TABLES = [
+    ('ef_fuel_use_co2', Reference_EF_Fuel_Use_CO2,
+     'Fuel', 'get_by_fuel_and_region'),
+    ('ef_fuel_use_ch4_n2o', Reference_EF_Fuel_Use_CH4_N2O,
+     'Transport and Fuel', 'get_by_transport_and_region'),
+    ('ef_road', Reference_EF_Road,
+     'Vehicle and Fuel and Vehicle Year', 'get_by_vehicle_and_region'),
+    ('ef_public', Reference_EF_Public,
+     'Vehicle and Type', 'get_by_vehicle_and_region'),
+    ('ef_freight_co2', Reference_EF_Freight_CO2,
+     'Vehicle and Size', 'get_by_vehicle_and_region'),
+    ('ef_freight_ch4_no2', Reference_EF_Freight_CH4_NO2,
+     'Vehicle Type', 'get_by_vehicle_and_region'),
+]
+
+
+def scan(reference, key_column, key, region):
+    """Reference implementation: the original full-table scan."""
+    return [
+        row for row in reference.data
+        if row[key_column].strip().lower() == key.strip().lower()
+        and row['Region'].strip().lower() == region.strip().lower()
+    ]
+
+
+def test_indexed_lookups_match_scan():
+    """Indexed lookups must return the same rows, in the same order, as a scan."""
+
+    print("🧪 Testing indexed reference lookups")
+    print("=" * 60)
+
+    config = get_config()
+    checked = 0
+
+    for csv_key, reference_class, key_column, method_name in REFERENCE_TABLES:
+        reference = reference_class(config.get_csv_path(csv_key))
+        lookup = getattr(reference, method_name)
+
+        for row in reference.data:
+            key, region = row[key_column], row['Region']
+            for key_variant, region_variant in [(key, region),
+                                                (f"  {key.upper()} ", region.lower())]:
+                expected = scan(reference, key_column,
+                                key_variant, region_variant)
+                actual = lookup(key_variant, region_variant)
+                assert actual == expected, \
+                    f"{reference_class.__name__}: mismatch for ({key_variant!r}, {region_variant!r})"
+                checked += 1
+
+        assert lookup('No Such Vehicle', 'Nowhere') == []
+        print(f"✅ {reference_class.__name__}: {len(reference.data)} rows verified")
+
+    print(f"\n✅ {checked} lookups matched the full-scan results")
+    return True
+
+
+def test_lookup_results_are_independent_lists():
+    """Callers may mutate the returned list without corrupting the index."""
+
+    config = get_config()
+    reference = Reference_EF_Freight_CO2(config.get_csv_path('ef_freight_co2'))
+    row = reference.data[0]
+
+    first = reference.get_by_vehicle_and_region(
+        row['Vehicle and Size'], row['Region'])
+    first.clear()
+    second = reference.get_by_vehicle_and_region(
+        row['Vehicle and Size'], row['Region'])
+
+    assert second, "Index bucket was modified through a returned list"
+    print("✅ Returned lists are independent of the index")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_indexed_lookups_match_scan() and test_lookup_results_are_independent_lists()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy reference-data registry.
+
+Checks that creating the registry loads nothing, that get() loads a table
+(and its dependencies) once even under concurrent access, and that preload()
+loads every table on a thread pool and reports per-table load times.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.reference_registry import Reference_Registry, create_reference_registry, LOOKUP_PREFIX
+    from Components.reference_ef import Reference_EF_Freight_CO2
+    from config import get_config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def make_config(snapshot_path=''):
+    config = get_config()
+    config.REFERENCE_SNAPSHOT_PATH = snapshot_path
+    config.REFERENCE_LOAD_WORKERS = 4
+    return config
+
+
+def test_lazy_loading():
+    """Tables load on first access only, dependencies included."""
+
+    print("🧪 Testing lazy reference registry")
+    print("=" * 60)
+
+    registry = create_reference_registry(make_config())
+    assert registry.tables == {}, "Creating the registry must not load tables"
+    assert 'ef_freight_co2' in registry and LOOKUP_PREFIX + 'Scope' in registry
+    print(f"✅ {len(registry.names)} tables registered, none loaded")
+
+    engine = registry.get('ghg_emissions_engine')
+    assert set(registry.tables) == {'ghg_emissions_engine', 'ef_freight_co2', 'ef_fuel_use_co2',
+                                    'ef_fuel_use_ch4_n2o', 'unit_conversion'}
+    assert engine.resolved_factors['CO2'].references['freight'] is registry.get('ef_freight_co2')
+    print("✅ Engine loaded with its four dependencies and shares their instances")
+
+    status = registry.status()
+    assert status['ghg_emissions_engine']['source'] == 'csv'
+    assert status['ghg_emissions_engine']['load_ms'] > 0
+    assert status['ef_public'] == {'loaded': False, 'source': None, 'load_ms': None}
+
+    try:
+        registry.get('no_such_table')
+        assert False, "Unknown table must raise KeyError"
+    except KeyError:
+        pass
+    return True
+
+
+def test_concurrent_get_builds_once():
+    """Concurrent first access builds a table exactly once."""
+
+    config = make_config()
+    registry = Reference_Registry()
+    builds = []
+
+    def build(csv_path):
+        builds.append(csv_path)
+        return Reference_EF_Freight_CO2(csv_path)
+
+    registry.register('ef_freight_co2',
+                      config.get_csv_path('ef_freight_co2'), build)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('ef_freight_co2')))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1, f"Table built {len(builds)} times"
+    assert all(result is results[0] for result in results)
+    print("✅ 8 concurrent first accesses built the table once")
+    return True
+
+
+def test_parallel_preload_with_snapshot():
+    """preload() loads every table and a second registry loads them from the snapshot."""
+
+    directory = tempfile.mkdtemp()
+    try:
+        config = make_config(os.path.join(directory, 'snapshot.pickle'))
+
+        cold = create_reference_registry(config).preload()
+        assert all(entry['loaded'] for entry in cold.values())
+        assert {entry['source'] for entry in cold.values()} == {'csv'}
+        assert os.path.exists(config.REFERENCE_SNAPSHOT_PATH)
+
+        registry = create_reference_registry(config)
+        warm = registry.preload()
+        assert {entry['source'] for entry in warm.values()} == {'snapshot'}
+        engine = registry.get('ghg_emissions_engine')
+        assert engine.resolved_factors['CH4'].references['fuel'] is registry.get('ef_fuel_use_ch4_n2o')
+
+        for name, entry in warm.items():
+            print(f"   {name}: {entry['load_ms']} ms from {entry['source']}")
+        print(f"✅ Preloaded {len(warm)} tables (cold from CSV, warm from snapshot)")
+    finally:
+        shutil.rmtree(directory)
+    return True
+
+
+if __name__ == '__main__':
+    success = test_lazy_loading() and test_concurrent_get_builds_once() and test_parallel_preload_with_snapshot()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test script for hot reloading of the reference CSVs.
+
+Works on a temporary copy of the data directory: edits an emission factor,
+reloads, and checks that the new version is swapped in while a registry held
+by an in-flight request keeps the old factors, that unchanged or broken CSVs
+keep the current version, that a CSV edited before its table is lazily loaded
+is rejected and reloaded as a new version, and that the mtime watcher picks
+up edits.
+"""
+
+import sys
+import os
+import csv
+import shutil
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.reference_registry import create_reference_registry
+    from Components.reference_reloader import Reference_Reloader
+    from Components.reference_snapshot import SourceChangedError
+    from config import Config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def make_config(data_dir):
+    class ReloadTestConfig(Config):
+        DATA_DIR = data_dir
+        REFERENCE_SNAPSHOT_PATH = os.path.join(data_dir, 'snapshot.pickle')
+        REFERENCE_LOAD_WORKERS = 4
+    return ReloadTestConfig()
+
+
+def scale_freight_co2(config, scale):
+    """Multiply every CO2 factor in the freight CSV by scale."""
+    csv_path = config.get_csv_path('ef_freight_co2')
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as file:
+        reader = csv.DictReader(file)
+        header = reader.fieldnames
+        rows = list(reader)
+    for row in rows:
+        try:
+            row['CO2'] = repr(float(row['CO2']) * scale)
+        except (ValueError, TypeError):
+            pass
+    with open(csv_path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def first_freight_factor(registry):
+    reference = registry.get('ef_freight_co2')
+    row = next(row for row in reference.data if row['CO2'])
+    return registry.get('ghg_emissions_engine').get_factors(
+        'freight', row['Vehicle and Size'], row['Region'], 'Tonne Mile')[0]
+
+
+def test_reload_swaps_new_version():
+    """Edited CSVs are swapped in; registries already in use keep their factors."""
+
+    print("🧪 Testing reference data hot reload")
+    print("=" * 60)
+
+    directory = tempfile.mkdtemp()
+    try:
+        data_dir = os.path.join(directory, 'data')
+        shutil.copytree(Config.DATA_DIR, data_dir)
+        config = make_config(data_dir)
+        reloader = Reference_Reloader(lambda: create_reference_registry(config))
+
+        in_flight = reloader.current
+        original_version = in_flight.version
+        original_factor = first_freight_factor(in_flight)
+        assert original_factor > 0
+
+        status = reloader.reload(wait=True)
+        assert status['status'] == 'unchanged' and reloader.current is in_flight
+        print(f"✅ Reload with unchanged CSVs kept version {original_version}")
+
+        scale_freight_co2(config, 2.0)
+        status = reloader.reload(wait=True)
+        assert status['status'] == 'swapped', status
+        assert reloader.current is not in_flight
+        assert reloader.current.version != original_version
+        assert all(entry['loaded'] for entry in reloader.current.status().values()), \
+            "Swapped registry must be fully loaded"
+        assert abs(first_freight_factor(reloader.current) - 2 * original_factor) < 1e-12
+        assert first_freight_factor(in_flight) == original_factor
+        assert in_flight.version == original_version
+        print(f"✅ Edited CSV swapped in as version {reloader.current.version}; "
+              f"in-flight registry kept {original_version}")
+
+        swapped = reloader.current
+        with open(config.get_csv_path('unit_conversion'), 'w', encoding='utf-8') as file:
+            file.write('not,a,conversion,matrix\n')
+        status = reloader.reload(wait=True)
+        assert status['status'] == 'failed' and status['error']
+        assert reloader.current is swapped
+        print("✅ Broken CSV left the current version serving")
+    finally:
+        shutil.rmtree(directory)
+    return True
+
+
+def test_lazy_load_of_edited_csv():
+    """A CSV edited after the version was computed is not loaded under that version."""
+
+    directory = tempfile.mkdtemp()
+    try:
+        data_dir = os.path.join(directory, 'data')
+        shutil.copytree(Config.DATA_DIR, data_dir)
+        config = make_config(data_dir)
+        reloader = Reference_Reloader(lambda: create_reference_registry(config))
+        stale = reloader.current
+        original_version = stale.version
+
+        # Nothing is loaded yet; the edit lands before the first lazy load
+        scale_freight_co2(config, 2.0)
+        try:
+            stale.get('ef_freight_co2')
+            raise AssertionError('Table built from the edited CSV was loaded under the old version')
+        except SourceChangedError as e:
+            assert e.name == 'ef_freight_co2' and e.paths == [config.get_csv_path('ef_freight_co2')]
+        assert 'ef_freight_co2' not in stale.snapshot.entries
+        assert stale.status()['ef_freight_co2']['loaded'] is False
+
+        # The failed load started a reload of the edited CSV
+        reloader.reload(wait=True)
+        assert reloader.current is not stale and reloader.current.version != original_version
+        assert reloader.current.status()['ef_freight_co2']['source'] == 'csv'
+        print(f"✅ Edited CSV rejected under {original_version}, reloaded as {reloader.current.version}")
+    finally:
+        shutil.rmtree(directory)
+    return True
+
+
+def test_watcher_reloads_on_mtime_change():
+    """The watcher reloads when a source CSV is modified."""
+
+    directory = tempfile.mkdtemp()
+    try:
+        data_dir = os.path.join(directory, 'data')
+        shutil.copytree(Config.DATA_DIR, data_dir)
+        config = make_config(data_dir)
+        reloader = Reference_Reloader(lambda: create_reference_registry(config))
+        assert reloader.check_for_changes() is False
+
+        reloader.start_watcher(0.05)
+        try:
+            scale_freight_co2(config, 3.0)
+            deadline = time.time() + 30
+            while reloader.reload_count == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            assert reloader.reload_count == 1, reloader.status()['last_reload']
+            assert reloader.status()['watching']
+        finally:
+            reloader.stop_watcher()
+        assert not reloader.status()['watching']
+        print("✅ Watcher reloaded the edited CSV")
+    finally:
+        shutil.rmtree(directory)
+    return True
+
+
+def test_endpoints_report_reference_version():
+    """Responses state the reference version; the admin endpoint honours ADMIN_TOKEN."""
+
+    import app as backend_app
+
+    client = backend_app.app.test_client()
+    version = backend_app.reference_data.current.version
+
+    response = client.get('/api/lookup/scope')
+    assert response.headers.get('X-Reference-Version') == version
+    response = client.post('/api/compute_ghg_emissions', json={'supplier_data': {}, 'activity_rows': []})
+    assert response.get_json()['reference_version'] == version
+    assert response.headers.get('X-Reference-Version') == version
+    assert 'X-Reference-Version' not in client.get('/').headers
+
+    original_token = backend_app.config.ADMIN_TOKEN
+    allow_unauthenticated = backend_app.config.ADMIN_ALLOW_UNAUTHENTICATED
+    try:
+        # Closed while no token is configured, unless the development opt-out is set
+        backend_app.config.ADMIN_TOKEN = ''
+        backend_app.config.ADMIN_ALLOW_UNAUTHENTICATED = False
+        assert client.post('/api/admin/reload_reference_data').status_code == 403
+        backend_app.config.ADMIN_ALLOW_UNAUTHENTICATED = True
+        assert client.post('/api/admin/reload_reference_data?wait=1').status_code == 200
+        backend_app.config.ADMIN_ALLOW_UNAUTHENTICATED = False
+
+        backend_app.config.ADMIN_TOKEN = 'secret'
+        assert client.post('/api/admin/reload_reference_data').status_code == 403
+        response = client.post('/api/admin/reload_reference_data?wait=1',
+                               headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 200
+        assert response.get_json()['reload']['status'] == 'unchanged'
+    finally:
+        backend_app.config.ADMIN_TOKEN = original_token
+        backend_app.config.ADMIN_ALLOW_UNAUTHENTICATED = allow_unauthenticated
+
+    status = client.get('/api/reference_data').get_json()
+    assert status['version'] == version and 'tables' in status
+    print(f"✅ Endpoints report reference version {version}")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_reload_swaps_new_version() and test_lazy_load_of_edited_csv()
+               and test_watcher_reloads_on_mtime_change()
+               and test_endpoints_report_reference_version())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
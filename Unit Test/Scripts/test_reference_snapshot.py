@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk reference data snapshot.
+
+Builds reference tables through Reference_Snapshot in a temporary directory
+and checks that a warm start reuses the stored tables without parsing the
+CSVs, that editing a CSV rebuilds only the tables built from it, and that a
+corrupt snapshot file falls back to parsing.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.reference_ef import Reference_EF_Freight_CO2, Reference_Unit_Conversion
+    from Components.reference_snapshot import Reference_Snapshot
+    from config import get_config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def copy_sources(directory):
+    config = get_config()
+    paths = {}
+    for csv_key in ['ef_freight_co2', 'unit_conversion']:
+        paths[csv_key] = os.path.join(
+            directory, os.path.basename(config.get_csv_path(csv_key)))
+        shutil.copyfile(config.get_csv_path(csv_key), paths[csv_key])
+    return paths
+
+
+def load_tables(snapshot_path, paths, builds):
+    def counting(name, build):
+        def wrapper(csv_path):
+            builds.append(name)
+            return build(csv_path)
+        return wrapper
+
+    snapshot = Reference_Snapshot(snapshot_path)
+    freight = snapshot.get_or_build('ef_freight_co2', paths['ef_freight_co2'],
+                                    counting('ef_freight_co2', Reference_EF_Freight_CO2))
+    conversion = snapshot.get_or_build('unit_conversion', paths['unit_conversion'],
+                                       counting('unit_conversion', Reference_Unit_Conversion))
+    snapshot.save()
+    return snapshot, freight, conversion
+
+
+def test_warm_start_and_rebuild():
+    """Warm starts reuse the snapshot; a changed CSV rebuilds only its table."""
+
+    print("🧪 Testing reference snapshot")
+    print("=" * 60)
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = copy_sources(directory)
+        snapshot_path = os.path.join(directory, 'cache', 'snapshot.pickle')
+
+        builds = []
+        _, cold_freight, cold_conversion = load_tables(
+            snapshot_path, paths, builds)
+        assert builds == ['ef_freight_co2', 'unit_conversion']
+        assert os.path.exists(snapshot_path)
+        print("✅ Cold start parsed both CSVs and wrote the snapshot")
+
+        builds = []
+        snapshot, warm_freight, warm_conversion = load_tables(
+            snapshot_path, paths, builds)
+        assert builds == [], f"Warm start parsed {builds}"
+        assert snapshot.hits == 2 and not snapshot.dirty
+        assert list(warm_freight.data) == list(cold_freight.data)
+        assert warm_freight.index == cold_freight.index
+        assert warm_conversion.matrix == cold_conversion.matrix
+        assert warm_conversion.get_conversion_factor('Tonne Mile', 'Short Ton Mile') == \
+            cold_conversion.get_conversion_factor('Tonne Mile', 'Short Ton Mile')
+        print("✅ Warm start loaded identical tables without parsing")
+
+        with open(paths['ef_freight_co2'], 'a', encoding='utf-8') as file:
+            file.write('\n')
+        builds = []
+        load_tables(snapshot_path, paths, builds)
+        assert builds == ['ef_freight_co2'], f"Unexpected rebuilds {builds}"
+        builds = []
+        load_tables(snapshot_path, paths, builds)
+        assert builds == []
+        print("✅ Edited CSV rebuilt only its own table")
+
+        with open(snapshot_path, 'wb') as file:
+            file.write(b'not a snapshot')
+        builds = []
+        load_tables(snapshot_path, paths, builds)
+        assert builds == ['ef_freight_co2', 'unit_conversion']
+        print("✅ Corrupt snapshot fell back to parsing and was rewritten")
+    finally:
+        shutil.rmtree(directory)
+
+    return True
+
+
+def test_combined_source_hash():
+    """Objects derived from several CSVs are keyed by every source."""
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = copy_sources(directory)
+        snapshot = Reference_Snapshot()
+        sources = (paths['ef_freight_co2'], paths['unit_conversion'])
+        combined = snapshot.source_hash(sources)
+        assert combined != snapshot.source_hash(paths['ef_freight_co2'])
+        assert combined != Reference_Snapshot().source_hash(tuple(reversed(sources)))
+
+        built = snapshot.get_or_build('derived', sources, lambda csv_paths: len(csv_paths))
+        assert built == 2 and snapshot.misses == 1
+        assert snapshot.save() is False, "In-memory snapshot must not write a file"
+        print("✅ Combined source hashes key derived entries")
+    finally:
+        shutil.rmtree(directory)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = test_warm_start_and_rebuild() and test_combined_source_hash()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed Resolved_Emission_Factors tables.
+
+Compares every precomputed CO2 and CH4 factor with the value returned by the
+calculators' own get_emission_factor_* methods, and checks that combinations
+outside the reference data are memoized as 0.0.
+"""
+
+import sys
+import os
+import io
+import contextlib
+import importlib.util
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.reference_ef import Reference_EF_Freight_CO2, Reference_EF_Fuel_Use_CO2, Reference_EF_Fuel_Use_CH4_N2O, Reference_Unit_Conversion
+    from Components.resolved_emission_factors import Resolved_Emission_Factors
+    from Services.Co2FossilFuelCalculator import Co2FossilFuelCalculator
+    from config import get_config
+
+    # Import CH4 Calculator - handling space in filename
+    spec = importlib.util.spec_from_file_location(
+        "ch4_calculator", os.path.join(backend_path, "Services", "CH4 Calculator.py"))
+    ch4_calculator_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ch4_calculator_module)
+    Ch4Calculator = ch4_calculator_module.Ch4Calculator
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def load_references():
+    config = get_config()
+    return {
+        'freight': Reference_EF_Freight_CO2(config.get_csv_path('ef_freight_co2')),
+        'fuel_co2': Reference_EF_Fuel_Use_CO2(config.get_csv_path('ef_fuel_use_co2')),
+        'fuel_ch4': Reference_EF_Fuel_Use_CH4_N2O(config.get_csv_path('ef_fuel_use_ch4_n2o')),
+        'units': Reference_Unit_Conversion(config.get_csv_path('unit_conversion')),
+    }
+
+
+def check_table(table, calculator, freight_key_column, fuel_key_column):
+    """Compare every precomputed entry with the calculator's per-row resolution."""
+    checked = 0
+    references = table.references
+    input_units = [''] + table.reference_unit_conversion.row_headers
+
+    # The calculators print debug output for every factor they resolve
+    with contextlib.redirect_stdout(io.StringIO()):
+        for row in references[table.FREIGHT].data:
+            for unit in input_units:
+                expected = calculator.get_emission_factor_by_vehicle_and_region(
+                    row[freight_key_column], row['Region'], unit)
+                actual = table.get(table.FREIGHT, row[freight_key_column],
+                                   row['Region'], unit)
+                assert actual == expected, \
+                    f"{table.gas} freight {row[freight_key_column]}/{row['Region']}/{unit}: {actual} != {expected}"
+                checked += 1
+
+        for row in references[table.FUEL].data:
+            for unit in input_units:
+                expected = calculator.get_emission_factor_by_fuel_consumption(
+                    row[fuel_key_column], 1.0, unit, row['Region'])
+                actual = table.get(table.FUEL, row[fuel_key_column],
+                                   row['Region'], unit)
+                assert actual == expected, \
+                    f"{table.gas} fuel {row[fuel_key_column]}/{row['Region']}/{unit}: {actual} != {expected}"
+                checked += 1
+
+    return checked
+
+
+def test_precomputed_factors_match_calculators():
+    """Precomputed factors must equal what the calculators resolve row by row."""
+
+    print("🧪 Testing precomputed emission factors")
+    print("=" * 60)
+
+    refs = load_references()
+
+    co2_table = Resolved_Emission_Factors(
+        'CO2', refs['freight'], refs['fuel_co2'], refs['units'])
+    co2_calculator = Co2FossilFuelCalculator(
+        reference_ef_fuel_use_co2=refs['fuel_co2'],
+        reference_ef_freight_co2=refs['freight'],
+        reference_unit_conversion=refs['units'])
+    checked = check_table(co2_table, co2_calculator,
+                          'Vehicle and Size', 'Fuel')
+    assert co2_table.memoized_entries == 0, "Reference combinations should all be precomputed"
+    print(f"✅ CO2: {checked} factors match")
+
+    ch4_table = Resolved_Emission_Factors(
+        'CH4', refs['freight'], refs['fuel_ch4'], refs['units'])
+    ch4_calculator = Ch4Calculator(
+        reference_ef_fuel_use_ch4_n2o=refs['fuel_ch4'],
+        reference_ef_freight_co2=refs['freight'],
+        reference_unit_conversion=refs['units'])
+    checked = check_table(ch4_table, ch4_calculator,
+                          'Vehicle and Size', 'Transport and Fuel')
+    assert ch4_table.memoized_entries == 0, "Reference combinations should all be precomputed"
+    print(f"✅ CH4: {checked} factors match")
+    return True
+
+
+def test_unknown_combinations_are_memoized():
+    """Unseen combinations resolve once, then come from the table."""
+
+    print("\n🧪 Testing memoization of unseen combinations")
+    print("=" * 60)
+
+    refs = load_references()
+    table = Resolved_Emission_Factors(
+        'CO2', refs['freight'], refs['fuel_co2'], refs['units'])
+    precomputed = len(table.factors)
+
+    assert table.get(table.FREIGHT, 'No Such Vehicle', 'US', 'Mile') == 0.0
+    assert table.get(table.FREIGHT, 'NO SUCH VEHICLE ', 'us', 'mile') == 0.0
+    assert len(table.factors) == precomputed + 1
+    assert table.memoized_entries == 1
+    print("✅ Unseen combination memoized once")
+
+    table.MAX_MEMOIZED_ENTRIES = 1
+    table.get(table.FUEL, 'Another Unknown Fuel', 'US', 'Litre')
+    assert len(table.factors) == precomputed + 1
+    print("✅ Memoization stops at MAX_MEMOIZED_ENTRIES")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_precomputed_factors_match_calculators() and test_unknown_combinations_are_memoized()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the /api/compute_ghg_emissions result cache.
+
+Checks LRU eviction, TTL expiry and the byte bound of ResultCache, that the
+cache key ignores dict key order, that a resubmitted request is answered from
+the cache with identical bytes (and the counters record it), that profile and
+encoding variants are cached separately, and that a reference data reload
+clears every entry through the reloader's swap listeners.
+"""
+
+import sys
+import os
+import time
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Components.reference_reloader import Reference_Reloader
+    from Services.ResultCache import ResultCache
+    from compute_payloads import build_payload
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def test_lru_ttl_and_size_bounds():
+    """Least recently used entries are evicted, expired ones are misses."""
+
+    print("🧪 Testing ResultCache")
+    print("=" * 60)
+
+    cache = ResultCache(max_entries=2, max_bytes=100, ttl_seconds=60)
+    cache.put('a', b'A', 1)
+    cache.put('b', b'B', 1)
+    assert cache.get('a') == b'A'
+    cache.put('c', b'C', 1)
+    assert cache.get('b') is None and cache.get('a') == b'A' and cache.get('c') == b'C'
+    assert cache.evictions == 1
+
+    cache.put('big', b'x' * 90, 90)
+    assert cache.get('a') is None and cache.total_bytes == 91
+    cache.put('huge', b'x' * 101, 101)
+    assert cache.get('huge') is None
+
+    cache = ResultCache(max_entries=10, ttl_seconds=0.05)
+    cache.put('a', b'A', 1)
+    time.sleep(0.1)
+    assert cache.get('a') is None and cache.expirations == 1 and cache.total_bytes == 0
+
+    assert ResultCache.key({'a': 1, 'b': [1, 2]}, 'v1') == ResultCache.key({'b': [1, 2], 'a': 1}, 'v1')
+    assert ResultCache.key({'a': 1}, 'v1') != ResultCache.key({'a': 1}, 'v2')
+    assert ResultCache(max_entries=0).put('a', b'A', 1) is None
+    print("✅ LRU eviction, TTL expiry and size bounds")
+    return True
+
+
+def test_endpoint_hits():
+    """A resubmitted form is served from the cache with identical bytes."""
+
+    client = backend_app.app.test_client()
+    result_cache = backend_app.result_cache
+    result_cache.clear()
+    payload = build_payload(backend_app.reference_data.current, 10, 'Cache Supplier')
+    stats = result_cache.stats()
+
+    first = client.post('/api/compute_ghg_emissions', json=payload)
+    reordered = {'activity_rows': [dict(reversed(list(row.items()))) for row in payload['activity_rows']],
+                 'supplier_data': payload['supplier_data']}
+    second = client.post('/api/compute_ghg_emissions', json=reordered)
+    assert first.headers['X-Result-Cache'] == 'miss' and second.headers['X-Result-Cache'] == 'hit'
+    assert first.data == second.data
+
+    summary = client.post('/api/compute_ghg_emissions?profile=summary', json=payload)
+    compressed = client.post('/api/compute_ghg_emissions', json=payload, headers={'Accept-Encoding': 'gzip'})
+    assert summary.headers['X-Result-Cache'] == 'miss' and compressed.headers['X-Result-Cache'] == 'miss'
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    compressed_again = client.post('/api/compute_ghg_emissions', json=payload, headers={'Accept-Encoding': 'gzip'})
+    assert compressed_again.headers['X-Result-Cache'] == 'hit' and compressed_again.data == compressed.data
+
+    counters = client.get('/api/compute_ghg_emissions/cache').get_json()
+    assert counters['hits'] - stats['hits'] == 2 and counters['misses'] - stats['misses'] == 3
+    assert counters['entries'] == 3
+    print(f"✅ Resubmitted requests hit the cache ({counters['hits']} hits, {counters['misses']} misses)")
+    return True
+
+
+class StubRegistry:
+    """Registry stand-in with a fixed version and no tables."""
+
+    source_paths = ()
+
+    def __init__(self, version):
+        self.version = version
+
+    def preload(self):
+        pass
+
+
+def test_reload_clears_cache():
+    """A reload that swaps in a new version clears every entry."""
+
+    versions = iter(['v1', 'v1', 'v2'])
+    reloader = Reference_Reloader(lambda: StubRegistry(next(versions)))
+    cache = ResultCache()
+    reloader.add_swap_listener(lambda registry: cache.clear())
+    reloader.add_swap_listener(lambda registry: 1 / 0)
+
+    cache.put('a', b'A', 1)
+    assert reloader.reload(wait=True) and reloader.last_reload['status'] == 'unchanged'
+    assert cache.get('a') == b'A'
+    reloader.reload(wait=True)
+    assert reloader.last_reload['status'] == 'swapped' and reloader.current.version == 'v2'
+    assert cache.get('a') is None and cache.invalidations == 1
+    print("✅ Swapping the reference data clears the cache")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_lru_ttl_and_size_bounds() and test_endpoint_hits() and test_reload_clears_cache()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
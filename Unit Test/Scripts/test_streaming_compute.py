@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming NDJSON compute endpoint.
+
+Streams activity rows to /api/compute_ghg_emissions/stream and checks that
+the per-row records and the final summary match /api/compute_ghg_emissions,
+that unparseable rows produce error records in row order without stopping
+the stream, and that peak memory does not grow with the number of rows.
+"""
+
+import sys
+import os
+import json
+import tracemalloc
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Services.StreamingEmissionsCalculator import StreamingEmissionsCalculator
+    from compute_payloads import build_activity_rows, supplier_data
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+SUPPLIER_DATA = supplier_data('Stream Supplier')
+
+
+def test_stream_matches_compute_endpoint():
+    """Row records and the summary equal the single-document response."""
+
+    print("🧪 Testing /api/compute_ghg_emissions/stream")
+    print("=" * 60)
+
+    client = backend_app.app.test_client()
+    activity_rows = build_activity_rows(backend_app.reference_data.current, 25, fuel_every=5)
+    single = client.post('/api/compute_ghg_emissions',
+                         json={'supplier_data': SUPPLIER_DATA, 'activity_rows': activity_rows}).get_json()
+
+    # An unparseable row in the middle, and blank lines, must not stop the stream
+    lines = [json.dumps({'supplier_data': SUPPLIER_DATA})]
+    lines += [json.dumps(row) for row in activity_rows[:10]]
+    lines += ['{"Distance_Travelled": ', '']
+    lines += [json.dumps(row) for row in activity_rows[10:]]
+    backend_app.config.STREAM_CHUNK_ROWS, original_chunk_rows = 4, backend_app.config.STREAM_CHUNK_ROWS
+    try:
+        response = client.post('/api/compute_ghg_emissions/stream', data='\n'.join(lines) + '\n',
+                               content_type='application/x-ndjson')
+    finally:
+        backend_app.config.STREAM_CHUNK_ROWS = original_chunk_rows
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [record['row_index'] for record in records[:-1]] == list(range(len(activity_rows) + 1))
+    error = records[10]
+    assert error['type'] == 'error' and error['line'] == 12, error
+    row_records = [record for record in records if record['type'] == 'row']
+    assert len(row_records) == len(activity_rows)
+    for record, co2, ch4 in zip(row_records, single['co2_emissions_results'], single['ch4_emissions_results']):
+        assert record['co2_emissions'] == co2['co2_emissions']
+        assert record['ch4_emissions'] == ch4['ch4_emissions']
+        assert record['status']['CO2'] == co2['status']
+    print(f"✅ {len(row_records)} row records match, error record kept in row order")
+
+    summary = records[-1]
+    assert summary['type'] == 'summary' and summary['status'] == 'success'
+    assert summary['processed_rows'] == len(activity_rows) and summary['failed_rows'] == 1
+    assert summary['reference_version'] == single['reference_version']
+    assert summary['manufacturing_details'] == single['manufacturing_details']
+    for key in ('co2', 'ch4', 'n2o'):
+        assert abs(summary['transport_emissions'][key] - single['transport_emissions'][key]) < 1e-12
+    assert abs(summary['total_emissions'] - single['total_emissions']) < 1e-12
+    road_fuel = summary['transport_emissions']['summary_by_transport_scope_activity']['Road']['Scope 1']['Fuel']
+    expected = single['transport_emissions']['summary_by_transport_scope_activity']['Road']['Scope 1']['Fuel']
+    assert abs(road_fuel['CO2']['total_emissions'] - expected['CO2']['total_emissions']) < 1e-12
+    print(f"✅ Summary total {summary['total_emissions']:.6f} matches /api/compute_ghg_emissions")
+    return True
+
+
+def test_stream_memory_is_flat():
+    """Peak memory for 20k rows stays at the level of 2k rows."""
+
+    registry = backend_app.reference_data.current
+    lines = [json.dumps(row) for row in build_activity_rows(registry, 25, fuel_every=5)]
+
+    def peak_memory(row_count):
+        calculator = StreamingEmissionsCalculator(registry, chunk_size=500)
+        tracemalloc.start()
+        try:
+            for records in calculator.iter_chunks(lines[i % len(lines)] for i in range(row_count)):
+                pass
+            assert records[-1]['processed_rows'] == row_count
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak_memory(2000), peak_memory(20000)
+    assert large < small * 1.5, f"Peak memory grew from {small} to {large} bytes"
+    print(f"✅ Peak memory {small / 1e6:.2f} MB for 2k rows, {large / 1e6:.2f} MB for 20k rows")
+    return True
+
+
+if __name__ == '__main__':
+    success = test_stream_matches_compute_endpoint() and test_stream_memory_is_flat()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the supplier catalog and /api/suppliers typeahead search.
+
+Checks that the catalog merges Supplier_List.csv with the
+SUPPLIER-PRODUCT-LOCATION keys of the source product matrix, that search()
+returns the same pages as a brute-force scan (prefix matches first, then
+substring matches) on a catalog of several thousand suppliers, and that
+/api/suppliers?q=&limit=&offset= serves those pages.
+"""
+
+import sys
+import os
+import random
+import string
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import app as backend_app
+    from Components.reference_supplier_catalog import Reference_Supplier_Catalog
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def brute_force_search(suppliers, query, limit, offset):
+    query = query.strip().lower()
+    ordered = sorted(suppliers, key=str.lower)
+    matches = [name for name in ordered if name.lower().startswith(query)]
+    matches += [name for name in ordered if query in name.lower() and not name.lower().startswith(query)]
+    return matches[offset:offset + limit], len(matches) > offset + limit
+
+
+def test_catalog_merges_source_product_matrix():
+    """Every matrix key is in the catalog exactly once."""
+
+    print("🧪 Testing supplier catalog")
+    print("=" * 60)
+
+    registry = backend_app.reference_data.current
+    catalog = registry.get('supplier_catalog')
+    matrix_keys = {row['SUPPLIER-PRODUCT-LOCATION'].strip()
+                   for row in registry.get('source_product_matrix').data
+                   if row['SUPPLIER-PRODUCT-LOCATION'].strip()}
+    assert matrix_keys <= set(catalog.suppliers)
+    assert len({name.lower() for name in catalog.suppliers}) == len(catalog)
+    # Supplier_List.csv has no header row: its first line is a supplier
+    config = backend_app.config
+    with open(config.get_csv_path('supplier_list'), encoding='utf-8-sig') as file:
+        listed = [line.strip().strip('"').strip() for line in file if line.strip()]
+    assert catalog.suppliers[:len(listed)] == listed
+    assert catalog.suppliers[0] == 'Amcor Rigid Plastics - PET Bottles - Allentown, PA'
+    print(f"✅ {len(catalog)} suppliers including all {len(listed)} listed and {len(matrix_keys)} matrix keys")
+    return True
+
+
+def test_search_matches_brute_force():
+    """Pages equal a brute-force scan on a catalog of 5000 suppliers."""
+
+    random.seed(7)
+    words = ['Amcor', 'Anchor', 'Ball', 'Crown', 'Owens', 'Verallia', 'Ardagh', 'Silgan']
+    names = [' - '.join(random.choice(words) + ''.join(random.choices(string.ascii_lowercase, k=4))
+                        for _ in range(3)) for _ in range(5000)]
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as file:
+        file.write('\n'.join(f'"{name}"' for name in names) + '\n')
+    try:
+        catalog = Reference_Supplier_Catalog(file.name)
+    finally:
+        os.remove(file.name)
+    assert len(catalog) == len(set(name.lower() for name in names))
+
+    for query in ('amc', 'AMC', 'crown', 'own', ' - ball', 'xq', 'zzzz', 'a'):
+        for offset in (0, 5, 40):
+            assert catalog.search(query, 20, offset) == brute_force_search(catalog.suppliers, query, 20, offset), \
+                (query, offset)
+    assert catalog.search('', 3) == (catalog.suppliers[:3], True)
+    print("✅ Search pages match a brute-force scan")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        catalog.search('amc', 20)
+    elapsed_us = (time.perf_counter() - start) * 1000
+    print(f"✅ Prefix search over {len(catalog)} suppliers: {elapsed_us:.1f} µs per query")
+    return True
+
+
+def test_suppliers_endpoint():
+    """?q=&limit=&offset= pages; without parameters the whole catalog."""
+
+    client = backend_app.app.test_client()
+    catalog = backend_app.reference_data.current.get('supplier_catalog')
+
+    response = client.get('/api/suppliers')
+    assert response.get_json() == {'suppliers': catalog.suppliers} and response.headers.get('ETag')
+
+    data = client.get('/api/suppliers?q=glass&limit=2').get_json()
+    expected, has_more = catalog.search('glass', 2)
+    assert data['suppliers'] == expected and data['has_more'] == has_more
+    assert all('glass' in name.lower() for name in data['suppliers'])
+    page_two = client.get('/api/suppliers?q=glass&limit=2&offset=2').get_json()
+    assert page_two['suppliers'] == catalog.search('glass', 2, 2)[0]
+    assert not set(page_two['suppliers']) & set(data['suppliers'])
+
+    data = client.get('/api/suppliers?q=amc&limit=100000').get_json()
+    assert data['limit'] == backend_app.config.SUPPLIER_SEARCH_MAX_LIMIT
+    assert client.get('/api/suppliers?q=amc&limit=ten').status_code == 400
+    print("✅ /api/suppliers search pages served")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_catalog_merges_source_product_matrix() and test_search_matches_brute_force()
+               and test_suppliers_endpoint())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
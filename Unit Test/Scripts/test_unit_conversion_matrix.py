@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled unit conversion matrix.
+
+Checks that get_conversion_factor and convert_many agree with the raw string
+matrix loaded from Reference - Unit Conversion.csv, including case-insensitive
+unit names, blank cells and units that are not in the matrix at all.
+"""
+
+import sys
+import os
+import math
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    from Components.reference_ef import Reference_Unit_Conversion
+    from config import get_config
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+def load_reference():
+    config = get_config()
+    return Reference_Unit_Conversion(config.get_csv_path('unit_conversion'))
+
+
+def expected_factor(raw_value):
+    """Numeric value the calculators derived from the raw string cell."""
+    try:
+        return float(raw_value)
+    except (ValueError, TypeError):
+        return None
+
+
+def test_conversion_factor_matches_matrix():
+    """Every matrix cell must compile to the float the string parses to."""
+
+    print("🧪 Testing compiled unit conversion factors")
+    print("=" * 60)
+
+    reference = load_reference()
+    checked = 0
+
+    for from_unit in reference.row_headers:
+        for to_unit in reference.col_headers:
+            raw_value = reference.get_conversion(
+                from_unit.upper(), f" {to_unit.lower()} ")
+            assert raw_value == reference.matrix[from_unit][to_unit]
+
+            expected = expected_factor(raw_value)
+            actual = reference.get_conversion_factor(from_unit, to_unit)
+            assert actual == expected, \
+                f"{from_unit} -> {to_unit}: expected {expected}, got {actual}"
+            checked += 1
+
+    assert reference.get_conversion('Furlong', 'Mile') is None
+    assert reference.get_conversion_factor('Furlong', 'Mile') is None
+    assert reference.get_conversion_factor('US Gallon', 'Litre') == 3.78541178
+
+    print(f"✅ {checked} matrix cells verified")
+    return True
+
+
+def test_convert_many():
+    """Batch conversion must match the scalar lookup element by element."""
+
+    print("\n🧪 Testing vectorized convert_many")
+    print("=" * 60)
+
+    reference = load_reference()
+    from_units = ['US Gallon', 'litre', 'Kilogram', 'Furlong', '', 'Tonne Mile']
+    to_units = ['Litre', 'US GALLON', 'Metric Ton', 'Mile', 'Mile', 'Tonne Kilometer']
+
+    factors = reference.convert_many(from_units, to_units)
+    assert len(factors) == len(from_units)
+
+    for from_unit, to_unit, factor in zip(from_units, to_units, factors):
+        expected = reference.get_conversion_factor(from_unit, to_unit)
+        if expected is None:
+            assert math.isnan(factor), f"{from_unit} -> {to_unit} should be NaN"
+        else:
+            assert factor == expected, f"{from_unit} -> {to_unit}: {factor} != {expected}"
+        print(f"✅ {from_unit or '<blank>'} -> {to_unit}: {factor}")
+
+    try:
+        reference.convert_many(['Mile'], [])
+        assert False, "Mismatched lengths should raise ValueError"
+    except ValueError:
+        print("✅ Mismatched lengths rejected")
+
+    return True
+
+
+if __name__ == '__main__':
+    success = test_conversion_factor_matches_matrix() and test_convert_many()
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test script for CSV/XLSX upload ingestion.
+
+Uploads the spreadsheets in Unit Test/Data to /api/uploads, as CSV and as
+XLSX, and checks that the downloadable results file carries every input row
+with the same CO2 and CH4 emissions and statuses as /api/compute_ghg_emissions,
+that rows which cannot be parsed are reported in the status columns, that
+uploads over UPLOAD_MAX_BYTES are rejected even without a Content-Length, and
+that peak memory does not grow with the number of rows in the file.
+"""
+
+import sys
+import os
+import csv
+import io
+import shutil
+import tempfile
+import tracemalloc
+
+# Add the backend directory to the Python path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+try:
+    import openpyxl
+    import app as backend_app
+    from Services.UploadEmissionsCalculator import UploadEmissionsCalculator, COLUMN_MAP, RESULT_COLUMNS
+    print("✅ All imports successful")
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    sys.exit(1)
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'Data')
+
+
+def read_data_file(filename):
+    with open(os.path.join(DATA_DIR, filename), 'r', encoding='utf-8-sig', newline='') as file:
+        rows = list(csv.reader(file))
+    return rows[0], rows[1:]
+
+
+def to_xlsx(header, rows):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for row in rows:
+        # Numeric cells as numbers, the way Excel stores them
+        sheet.append([float(cell) if cell.replace('.', '', 1).isdigit() else (cell or None) for cell in row])
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def field_for(column):
+    return COLUMN_MAP.get(' '.join(column.split()).lower())
+
+
+def expected_results(client, header, rows):
+    """CO2/CH4 results of the same rows from /api/compute_ghg_emissions."""
+    numeric_fields = ('Distance_Travelled', 'Total_Weight_Of_Freight_InTonne', 'Fuel_Amount')
+    activity_rows = [{field_for(column): float(cell) if field_for(column) in numeric_fields else cell
+                      for column, cell in zip(header, row) if field_for(column) and cell != ''}
+                     for row in rows]
+    return client.post('/api/compute_ghg_emissions',
+                       json={'supplier_data': {}, 'activity_rows': activity_rows}).get_json()
+
+
+def test_upload_matches_compute_endpoint():
+    """CSV and XLSX uploads give the results of /api/compute_ghg_emissions."""
+
+    print("🧪 Testing /api/uploads")
+    print("=" * 60)
+
+    client = backend_app.app.test_client()
+    for filename in ('Co2TestDataFreightDistance.csv', 'Co2TestDataFuel.csv'):
+        header, rows = read_data_file(filename)
+        single = expected_results(client, header, rows)
+
+        for upload_name, content in ((filename, open(os.path.join(DATA_DIR, filename), 'rb').read()),
+                                     (filename.replace('.csv', '.xlsx'), to_xlsx(header, rows))):
+            response = client.post('/api/uploads', data={'file': (io.BytesIO(content), upload_name)},
+                                   content_type='multipart/form-data')
+            assert response.status_code == 200, response.get_json()
+            summary = response.get_json()
+            assert summary['processed_rows'] == len(rows) and summary['failed_rows'] == 0
+            assert abs(summary['transport_emissions']['co2'] - single['total_co2_emissions']) < 1e-9
+
+            download = client.get(summary['results_url'])
+            assert download.status_code == 200
+            results = list(csv.reader(io.StringIO(download.get_data(as_text=True))))
+            download.close()
+            assert results[0] == header + RESULT_COLUMNS
+            assert len(results) == len(rows) + 1
+            for result_row, co2, ch4 in zip(results[1:], single['co2_emissions_results'],
+                                            single['ch4_emissions_results']):
+                assert result_row[0] == co2['supplier_info']['source_description']
+                assert float(result_row[-6]) == co2['co2_emissions']
+                assert float(result_row[-5]) == ch4['ch4_emissions']
+                assert result_row[-3] == co2['status'] and result_row[-2] == ch4['status']
+            print(f"✅ {upload_name}: {len(rows)} rows match /api/compute_ghg_emissions")
+
+    assert client.get('/api/uploads/0123456789abcdef/results').status_code == 404
+    assert client.get('/api/uploads/..%2Fconfig/results').status_code == 404
+    response = client.post('/api/uploads', data={'file': (io.BytesIO(b'a,b\n1,2\n'), 'data.txt')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+    response = client.post('/api/uploads', data={'file': (io.BytesIO(b'a,b\n1,2\n'), 'data.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400 and 'columns' in response.get_json()['error']
+    print("✅ Unknown results, unsupported files and unknown layouts rejected")
+    return True
+
+
+def test_unparseable_rows_reported():
+    """A bad numeric cell fails only its own row."""
+
+    header, rows = read_data_file('Co2TestDataFreightDistance.csv')
+    rows[3][header.index('Distance Travelled')] = 'far'
+    content = '\n'.join(','.join(f'"{cell}"' for cell in row) for row in [header] + rows).encode()
+
+    client = backend_app.app.test_client()
+    data = {'file': (io.BytesIO(content), 'freight.csv'), 'Supplier_and_Container': 'Upload Supplier',
+            'Container_Weight': '12.5', 'Number_Of_Containers': '10'}
+    summary = client.post('/api/uploads', data=data, content_type='multipart/form-data').get_json()
+    assert summary['failed_rows'] == 1 and summary['processed_rows'] == len(rows) - 1
+    assert summary['supplier_data']['Supplier_and_Container'] == 'Upload Supplier'
+
+    download = client.get(summary['results_url'])
+    results = list(csv.reader(io.StringIO(download.get_data(as_text=True))))
+    download.close()
+    assert all(status.startswith('Error:') for status in results[4][-3:]) and results[4][0] == rows[3][0]
+    assert results[5][-3] == 'Success'
+    print("✅ Unparseable row reported in the status columns")
+    return True
+
+
+def test_upload_size_limit():
+    """Uploads over UPLOAD_MAX_BYTES are rejected, with or without a Content-Length."""
+
+    config = backend_app.config
+    client = backend_app.app.test_client()
+    header, rows = read_data_file('Co2TestDataFreightDistance.csv')
+    content = '\n'.join(','.join(f'"{cell}"' for cell in row) for row in [header] + rows * 20).encode()
+    boundary = 'upload-limit-boundary'
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="big.csv"\r\n'
+            f'Content-Type: text/csv\r\n\r\n').encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+    content_type = f'multipart/form-data; boundary={boundary}'
+
+    upload_max_bytes = config.UPLOAD_MAX_BYTES
+    try:
+        config.UPLOAD_MAX_BYTES = len(body) - 1
+        response = client.post('/api/uploads', data=body, content_type=content_type)
+        assert response.status_code == 413 and 'limit' in response.get_json()['error']
+        # Chunked transfer: no Content-Length, the body ends with the stream
+        response = client.post('/api/uploads', input_stream=io.BytesIO(body), content_type=content_type,
+                               environ_overrides={'wsgi.input_terminated': True})
+        assert response.status_code == 413 and 'limit' in response.get_json()['error']
+
+        config.UPLOAD_MAX_BYTES = len(body) * 2
+        response = client.post('/api/uploads', input_stream=io.BytesIO(body), content_type=content_type,
+                               environ_overrides={'wsgi.input_terminated': True})
+        assert response.status_code == 200 and response.get_json()['processed_rows'] == len(rows) * 20
+    finally:
+        config.UPLOAD_MAX_BYTES = upload_max_bytes
+
+    # Other endpoints keep their own (unlimited) request bodies
+    response = client.post('/api/compute_ghg_emissions', data=b'{"supplier_data": {}, "activity_rows": []}' +
+                           b' ' * 1000, content_type='application/json')
+    assert response.status_code == 200
+    print(f"✅ {len(body)}-byte upload rejected above the limit, also when chunked")
+    return True
+
+
+def test_upload_memory_is_flat():
+    """Peak memory for a 20k-row file stays at the level of a 2k-row file."""
+
+    header, rows = read_data_file('Co2TestDataFuel.csv')
+    registry = backend_app.reference_data.current
+    directory = tempfile.mkdtemp()
+
+    def peak_memory(row_count):
+        input_path = os.path.join(directory, 'input.csv')
+        with open(input_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            for i in range(row_count):
+                writer.writerow(rows[i % len(rows)])
+        tracemalloc.start()
+        try:
+            with open(input_path, 'rb') as file:
+                summary = UploadEmissionsCalculator(registry, chunk_size=500).calculate(
+                    file, 'csv', os.path.join(directory, 'results.csv'))
+            assert summary['processed_rows'] == row_count
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    try:
+        small, large = peak_memory(2000), peak_memory(20000)
+    finally:
+        shutil.rmtree(directory)
+    assert large < small * 1.5, f"Peak memory grew from {small} to {large} bytes"
+    print(f"✅ Peak memory {small / 1e6:.2f} MB for 2k rows, {large / 1e6:.2f} MB for 20k rows")
+    return True
+
+
+if __name__ == '__main__':
+    success = (test_upload_matches_compute_endpoint() and test_unparseable_rows_reported()
+               and test_upload_size_limit() and test_upload_memory_is_flat())
+    print("\n🎉 ALL TESTS PASSED" if success else "\n❌ TESTS FAILED")
+    sys.exit(0 if success else 1)
@@ -1,28 +1,34 @@
 import csv
 import os
 
+from Components.columnar_table import Columnar_Table
+
 
 class Reference_Source_Product_Matrix:
     def __init__(self, csv_path):
-        self.data = []
+        self.table = Columnar_Table([], [])
         self.header = []
         self._load_csv(csv_path)
 
+    @property
+    def data(self):
+        # Rows are materialized as dicts on demand from the column store
+        return self.table
+
     def _load_csv(self, csv_path):
         try:
             with open(csv_path, 'r', encoding='utf-8-sig') as file:
                 reader = csv.DictReader(file)
                 self.header = reader.fieldnames
-                for i, row in enumerate(reader):
-                    self.data.append(row)
+                self.table = Columnar_Table(self.header, reader)
         except Exception as e:
-            self.data = []
+            self.table = Columnar_Table([], [])
 
     def filter_by_supplier_product_location(self, value):
         column = 'SUPPLIER-PRODUCT-LOCATION'
-        matches = [row for row in self.data if row.get(
-            column, '').strip() == value.strip()]
-        return matches
+        positions = self.table.positions_where(
+            column, value, normalize=lambda text: (text or '').strip())
+        return self.table.rows(positions)
 
     def get_manufacturing_emissions_factor(self, supplier_product_location):
         """
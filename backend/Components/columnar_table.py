@@ -0,0 +1,141 @@
+import sys
+
+import numpy as np
+
+
+def _normalize_value(value):
+    # Case/whitespace-insensitive form used for reference lookups
+    return value.strip().lower() if value else ''
+
+
+class Columnar_Table:
+    """
+    Column-oriented storage for a loaded reference CSV.
+
+    Every column is dictionary-encoded: each distinct value is interned and
+    stored once in `categories[column]`, and rows hold an int32 code into that
+    list. Numeric columns are additionally parsed into float64 arrays (NaN for
+    blank or malformed cells) for vectorized filtering and arithmetic.
+
+    The table behaves as a read-only sequence of row dicts so existing callers
+    that iterate `reference.data` or serialize rows keep working; each row dict
+    is built on demand from the column store.
+    """
+
+    def __init__(self, header, rows, numeric_columns=()):
+        """
+        Build the column store.
+
+        Args:
+            header (list): Column names in file order; duplicate names collapse
+                into one column, matching csv.DictReader behaviour
+            rows (iterable): Row dicts as produced by csv.DictReader
+            numeric_columns (iterable): Columns to also expose as float arrays
+        """
+        self.columns = list(dict.fromkeys(
+            name for name in (header or []) if name is not None))
+        self.categories = {column: [] for column in self.columns}
+        self.codes = {}
+        self.numeric = {}
+        self._normalized = {}
+
+        code_maps = {column: {} for column in self.columns}
+        code_lists = {column: [] for column in self.columns}
+        for row in rows:
+            for column in self.columns:
+                value = row.get(column)
+                code_map = code_maps[column]
+                code = code_map.get(value)
+                if code is None:
+                    code = len(code_map)
+                    code_map[value] = code
+                    self.categories[column].append(
+                        sys.intern(value) if isinstance(value, str) else value)
+                code_lists[column].append(code)
+
+        for column in self.columns:
+            self.codes[column] = np.array(code_lists[column], dtype=np.int32)
+
+        for column in numeric_columns:
+            if column in self.categories:
+                category_values = np.array([self._parse_float(value) for value in self.categories[column]],
+                                           dtype=np.float64)
+                self.numeric[column] = category_values[self.codes[column]]
+
+    @staticmethod
+    def _parse_float(value):
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return np.nan
+
+    def __len__(self):
+        return len(self.codes[self.columns[0]]) if self.columns else 0
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.row(i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('Columnar_Table index out of range')
+        return self.row(position)
+
+    def __iter__(self):
+        code_lists = [(column, self.categories[column], self.codes[column].tolist())
+                      for column in self.columns]
+        for i in range(len(self)):
+            yield {column: categories[codes[i]] for column, categories, codes in code_lists}
+
+    def row(self, position):
+        """Materialize a single row as a dict."""
+        return {column: self.categories[column][self.codes[column][position]]
+                for column in self.columns}
+
+    def rows(self, positions):
+        """Materialize the rows at the given positions, in order."""
+        return [self.row(position) for position in positions]
+
+    def value(self, column, position):
+        """Raw string value of one cell ('' if the column does not exist)."""
+        if column not in self.codes:
+            return ''
+        return self.categories[column][self.codes[column][position]]
+
+    def numeric_value(self, column, position):
+        """Parsed float value of one cell in a numeric column (NaN if blank)."""
+        return float(self.numeric[column][position])
+
+    def normalized_categories(self, column):
+        """Normalized (stripped, lower-cased) form of each category, cached per column."""
+        normalized = self._normalized.get(column)
+        if normalized is None:
+            normalized = [_normalize_value(value)
+                          for value in self.categories.get(column, [])]
+            self._normalized[column] = normalized
+        return normalized
+
+    def normalized_column(self, column):
+        """Normalized value for every row of a column, as a list."""
+        normalized = self.normalized_categories(column)
+        if column not in self.codes:
+            return [''] * len(self)
+        return [normalized[code] for code in self.codes[column].tolist()]
+
+    def mask_where(self, column, value, normalize=_normalize_value):
+        """
+        Vectorized filter: boolean mask of rows whose column matches value.
+
+        Comparison is done once per distinct category rather than once per
+        row; by default it is case- and whitespace-insensitive.
+        """
+        if column not in self.codes:
+            return np.zeros(len(self), dtype=bool)
+        target = normalize(value)
+        matching_codes = [code for code, category in enumerate(self.categories[column])
+                          if normalize(category) == target]
+        return np.isin(self.codes[column], matching_codes)
+
+    def positions_where(self, column, value, normalize=_normalize_value):
+        """Row positions whose column matches value (see mask_where)."""
+        return np.flatnonzero(self.mask_where(column, value, normalize)).tolist()
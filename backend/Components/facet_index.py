@@ -0,0 +1,98 @@
+import itertools
+
+import numpy as np
+
+from Components.columnar_table import _normalize_value
+
+_NO_POSITIONS = np.empty(0, dtype=np.intp)
+
+
+class Facet_Index:
+    """
+    Facet index over a Columnar_Table for cascading dropdowns.
+
+    For every column, each normalized (stripped, lower-cased) value maps to
+    the sorted row positions holding it. query(field, filters) intersects the
+    position lists of the filters and returns the distinct non-empty values of
+    field in those rows, sorted; answers are memoized per (field, filters).
+    precompute() fills the memo for every combination of facet values present
+    in the table, so the dropdowns the frontend asks for most never touch the
+    rows at request time.
+    """
+
+    # Upper bound on memoized query answers
+    MAX_CACHED_QUERIES = 10000
+
+    def __init__(self, table):
+        """
+        Build the position lists of every column.
+
+        Args:
+            table (Columnar_Table): Loaded reference table
+        """
+        self.table = table
+        self.columns = list(table.columns)
+        self.postings = {}
+        self.answers = {}
+        for column in self.columns:
+            codes = table.codes[column]
+            positions_by_value = {}
+            for code, normalized in enumerate(table.normalized_categories(column)):
+                positions_by_value.setdefault(normalized, []).append(code)
+            self.postings[column] = {
+                normalized: np.flatnonzero(np.isin(codes, value_codes))
+                for normalized, value_codes in positions_by_value.items()
+            }
+
+    def _query_key(self, field, filters):
+        return (field, tuple(sorted((column, _normalize_value(value)) for column, value in filters.items())))
+
+    def query(self, field, filters=None):
+        """
+        Distinct values of field among the rows matching every filter.
+
+        Args:
+            field (str): Column whose values are returned
+            filters (dict, optional): Column -> value; matched case- and whitespace-insensitively
+
+        Returns:
+            list: Sorted distinct non-empty values
+
+        Raises:
+            KeyError: If field or a filter column is not a column of the table
+        """
+        filters = filters or {}
+        for column in itertools.chain([field], filters):
+            if column not in self.postings:
+                raise KeyError(f"Unknown column: {column}")
+
+        key = self._query_key(field, filters)
+        values = self.answers.get(key)
+        if values is not None:
+            return values
+
+        positions = None
+        for column, normalized in key[1]:
+            column_positions = self.postings[column].get(normalized, _NO_POSITIONS)
+            positions = column_positions if positions is None else np.intersect1d(
+                positions, column_positions, assume_unique=True)
+
+        codes = self.table.codes[field] if positions is None else self.table.codes[field][positions]
+        categories = self.table.categories[field]
+        values = sorted(value for value in (categories[code] for code in np.unique(codes)) if value)
+        if len(self.answers) < self.MAX_CACHED_QUERIES:
+            self.answers[key] = values
+        return values
+
+    def precompute(self, field, facet_columns):
+        """
+        Answer query(field, ...) for every combination of facet_columns values in the table.
+
+        Args:
+            field (str): Column whose values are returned
+            facet_columns (list): Filter columns; every combination present in the rows is memoized
+        """
+        normalized_columns = [self.table.normalized_column(column) for column in facet_columns]
+        combinations = set(zip(*normalized_columns))
+        for combination in combinations:
+            self.query(field, dict(zip(facet_columns, combination)))
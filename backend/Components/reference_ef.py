@@ -1,11 +1,43 @@
 import csv
 
+import numpy as np
+
+from Components.columnar_table import Columnar_Table
+
+# Emission factor columns parsed into float arrays in the column store
+NUMERIC_COLUMNS = ('CO2', 'CO2 - Biomass Fuel', 'CH4',
+                   'N2O', 'Fuel Efficiency')
+
+
+def _normalize_key(value):
+    # Case/whitespace-insensitive form used for all reference lookups
+    return value.strip().lower() if value else ''
+
+
+def _build_composite_index(table, key_column, region_column='Region'):
+    """
+    Build a (key, region) -> row positions hash index so lookups are O(1)
+    instead of scanning every row. Keys are normalized with _normalize_key and
+    positions keep their original file order within each bucket.
+    """
+    index = {}
+    keys = table.normalized_column(key_column)
+    regions = table.normalized_column(region_column)
+    for position, composite_key in enumerate(zip(keys, regions)):
+        index.setdefault(composite_key, []).append(position)
+    return index
+
 
 class Reference_Unit_Conversion:
     def __init__(self, csv_path):
         self.matrix = {}
         self.row_headers = []
         self.col_headers = []
+        # Compiled form of the matrix: case-folded unit -> index maps and a
+        # dense float array (NaN where no conversion exists)
+        self.row_index = {}
+        self.col_index = {}
+        self.factors = np.empty((0, 0))
         self.load_matrix(csv_path)
 
     def load_matrix(self, csv_path):
@@ -38,184 +70,167 @@ class Reference_Unit_Conversion:
                     self.matrix[row_header][col_header] = value.strip(
                     ) if value else ''
                 i += 1
+        self.compile_matrix()
+
+    @staticmethod
+    def _unit_key(unit):
+        return unit.strip().casefold() if unit else ''
+
+    @staticmethod
+    def _parse_factor(value):
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            # Blank cells and malformed values (e.g. '1 016.04691') have no factor
+            return np.nan
+
+    def compile_matrix(self):
+        """
+        Compile the string matrix into a float array with case-folded
+        unit -> index maps. The array carries one extra all-NaN row and
+        column so unknown units (index -1) resolve to NaN without branching.
+        """
+        self.row_index = {}
+        self.col_index = {}
+        for i, row_header in enumerate(self.row_headers):
+            self.row_index.setdefault(self._unit_key(row_header), i)
+        for j, col_header in enumerate(self.col_headers):
+            self.col_index.setdefault(self._unit_key(col_header), j)
+
+        self.factors = np.full(
+            (len(self.row_headers) + 1, len(self.col_headers) + 1), np.nan)
+        for i, row_header in enumerate(self.row_headers):
+            row = self.matrix.get(row_header, {})
+            for j, col_header in enumerate(self.col_headers):
+                self.factors[i, j] = self._parse_factor(row.get(col_header))
 
     def get_conversion(self, from_unit, to_unit):
-        # Case-insensitive lookup
-        from_unit = from_unit.strip().lower()
-        to_unit = to_unit.strip().lower()
-        for row_header in self.row_headers:
-            if row_header.lower() == from_unit:
-                for col_header in self.col_headers:
-                    if col_header.lower() == to_unit:
-                        return self.matrix[row_header][col_header]
-        return None
+        # Case-insensitive lookup; returns the raw matrix cell as a string
+        i = self.row_index.get(self._unit_key(from_unit))
+        j = self.col_index.get(self._unit_key(to_unit))
+        if i is None or j is None:
+            return None
+        return self.matrix.get(self.row_headers[i], {}).get(self.col_headers[j], '')
+
+    def get_conversion_factor(self, from_unit, to_unit):
+        """
+        Get the numeric conversion factor between two units.
+
+        Returns:
+            float: Conversion factor, or None if the matrix has no usable value
+        """
+        factor = self.factors[self.row_index.get(self._unit_key(from_unit), -1),
+                              self.col_index.get(self._unit_key(to_unit), -1)]
+        return None if np.isnan(factor) else float(factor)
+
+    def convert_many(self, from_units, to_units):
+        """
+        Vectorized conversion factor lookup for batch callers.
+
+        Args:
+            from_units (sequence): Units to convert from
+            to_units (sequence): Units to convert to, same length as from_units
+
+        Returns:
+            numpy.ndarray: Float conversion factors, NaN where no conversion exists
+        """
+        if len(from_units) != len(to_units):
+            raise ValueError(
+                "from_units and to_units must have the same length")
+        unit_key = self._unit_key
+        rows = np.fromiter((self.row_index.get(unit_key(unit), -1) for unit in from_units),
+                           dtype=np.intp, count=len(from_units))
+        cols = np.fromiter((self.col_index.get(unit_key(unit), -1) for unit in to_units),
+                           dtype=np.intp, count=len(to_units))
+        return self.factors[rows, cols]
+
+class _Reference_EF_Table:
+    """
+    Shared loading and lookup for the Reference_EF_* tables.
+
+    Rows with a value in KEY_COLUMN are kept in a Columnar_Table and indexed
+    by normalized (key, region). `data` exposes the rows as dicts built on
+    demand.
+    """
+
+    KEY_COLUMN = None
 
-# Reference_EF_Fuel_Use_CO2: for Reference - EF Fuel Use CO2.csv
-
-
-class Reference_EF_Fuel_Use_CO2:
     def __init__(self, csv_path):
-        self.data = []
+        self.table = Columnar_Table([], [])
         self.header = []
+        self.index = {}
         self.load_csv(csv_path)
 
+    @property
+    def data(self):
+        return self.table
+
     def load_csv(self, csv_path):
         with open(csv_path, 'r', encoding='utf-8-sig') as file:
             reader = csv.DictReader(file)
             self.header = reader.fieldnames
-            count = 0
-            for row in reader:
-                # Only add rows with a Fuel value
-                if row.get('Fuel'):
-                    self.data.append(row)
-                    count += 1
+            rows = (row for row in reader if row.get(self.KEY_COLUMN))
+            self.table = Columnar_Table(self.header, rows, NUMERIC_COLUMNS)
+        self.index = _build_composite_index(self.table, self.KEY_COLUMN)
+
+    def _lookup(self, key, region):
+        # Case-insensitive match for both key and region via the composite index
+        return self.table.rows(self.index.get(
+            (_normalize_key(key), _normalize_key(region)), []))
+
+
+# Reference_EF_Fuel_Use_CO2: for Reference - EF Fuel Use CO2.csv
+
+
+class Reference_EF_Fuel_Use_CO2(_Reference_EF_Table):
+    # Only rows with a Fuel value are loaded
+    KEY_COLUMN = 'Fuel'
 
     def get_by_fuel_and_region(self, fuel, region):
-        # Case-insensitive match for both fuel and region
-        results = [
-            row for row in self.data
-            if row['Fuel'].strip().lower() == fuel.strip().lower()
-            and row['Region'].strip().lower() == region.strip().lower()
-        ]
-        return results
+        return self._lookup(fuel, region)
 
 # Reference_EF_Fuel_Use_CH4_N2O: for Reference - EF Fuel Use CH4 N2O.csv
 
 
-class Reference_EF_Fuel_Use_CH4_N2O:
-    def __init__(self, csv_path):
-        self.data = []
-        self.header = []
-        self.load_csv(csv_path)
-
-    def load_csv(self, csv_path):
-        with open(csv_path, 'r', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            self.header = reader.fieldnames
-            count = 0
-            for row in reader:
-                # Only add rows with a Transport and Fuel value
-                if row.get('Transport and Fuel'):
-                    self.data.append(row)
-                    count += 1
+class Reference_EF_Fuel_Use_CH4_N2O(_Reference_EF_Table):
+    # Only rows with a Transport and Fuel value are loaded
+    KEY_COLUMN = 'Transport and Fuel'
 
     def get_by_transport_and_region(self, transport_and_fuel, region):
-        # Case-insensitive match for both transport_and_fuel and region
-        results = [
-            row for row in self.data
-            if row['Transport and Fuel'].strip().lower() == transport_and_fuel.strip().lower()
-            and row['Region'].strip().lower() == region.strip().lower()
-        ]
-        return results
+        return self._lookup(transport_and_fuel, region)
 
 # Reference_EF_Road: for Reference_EF_Road.csv
 
 
-class Reference_EF_Road:
-    def __init__(self, csv_path):
-        self.data = []
-        self.header = []
-        self.load_csv(csv_path)
-
-    def load_csv(self, csv_path):
-        with open(csv_path, 'r', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            self.header = reader.fieldnames
-            count = 0
-            for row in reader:
-                # Only add rows with a Vehicle and Fuel and Vehicle Year value
-                if row.get('Vehicle and Fuel and Vehicle Year'):
-                    self.data.append(row)
-                    count += 1
+class Reference_EF_Road(_Reference_EF_Table):
+    # Only rows with a Vehicle and Fuel and Vehicle Year value are loaded
+    KEY_COLUMN = 'Vehicle and Fuel and Vehicle Year'
 
     def get_by_vehicle_and_region(self, vehicle_fuel_year, region):
-        # Case-insensitive match for both vehicle_fuel_year and region
-        results = [
-            row for row in self.data
-            if row['Vehicle and Fuel and Vehicle Year'].strip().lower() == vehicle_fuel_year.strip().lower()
-            and row['Region'].strip().lower() == region.strip().lower()
-        ]
-        return results
+        return self._lookup(vehicle_fuel_year, region)
 
 
-class Reference_EF_Freight_CH4_NO2:
-    def __init__(self, csv_path):
-        self.data = []
-        self.header = []
-        self.load_csv(csv_path)
-
-    def load_csv(self, csv_path):
-        with open(csv_path, 'r', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            self.header = reader.fieldnames
-            count = 0
-            for row in reader:
-                # Only add rows with a Vehicle Type value
-                if row.get('Vehicle Type'):
-                    self.data.append(row)
-                    count += 1
+class Reference_EF_Freight_CH4_NO2(_Reference_EF_Table):
+    # Only rows with a Vehicle Type value are loaded
+    KEY_COLUMN = 'Vehicle Type'
 
     def get_by_vehicle_and_region(self, vehicle_type, region):
-        # Case-insensitive match for both vehicle_type and region
-        results = [
-            row for row in self.data
-            if row['Vehicle Type'].strip().lower() == vehicle_type.strip().lower()
-            and row['Region'].strip().lower() == region.strip().lower()
-        ]
-        return results
-
+        return self._lookup(vehicle_type, region)
 
-class Reference_EF_Public:
-    def __init__(self, csv_path):
-        self.data = []
-        self.header = []
-        self.load_csv(csv_path)
 
-    def load_csv(self, csv_path):
-        with open(csv_path, 'r', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            self.header = reader.fieldnames
-            count = 0
-            for row in reader:
-                # Only add rows with a Vehicle and Type value
-                if row.get('Vehicle and Type'):
-                    self.data.append(row)
-                    count += 1
+class Reference_EF_Public(_Reference_EF_Table):
+    # Only rows with a Vehicle and Type value are loaded
+    KEY_COLUMN = 'Vehicle and Type'
 
     def get_by_vehicle_and_region(self, vehicle_type, region):
-        # Case-insensitive match for both vehicle_type and region
-        results = [
-            row for row in self.data
-            if row['Vehicle and Type'].strip().lower() == vehicle_type.strip().lower()
-            and row['Region'].strip().lower() == region.strip().lower()
-        ]
-        return results
+        return self._lookup(vehicle_type, region)
 
 # Reference_EF_Freight_CO2: similar to Reference_EF_Public but for Reference_EF_Freight_CO2.csv
 
 
-class Reference_EF_Freight_CO2:
-    def __init__(self, csv_path):
-        self.data = []
-        self.header = []
-        self.load_csv(csv_path)
-
-    def load_csv(self, csv_path):
-        with open(csv_path, 'r', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            self.header = reader.fieldnames
-            count = 0
-            for row in reader:
-                # Only add rows with a Vehicle and Size value
-                if row.get('Vehicle and Size'):
-                    self.data.append(row)
-                    count += 1
+class Reference_EF_Freight_CO2(_Reference_EF_Table):
+    # Only rows with a Vehicle and Size value are loaded
+    KEY_COLUMN = 'Vehicle and Size'
 
     def get_by_vehicle_and_region(self, vehicle_size, region):
-        # Case-insensitive match for both vehicle_size and region
-        results = [
-            row for row in self.data
-            if row['Vehicle and Size'].strip().lower() == vehicle_size.strip().lower()
-            and row['Region'].strip().lower() == region.strip().lower()
-        ]
-        return results
+        return self._lookup(vehicle_size, region)
@@ -1,28 +1,32 @@
 import csv
 import os
 
+from Components.columnar_table import Columnar_Table
+
 
 class ReferenceLookup:
     def __init__(self, csv_path, lookup_column):
         self.lookup_column = lookup_column
-        self.data = []
+        self.table = Columnar_Table([], [])
         self.header = []
         self.load_csv(csv_path)
 
+    @property
+    def data(self):
+        # Rows are materialized as dicts on demand from the column store
+        return self.table
+
     def load_csv(self, csv_path):
         with open(csv_path, 'r', encoding='utf-8-sig') as file:
             reader = csv.DictReader(file)
             self.header = reader.fieldnames
-            count = 0
-            for row in reader:
-                if row.get(self.lookup_column):
-                    self.data.append(row)
-                    count += 1
+            rows = (row for row in reader if row.get(self.lookup_column))
+            self.table = Columnar_Table(self.header, rows)
 
     def get_all(self):
-        # Return all unique values for the lookup column
-        return sorted(set(row[self.lookup_column] for row in self.data if row[self.lookup_column]))
+        # Return all unique values for the lookup column (each category is stored once)
+        return sorted(value for value in self.table.categories.get(self.lookup_column, []) if value)
 
     def get_by_value(self, value):
         # Return all rows matching the lookup value (case-insensitive)
-        return [row for row in self.data if row[self.lookup_column].strip().lower() == value.strip().lower()]
+        return self.table.rows(self.table.positions_where(self.lookup_column, value))
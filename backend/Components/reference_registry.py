@@ -0,0 +1,285 @@
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Components.reference_ef import (Reference_EF_Public, Reference_EF_Freight_CO2, Reference_EF_Freight_CH4_NO2,
+                                     Reference_EF_Road, Reference_EF_Fuel_Use_CH4_N2O, Reference_EF_Fuel_Use_CO2,
+                                     Reference_Unit_Conversion)
+from Components.facet_index import Facet_Index
+from Components.reference_lookups import ReferenceLookup
+from Components.Reference_Source_Product_Matrix import Reference_Source_Product_Matrix
+from Components.reference_snapshot import Reference_Snapshot, SourceChangedError
+from Components.reference_supplier_catalog import Reference_Supplier_Catalog
+from Services.GhgEmissionsEngine import GhgEmissionsEngine
+from Services.LookupResponses import LookupResponses
+
+logger = logging.getLogger(__name__)
+
+# Registry names of the Reference - Lookups.csv tables are prefixed with this
+LOOKUP_PREFIX = 'lookups:'
+# Registry names of the Facet_Index of a table are its name with this prefix
+FACET_PREFIX = 'facets:'
+# Facet queries answered at load time: (field, facet columns) per table
+PRECOMPUTED_FACETS = {
+    # /api/vehicle_and_size for every (region, mode of transport) pair
+    'ef_freight_co2': [('Vehicle and Size', ['Region', 'Mode of Transport'])]
+}
+
+
+class Reference_Registry:
+    """
+    Lazily loaded reference tables.
+
+    Each table is registered with its source CSV(s) and a build function and
+    is loaded on first get(), through the on-disk Reference_Snapshot when a
+    snapshot path is configured. preload() loads every table on a thread pool
+    instead. Loads are serialized per table, so concurrent requests for the
+    same table build it once, and the wall time and origin ('snapshot' or
+    'csv') of every load are recorded for status().
+
+    A registry is one version of the reference data: `version` is derived
+    from the content hashes of every source CSV, and reloading builds a new
+    registry rather than modifying this one (see Reference_Reloader). A table
+    whose CSV was edited after the version was computed is not loaded under
+    that version: get() raises SourceChangedError and calls
+    on_source_changed(registry), if set, so a new version can be loaded.
+    """
+
+    def __init__(self, snapshot_path=None, max_workers=None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            snapshot_path (str, optional): Reference_Snapshot file; None always builds from CSV
+            max_workers (int, optional): Thread pool size used by preload()
+        """
+        self.snapshot_path = snapshot_path
+        self.max_workers = max_workers
+        self.definitions = {}
+        self.tables = {}
+        self.load_times = {}
+        self.load_sources = {}
+        self._locks = {}
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+        self._preloading = False
+        self._version = None
+        self.on_source_changed = None
+
+    def register(self, name, sources, build):
+        """
+        Register a table.
+
+        Args:
+            name (str): Registry name (e.g. 'ef_freight_co2')
+            sources (str or tuple): Source CSV path, or a tuple of paths for
+                objects derived from several CSVs
+            build (callable): Called with sources to build the table; it may
+                get() other tables it depends on
+        """
+        self.definitions[name] = (sources, build)
+        self._locks[name] = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.definitions
+
+    @property
+    def names(self):
+        return list(self.definitions)
+
+    @property
+    def source_paths(self):
+        """Every distinct source CSV path of the registered tables."""
+        paths = []
+        for sources, _ in self.definitions.values():
+            for path in (sources if isinstance(sources, tuple) else (sources,)):
+                if path not in paths:
+                    paths.append(path)
+        return paths
+
+    @property
+    def version(self):
+        """Short content hash of every source CSV, computed once per registry."""
+        if self._version is None:
+            digest = hashlib.sha256()
+            for path in sorted(self.source_paths):
+                digest.update(self.snapshot.source_hash(path).encode())
+            self._version = digest.hexdigest()[:12]
+        return self._version
+
+    @property
+    def snapshot(self):
+        # Opened on first use so importing the app does not read the snapshot file
+        if self._snapshot is None:
+            with self._snapshot_lock:
+                if self._snapshot is None:
+                    self._snapshot = Reference_Snapshot(self.snapshot_path)
+        return self._snapshot
+
+    def get(self, name):
+        """
+        Get a table, loading it on first access.
+
+        Raises:
+            KeyError: If no table is registered under name
+            SourceChangedError: If a source CSV of the table changed after the
+                registry version was computed
+        """
+        table = self.tables.get(name)
+        if table is not None:
+            return table
+        if name not in self.definitions:
+            raise KeyError(f"Unknown reference table: {name}")
+
+        with self._locks[name]:
+            table = self.tables.get(name)
+            if table is None:
+                table = self._load(name)
+        return table
+
+    def _load(self, name):
+        sources, build = self.definitions[name]
+        built_from_csv = []
+
+        def build_from_csv(csv_paths):
+            built_from_csv.append(True)
+            return build(csv_paths)
+
+        start = time.perf_counter()
+        try:
+            table = self.snapshot.get_or_build(name, sources, build_from_csv)
+        except SourceChangedError as e:
+            logger.warning("Not loading reference table %s for version %s: %s", name, self.version, e)
+            if self.on_source_changed is not None:
+                self.on_source_changed(self)
+            raise
+        # Includes the time to load any tables this one depends on
+        self.load_times[name] = time.perf_counter() - start
+        self.load_sources[name] = 'csv' if built_from_csv else 'snapshot'
+        self.tables[name] = table
+        logger.info("Loaded reference table %s from %s in %.1f ms",
+                    name, self.load_sources[name], self.load_times[name] * 1000)
+
+        if built_from_csv and not self._preloading:
+            self.snapshot.save()
+        return table
+
+    def preload(self, names=None):
+        """
+        Load tables in parallel on a thread pool and save the snapshot once.
+
+        Args:
+            names (list, optional): Tables to load; defaults to every registered table
+
+        Returns:
+            dict: status() after loading
+        """
+        names = self.names if names is None else names
+        self._preloading = True
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(self.get, names))
+        finally:
+            self._preloading = False
+        self.snapshot.save()
+        return self.status()
+
+    def status(self):
+        """
+        Load state of every registered table.
+
+        Returns:
+            dict: Table name -> {'loaded', 'source', 'load_ms'}
+        """
+        return {
+            name: {
+                'loaded': name in self.tables,
+                'source': self.load_sources.get(name),
+                'load_ms': round(self.load_times[name] * 1000, 3) if name in self.load_times else None
+            }
+            for name in self.definitions
+        }
+
+
+def _build_facet_index(reference, precompute):
+    facet_index = Facet_Index(reference.table)
+    for field, facet_columns in precompute:
+        facet_index.precompute(field, facet_columns)
+    return facet_index
+
+
+def create_reference_registry(config):
+    """
+    Register every reference table used by the backend.
+
+    Args:
+        config: Config instance providing CSV paths, lookup columns and the
+            snapshot and loader settings
+
+    Returns:
+        Reference_Registry: Registry with nothing loaded yet
+    """
+    registry = Reference_Registry(config.REFERENCE_SNAPSHOT_PATH or None,
+                                  config.REFERENCE_LOAD_WORKERS)
+
+    lookups_csv_path = config.get_csv_path('lookups')
+    for column in config.LOOKUP_COLUMNS:
+        registry.register(LOOKUP_PREFIX + column, lookups_csv_path,
+                          lambda csv_path, column=column: ReferenceLookup(csv_path, column))
+
+    for csv_key, reference_class in [
+            ('unit_conversion', Reference_Unit_Conversion),
+            ('ef_fuel_use_co2', Reference_EF_Fuel_Use_CO2),
+            ('ef_fuel_use_ch4_n2o', Reference_EF_Fuel_Use_CH4_N2O),
+            ('ef_road', Reference_EF_Road),
+            ('ef_public', Reference_EF_Public),
+            ('ef_freight_co2', Reference_EF_Freight_CO2),
+            ('ef_freight_ch4_no2', Reference_EF_Freight_CH4_NO2),
+            ('source_product_matrix', Reference_Source_Product_Matrix)]:
+        registry.register(csv_key, config.get_csv_path(csv_key), reference_class)
+
+    # Facet indexes for cascading dropdowns (/api/facets, /api/vehicle_and_size)
+    for table_name in config.FACET_TABLES:
+        registry.register(
+            FACET_PREFIX + table_name, config.get_csv_path(table_name),
+            lambda csv_path, table_name=table_name: _build_facet_index(
+                registry.get(table_name), PRECOMPUTED_FACETS.get(table_name, [])))
+
+    # Resolved factor tables for every gas, precomputed from four reference tables
+    registry.register(
+        'ghg_emissions_engine',
+        tuple(config.get_csv_path(csv_key) for csv_key in
+              ['ef_freight_co2', 'ef_fuel_use_co2', 'ef_fuel_use_ch4_n2o', 'unit_conversion']),
+        lambda csv_paths: GhgEmissionsEngine.from_references(
+            reference_ef_freight_co2=registry.get('ef_freight_co2'),
+            reference_ef_fuel_use_co2=registry.get('ef_fuel_use_co2'),
+            reference_ef_fuel_use_ch4_n2o=registry.get('ef_fuel_use_ch4_n2o'),
+            reference_unit_conversion=registry.get('unit_conversion')
+        ))
+
+    # Supplier list merged with the source product matrix keys
+    supplier_catalog_sources = (config.get_csv_path('supplier_list'), config.get_csv_path('source_product_matrix'))
+    registry.register(
+        'supplier_catalog', supplier_catalog_sources,
+        lambda csv_paths: Reference_Supplier_Catalog(csv_paths[0], registry.get('source_product_matrix')))
+
+    # Serialized dropdown responses (/api/lookup/<name>, /api/fuel_types, /api/suppliers)
+    registry.register(
+        'lookup_responses',
+        (lookups_csv_path, config.get_csv_path('ef_fuel_use_co2')) + supplier_catalog_sources,
+        lambda csv_paths: LookupResponses.from_references(
+            lookups={name: registry.get(LOOKUP_PREFIX + column)
+                     for name, column in config.LOOKUP_NAMES.items()},
+            reference_ef_fuel_use_co2=registry.get('ef_fuel_use_co2'),
+            supplier_catalog=registry.get('supplier_catalog')
+        ))
+
+    # /api/bootstrap: every dropdown catalog and the reference version. Registered
+    # last and sourced from every CSV, so any change rebuilds the version it states
+    registry.register(
+        'bootstrap_response', tuple(registry.source_paths),
+        lambda csv_paths: LookupResponses.bootstrap(registry.get('lookup_responses'), registry.version))
+
+    return registry
@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class Reference_Reloader:
+    """
+    Hot reload of the reference data without restarting the process.
+
+    `current` is the Reference_Registry that new requests use. reload()
+    builds a fresh registry from the CSVs on a background thread, preloads
+    every table, and only then replaces `current` with a single attribute
+    assignment, so requests never see a partially loaded version and requests
+    already holding the previous registry finish with it. A reload whose
+    source CSVs are unchanged (same version) keeps the current registry.
+
+    An optional watcher thread polls the source CSV modification times and
+    triggers a reload when any of them changes. A current registry that finds
+    a source CSV edited while lazily loading a table also triggers one. Swap listeners are called
+    with the new registry after every swap, e.g. to drop derived caches.
+    """
+
+    def __init__(self, create_registry):
+        """
+        Initialize the reloader with the first registry.
+
+        Args:
+            create_registry (callable): Returns a new, unloaded Reference_Registry
+        """
+        self.create_registry = create_registry
+        self.current = create_registry()
+        self.current.on_source_changed = self._source_changed
+        # Pin the version to the CSV contents at startup, before any table loads
+        self.current.version
+        self.reload_count = 0
+        self.last_reload = {'status': 'idle'}
+        self._reload_lock = threading.Lock()
+        self._reload_thread = None
+        self._watcher_thread = None
+        self._stop_watcher = threading.Event()
+        self._mtimes = self._source_mtimes()
+        self._swap_listeners = []
+
+    def add_swap_listener(self, listener):
+        """
+        Call listener(registry) whenever a reload swaps in a new registry.
+
+        Listener errors are logged and do not affect the reload.
+        """
+        self._swap_listeners.append(listener)
+
+    def _source_changed(self, registry):
+        # Raised by a table load of a registry: only a current one needs replacing
+        if registry is self.current:
+            self.reload()
+
+    def _source_mtimes(self):
+        mtimes = {}
+        for path in self.current.source_paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def reload(self, wait=False):
+        """
+        Start a background reload unless one is already running.
+
+        Args:
+            wait (bool): Block until the reload has finished
+
+        Returns:
+            dict: The reload status (final status when wait is True)
+        """
+        with self._reload_lock:
+            if self._reload_thread is None or not self._reload_thread.is_alive():
+                self.last_reload = {
+                    'status': 'reloading',
+                    'previous_version': self.current.version,
+                    'started_at': datetime.now().isoformat()
+                }
+                self._reload_thread = threading.Thread(
+                    target=self._reload, name='reference-reload', daemon=True)
+                self._reload_thread.start()
+            thread = self._reload_thread
+
+        if wait:
+            thread.join()
+        return dict(self.last_reload)
+
+    def _reload(self):
+        start = time.perf_counter()
+        previous = self.current
+        status = dict(self.last_reload)
+        # Record the modification times being loaded so the watcher does not
+        # trigger again for the same change
+        self._mtimes = self._source_mtimes()
+        try:
+            registry = self.create_registry()
+            if registry.version == previous.version:
+                status['status'] = 'unchanged'
+            else:
+                registry.preload()
+                registry.on_source_changed = self._source_changed
+                self.current = registry
+                self.reload_count += 1
+                status['status'] = 'swapped'
+                for listener in self._swap_listeners:
+                    try:
+                        listener(registry)
+                    except Exception:
+                        logger.exception("Reference data swap listener failed")
+            status['version'] = self.current.version
+        except Exception as e:
+            # The current version keeps serving; the error is reported in status()
+            logger.exception("Reference data reload failed")
+            status['status'] = 'failed'
+            status['error'] = str(e)
+            status['version'] = previous.version
+
+        status['finished_at'] = datetime.now().isoformat()
+        status['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        self.last_reload = status
+        logger.info("Reference data reload %s (version %s)",
+                    status['status'], status['version'])
+
+    def check_for_changes(self):
+        """Reload if any source CSV modification time changed; returns True if a reload started."""
+        if self._source_mtimes() == self._mtimes:
+            return False
+        self.reload()
+        return True
+
+    def start_watcher(self, interval):
+        """
+        Poll the source CSVs every `interval` seconds on a daemon thread.
+
+        Returns:
+            bool: False if a watcher is already running
+        """
+        if self._watcher_thread is not None and self._watcher_thread.is_alive():
+            return False
+        self._stop_watcher.clear()
+
+        def watch():
+            while not self._stop_watcher.wait(interval):
+                try:
+                    self.check_for_changes()
+                except Exception:
+                    logger.exception("Reference data watcher check failed")
+
+        self._watcher_thread = threading.Thread(
+            target=watch, name='reference-watcher', daemon=True)
+        self._watcher_thread.start()
+        return True
+
+    def stop_watcher(self):
+        self._stop_watcher.set()
+        if self._watcher_thread is not None:
+            self._watcher_thread.join()
+            self._watcher_thread = None
+
+    def status(self):
+        """
+        Current version, table load state and last reload outcome.
+
+        Returns:
+            dict: {'version', 'reload_count', 'watching', 'last_reload', 'tables'}
+        """
+        return {
+            'version': self.current.version,
+            'reload_count': self.reload_count,
+            'watching': self._watcher_thread is not None and self._watcher_thread.is_alive(),
+            'last_reload': dict(self.last_reload),
+            'tables': self.current.status()
+        }
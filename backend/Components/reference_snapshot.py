@@ -0,0 +1,210 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Modules (relative to the backend directory) whose classes are stored in the
+# snapshot; editing any of them invalidates every entry so stale object
+# layouts are never unpickled
+_SNAPSHOT_MODULES = (
+    os.path.join('Components', 'columnar_table.py'),
+    os.path.join('Components', 'facet_index.py'),
+    os.path.join('Components', 'reference_ef.py'),
+    os.path.join('Components', 'reference_lookups.py'),
+    os.path.join('Components', 'Reference_Source_Product_Matrix.py'),
+    os.path.join('Components', 'reference_supplier_catalog.py'),
+    os.path.join('Components', 'resolved_emission_factors.py'),
+    os.path.join('Services', 'GhgEmissionsEngine.py'),
+    os.path.join('Services', 'LookupResponses.py')
+)
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SourceChangedError(RuntimeError):
+    """A source CSV changed between hashing it and building a table from it."""
+
+    def __init__(self, name, paths):
+        super().__init__(f"Reference source changed while building {name}: {', '.join(paths)}")
+        self.name = name
+        self.paths = paths
+
+
+class Reference_Snapshot:
+    """
+    On-disk binary snapshot of parsed reference tables.
+
+    Each entry holds a fully built reference object (column store, numeric
+    arrays and hash indexes, or derived objects such as precomputed factor
+    tables) together with the SHA-256 of the CSVs it was built from.
+    get_or_build() returns the stored object when the CSV content is unchanged
+    and rebuilds it otherwise, so a warm start unpickles one file instead of
+    re-parsing every CSV. A table built from a CSV that no longer matches its
+    recorded hash is rejected rather than stored under the old hash. save() rewrites the file atomically only when an
+    entry was rebuilt. Entries may be built from several threads at once.
+
+    The snapshot is a local cache written by this application and is loaded
+    with pickle; it must not be pointed at files from untrusted sources.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path=None):
+        """
+        Initialize the snapshot; the file is read on the first get_or_build().
+
+        Args:
+            path (str, optional): Snapshot file location; None keeps entries in
+                memory only (every table is built from its CSV)
+        """
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._file_hashes = {}
+        self._lock = threading.Lock()
+        self._loaded = not path
+        self.code_hash = self._code_hash()
+
+    @staticmethod
+    def _code_hash():
+        digest = hashlib.sha256()
+        backend_dir = os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))
+        for module in _SNAPSHOT_MODULES:
+            module_path = os.path.join(backend_dir, module)
+            if os.path.exists(module_path):
+                digest.update(_hash_file(module_path).encode())
+        return digest.hexdigest()
+
+    def source_hash(self, csv_path):
+        """
+        Content hash of a source CSV, computed once per snapshot instance.
+
+        A tuple of paths (for objects derived from several CSVs) hashes to the
+        combination of the individual file hashes.
+        """
+        if isinstance(csv_path, tuple):
+            return hashlib.sha256('\n'.join(self.source_hash(path) for path in csv_path)
+                                  .encode()).hexdigest()
+        source_hash = self._file_hashes.get(csv_path)
+        if source_hash is None:
+            source_hash = _hash_file(csv_path)
+            self._file_hashes[csv_path] = source_hash
+        return source_hash
+
+    def changed_sources(self, csv_path):
+        """Paths of csv_path whose content on disk no longer matches source_hash()."""
+        paths = csv_path if isinstance(csv_path, tuple) else (csv_path,)
+        return [path for path in paths if _hash_file(path) != self.source_hash(path)]
+
+    def load(self):
+        """Read the snapshot file; a missing, corrupt or outdated file yields no entries."""
+        self.entries = {}
+        self._loaded = True
+        try:
+            with open(self.path, 'rb') as file:
+                snapshot = pickle.load(file)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(
+                "Ignoring unreadable reference snapshot %s: %s", self.path, e)
+            return
+
+        if (not isinstance(snapshot, dict)
+                or snapshot.get('format_version') != self.FORMAT_VERSION
+                or snapshot.get('code_hash') != self.code_hash):
+            logger.info(
+                "Reference snapshot %s is outdated; rebuilding", self.path)
+            return
+        self.entries = snapshot.get('entries', {})
+
+    def get_or_build(self, name, csv_path, build):
+        """
+        Get a reference table from the snapshot, rebuilding it if its CSV changed.
+
+        Args:
+            name (str): Snapshot entry name (e.g. 'ef_freight_co2')
+            csv_path (str or tuple): Source CSV the table is built from, or a
+                tuple of paths for objects derived from several CSVs
+            build (callable): Called with csv_path to build the table from scratch
+
+        Returns:
+            The reference table object
+
+        Raises:
+            SourceChangedError: If a source CSV changed after its hash was
+                recorded, so the table may not match that hash
+        """
+        source_hash = self.source_hash(csv_path)
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            entry = self.entries.get(name)
+            if entry is not None and entry['source_hash'] == source_hash:
+                self.hits += 1
+                return entry['table']
+            self.misses += 1
+
+        table = build(csv_path)
+        # The hash is recorded once per snapshot (it is the registry version),
+        # so check that the build read that content and not a later edit
+        changed = self.changed_sources(csv_path)
+        if changed:
+            raise SourceChangedError(name, changed)
+        with self._lock:
+            self.entries[name] = {'source_hash': source_hash, 'table': table}
+            self.dirty = True
+        return table
+
+    def save(self):
+        """Write the snapshot if any entry was rebuilt; failures are logged, not raised."""
+        with self._lock:
+            if not self.path or not self.dirty:
+                return False
+            saved = self._write()
+            if saved:
+                self.dirty = False
+            return saved
+
+    def _write(self):
+        snapshot = {
+            'format_version': self.FORMAT_VERSION,
+            'code_hash': self.code_hash,
+            'entries': self.entries
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file and rename so concurrent workers never
+            # read a partially written snapshot
+            fd, temp_path = tempfile.mkstemp(
+                dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    pickle.dump(snapshot, file,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except Exception as e:
+            # e.g. a read-only directory, or a table mutated by another thread
+            # while it was being pickled; the next save retries
+            logger.warning(
+                "Could not write reference snapshot %s: %s", self.path, e)
+            return False
+        return True
@@ -0,0 +1,108 @@
+import bisect
+import csv
+
+
+class Reference_Supplier_Catalog:
+    """
+    Supplier names from Supplier_List.csv merged with the SUPPLIER-PRODUCT-LOCATION
+    keys of Reference_Source_Product_Matrix, with a case-insensitive search index.
+
+    search() returns prefix matches first, found by bisection in the sorted
+    lowercase names, then substring matches, found with str.find over all
+    lowercase names joined into one string. Both run in C over the whole
+    catalog, so a typeahead query costs microseconds even for thousands of
+    suppliers.
+    """
+
+    SUPPLIER_COLUMN = 'SUPPLIER-PRODUCT-LOCATION'
+
+    def __init__(self, csv_path, source_product_matrix=None):
+        """
+        Load the catalog.
+
+        Args:
+            csv_path (str): Supplier_List.csv
+            source_product_matrix (Reference_Source_Product_Matrix, optional): Adds its
+                SUPPLIER-PRODUCT-LOCATION keys missing from the supplier list
+        """
+        self.suppliers = []
+        self._load_csv(csv_path)
+        if source_product_matrix is not None:
+            self._merge(source_product_matrix.table.categories.get(self.SUPPLIER_COLUMN, []))
+
+        # Catalog positions sorted by lowercase name, and the lowercase names in that order
+        self._sorted_positions = sorted(range(len(self.suppliers)),
+                                        key=lambda position: self.suppliers[position].lower())
+        self._sorted_keys = [self.suppliers[position].lower() for position in self._sorted_positions]
+        # Sorted lowercase names separated by '\n' (which no name contains) and the
+        # offset of each name in it
+        self._blob = '\n'.join(self._sorted_keys)
+        self._offsets = []
+        offset = 0
+        for key in self._sorted_keys:
+            self._offsets.append(offset)
+            offset += len(key) + 1
+
+    def _load_csv(self, csv_path):
+        with open(csv_path, 'r', encoding='utf-8-sig') as file:
+            # One quoted name per line; the file has no header row
+            csv_reader = csv.reader(file)
+            for row in csv_reader:
+                if row:  # Check if row is not empty
+                    # Remove quotes and trim whitespace
+                    self.suppliers.append(row[0].strip('"').strip())
+
+    def _merge(self, names):
+        known = {supplier.lower() for supplier in self.suppliers}
+        for name in names:
+            name = (name or '').strip()
+            if name and '\n' not in name and name.lower() not in known:
+                known.add(name.lower())
+                self.suppliers.append(name)
+
+    def __len__(self):
+        return len(self.suppliers)
+
+    def search(self, query, limit=20, offset=0):
+        """
+        Case-insensitive typeahead search.
+
+        Args:
+            query (str): Text to find; empty lists the catalog in its original order
+            limit (int): Maximum number of names returned
+            offset (int): Matches to skip (pagination)
+
+        Returns:
+            tuple: (names, has_more) - the page of supplier names, prefix matches
+                first, each group in alphabetical order
+        """
+        query = (query or '').strip().lower()
+        wanted = offset + limit + 1
+        if '\n' in query:
+            return [], False
+        if not query:
+            matches = self.suppliers[offset:offset + limit + 1]
+            return matches[:limit], len(matches) > limit
+
+        # Prefix matches are a contiguous run of the sorted keys
+        start = bisect.bisect_left(self._sorted_keys, query)
+        end = start
+        while end < len(self._sorted_keys) and end - start < wanted and \
+                self._sorted_keys[end].startswith(query):
+            end += 1
+        positions = list(range(start, end))
+
+        # Then substring matches that are not prefix matches
+        found = self._blob.find(query)
+        while found != -1 and len(positions) < wanted:
+            index = bisect.bisect_right(self._offsets, found) - 1
+            if found != self._offsets[index]:
+                positions.append(index)
+            # Continue after this name so each name is returned once
+            next_index = index + 1
+            if next_index >= len(self._offsets):
+                break
+            found = self._blob.find(query, self._offsets[next_index])
+
+        page = positions[offset:offset + limit]
+        return [self.suppliers[self._sorted_positions[index]] for index in page], len(positions) > offset + limit
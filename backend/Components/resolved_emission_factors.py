@@ -0,0 +1,167 @@
+import math
+
+
+class Resolved_Emission_Factors:
+    """
+    Table of fully resolved emission factors for one gas.
+
+    A resolved factor is the reference emission factor multiplied by the
+    numerator conversion (to Metric Ton) and the denominator conversion (from
+    the activity input unit), i.e. exactly what the calculators'
+    get_emission_factor_* methods return. Factors are precomputed for every
+    reference row and input unit at startup and memoized for any combination
+    seen later, so the per-row cost is a single dict lookup.
+    """
+
+    FREIGHT = 'freight'
+    FUEL = 'fuel'
+    TARGET_UNIT = 'Metric Ton'
+
+    # Upper bound on memoized combinations that were not precomputed, so
+    # arbitrary user input cannot grow the table without limit
+    MAX_MEMOIZED_ENTRIES = 10000
+
+    def __init__(self, gas, reference_ef_freight=None, reference_ef_fuel=None, reference_unit_conversion=None, precompile=True):
+        """
+        Initialize the table with reference data instances.
+
+        Args:
+            gas (str): Gas column in the reference tables (e.g. 'CO2', 'CH4')
+            reference_ef_freight: Reference_EF_Freight_CO2 instance for freight emission factors
+            reference_ef_fuel: Reference_EF_Fuel_Use_CO2 or Reference_EF_Fuel_Use_CH4_N2O instance for fuel emission factors
+            reference_unit_conversion: Reference_Unit_Conversion instance for unit conversions
+            precompile (bool): Resolve every reference row and input unit up front
+        """
+        self.gas = gas
+        self.numerator_column = f'{gas} Unit - Numerator'
+        self.denominator_column = f'{gas} Unit - Denominator'
+        self.references = {
+            self.FREIGHT: reference_ef_freight,
+            self.FUEL: reference_ef_fuel
+        }
+        self.reference_unit_conversion = reference_unit_conversion
+        self.factors = {}
+        self.memoized_entries = 0
+
+        if precompile:
+            self.precompile()
+
+    @staticmethod
+    def _normalize_key(value):
+        return value.strip().lower() if value else ''
+
+    @staticmethod
+    def _normalize_unit(unit):
+        return unit.strip().casefold() if unit else ''
+
+    def _conversion(self, from_unit, to_unit):
+        if not self.reference_unit_conversion:
+            return 0.0
+        return self.reference_unit_conversion.get_conversion_factor(from_unit, to_unit) or 0.0
+
+    def resolve(self, path, key, region, input_unit):
+        """
+        Resolve a factor from the reference data without consulting the table.
+
+        Args:
+            path (str): FREIGHT or FUEL calculation path
+            key (str): Vehicle and Size (freight) or fuel name (fuel)
+            region (str): Geographic region
+            input_unit (str): Unit of the activity data (distance or fuel amount)
+
+        Returns:
+            float: Resolved emission factor, 0.0 if no factor is available
+        """
+        return self._resolve(path, key, region, input_unit)
+
+    def explain(self, path, key, region, input_unit):
+        """
+        Describe how the factor for one combination is derived.
+
+        Returns:
+            dict: Lineage with the reference source row, numerator and
+                denominator conversions, the reference factor and the final
+                resolved factor
+        """
+        lineage = {
+            'gas': self.gas,
+            'calculation_path': path,
+            'source_table': None,
+            'source_row': None,
+            'reference_factor': None,
+            'numerator': None,
+            'denominator': None,
+            'resolved_factor': 0.0
+        }
+        lineage['resolved_factor'] = self._resolve(
+            path, key, region, input_unit, lineage)
+        return lineage
+
+    def _resolve(self, path, key, region, input_unit, lineage=None):
+        # lineage, when given, is filled in with each step of the derivation
+        reference = self.references.get(path)
+        if not reference:
+            return 0.0
+
+        positions = reference.index.get(
+            (self._normalize_key(key), self._normalize_key(region)), [])
+        if not positions:
+            return 0.0
+        position = positions[0]
+        table = reference.table
+
+        unit_numerator = table.value(self.numerator_column, position)
+        unit_denominator = table.value(self.denominator_column, position)
+
+        numerator = self._conversion(
+            unit_numerator, self.TARGET_UNIT) if unit_numerator else 0.0
+        denominator = self._conversion(
+            input_unit, unit_denominator) if input_unit and unit_denominator else 0.0
+
+        emission_factor = table.numeric_value(
+            self.gas, position) if self.gas in table.numeric else math.nan
+
+        if lineage is not None:
+            lineage.update({
+                'source_table': type(reference).__name__,
+                'source_row': table.row(position),
+                'reference_factor': None if math.isnan(emission_factor) else emission_factor,
+                'numerator': {'from_unit': unit_numerator, 'to_unit': self.TARGET_UNIT, 'conversion': numerator},
+                'denominator': {'from_unit': input_unit, 'to_unit': unit_denominator, 'conversion': denominator}
+            })
+
+        if math.isnan(emission_factor):
+            # Blank or non-numeric factor in the reference data
+            return 0.0
+        return emission_factor * numerator * denominator
+
+    def get(self, path, key, region, input_unit):
+        """
+        Get a resolved factor, memoizing combinations not seen before.
+
+        Returns:
+            float: Resolved emission factor, 0.0 if no factor is available
+        """
+        table_key = (path, self._normalize_key(key),
+                     self._normalize_key(region), self._normalize_unit(input_unit))
+        factor = self.factors.get(table_key)
+        if factor is None:
+            factor = self.resolve(path, key, region, input_unit)
+            if self.memoized_entries < self.MAX_MEMOIZED_ENTRIES:
+                self.factors[table_key] = factor
+                self.memoized_entries += 1
+        return factor
+
+    def precompile(self):
+        """Resolve every (path, key, region) in the reference indexes for every known input unit."""
+        input_units = ['']
+        if self.reference_unit_conversion:
+            input_units += list(self.reference_unit_conversion.row_index)
+
+        for path, reference in self.references.items():
+            if not reference:
+                continue
+            for key, region in reference.index:
+                for input_unit in input_units:
+                    self.factors[(path, key, region, input_unit)] = self.resolve(
+                        path, key, region, input_unit)
@@ -0,0 +1,184 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from Components.reference_registry import create_reference_registry
+from Services.SupplierEmissionsCalculator import SupplierEmissionsCalculator
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Config and calculator of the current worker process, set by _init_worker
+_worker_config = None
+_worker_calculator = None
+
+
+def _load_registry(config):
+    registry = create_reference_registry(config or get_config())
+    registry.preload()
+    return registry
+
+
+def _exit_with_parent(parent_pid):
+    while os.getppid() == parent_pid:
+        time.sleep(1.0)
+    os._exit(0)
+
+
+def _init_worker(config, registry):
+    global _worker_config, _worker_calculator
+    # Exit with the web process even if it is killed without shutting the pool down
+    threading.Thread(target=_exit_with_parent, args=(os.getppid(),), name='parent-watch', daemon=True).start()
+    _worker_config = config
+    if registry is None:
+        # Spawned (not forked) workers cannot inherit the parent's tables and
+        # load their own copy, normally from the on-disk snapshot
+        registry = _load_registry(config)
+    _worker_calculator = SupplierEmissionsCalculator(registry)
+
+
+def _calculate_supplier(version, payload):
+    global _worker_calculator
+    if _worker_calculator.registry.version != version:
+        # The parent reloaded its reference data: load the new version, which
+        # the parent's reload has saved to the snapshot
+        registry = _load_registry(_worker_config)
+        if registry.version != version:
+            return {'status': 'error', 'error': f'Reference data changed from version {version} to '
+                                                f'{registry.version} during the batch; retry the request'}
+        _worker_calculator = SupplierEmissionsCalculator(registry)
+    return calculate_supplier_payload(_worker_calculator, payload)
+
+
+def calculate_supplier_payload(calculator, payload):
+    """
+    Calculate one supplier payload of a batch, capturing its errors.
+
+    Args:
+        calculator: SupplierEmissionsCalculator to use
+        payload (dict): {'supplier_data': {...}, 'activity_rows': [...]}
+
+    Returns:
+        dict: {'status': 'success', 'result': report} or {'status': 'error', 'error': message}
+    """
+    try:
+        if not isinstance(payload, dict):
+            raise TypeError('Each supplier payload must be a JSON object')
+        report = calculator.calculate(payload.get('supplier_data') or {},
+                                      payload.get('activity_rows') or [])
+        return {'status': 'success', 'result': report}
+    except Exception as e:
+        return {'status': 'error', 'error': str(e)}
+
+
+class BatchComputePool:
+    """
+    Process pool that computes many supplier payloads in parallel.
+
+    start() forks the workers from the web process after its reference
+    registry is fully loaded, so every worker shares the parsed tables and
+    precomputed factors copy-on-write instead of loading them again. It must
+    be called before the process starts any thread: a child forked while
+    another thread holds a lock (logging, a registry, the allocator) can
+    deadlock, so the pool is never forked later. After a hot reload each
+    worker loads the new reference version itself, from the snapshot, the
+    first time it computes a payload of that version.
+
+    Without forked workers (start() not called, or a worker died and broke
+    the pool) payloads are computed in the calling thread. On platforms
+    without fork, workers are spawned on first use instead and load their own
+    registry from the configured CSVs and snapshot. With zero workers
+    payloads are always computed in the calling thread.
+    """
+
+    def __init__(self, workers, config=None):
+        """
+        Initialize the pool; worker processes start with start() or, where
+        fork is not available, on first use.
+
+        Args:
+            workers (int): Worker process count; 0 computes in-process
+            config (optional): Config the workers load reference data from;
+                defaults to get_config() in the worker
+        """
+        self.workers = workers
+        self.config = config
+        self.executor = None
+        self._lock = threading.Lock()
+
+    def start(self, registry):
+        """
+        Fork the worker processes now; call before the process starts threads.
+
+        Args:
+            registry: Reference_Registry the workers inherit
+
+        Returns:
+            bool: False if there are no workers or the pool already runs
+        """
+        with self._lock:
+            if self.workers <= 0 or self.executor is not None:
+                return False
+            if threading.active_count() > 1:
+                logger.warning("Starting batch compute workers with %d threads running",
+                               threading.active_count())
+            if 'fork' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('fork')
+                # Load every table before forking so workers share them
+                registry.preload()
+                initargs = (self.config, registry)
+            else:
+                context = multiprocessing.get_context()
+                initargs = (self.config, None)
+            executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                           initializer=_init_worker, initargs=initargs)
+            # Forked workers only start with the first task; start them all now
+            executor.submit(int).result()
+            self.executor = executor
+            return True
+
+    def _get_executor(self, registry):
+        if self.executor is None and 'fork' not in multiprocessing.get_all_start_methods():
+            # Spawned workers do not inherit any lock, so they may start late
+            self.start(registry)
+        return self.executor
+
+    def map(self, registry, payloads):
+        """
+        Compute every supplier payload against one reference registry.
+
+        Args:
+            registry: Reference_Registry the results must be computed with
+            payloads (list): Supplier payloads, see calculate_supplier_payload
+
+        Returns:
+            list: One calculate_supplier_payload result per payload, in order
+        """
+        executor = self._get_executor(registry) if len(payloads) > 1 else None
+        if executor is None:
+            calculator = SupplierEmissionsCalculator(registry)
+            return [calculate_supplier_payload(calculator, payload) for payload in payloads]
+
+        chunksize = max(1, len(payloads) // (self.workers * 4))
+        try:
+            return list(executor.map(_calculate_supplier, itertools.repeat(registry.version), payloads,
+                                     chunksize=chunksize))
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); the pool cannot be forked
+            # again from this (threaded) process, so later batches run in-process
+            logger.exception("Batch compute worker pool failed")
+            with self._lock:
+                if self.executor is executor:
+                    self.executor = None
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+            self.executor = None
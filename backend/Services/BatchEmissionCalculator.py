@@ -0,0 +1,192 @@
+import numpy as np
+
+
+class BatchEmissionCalculator:
+    """
+    Vectorized emissions calculation over column arrays of activity data.
+
+    Applies the same rules as the per-row calculate_*_emissions methods:
+    rows with a fuel and a fuel amount use the fuel path (factor x fuel amount),
+    otherwise rows with a vehicle type and region use the freight path
+    (factor x distance x weight). Emission factors are joined in bulk against
+    a Resolved_Emission_Factors table, resolving each distinct
+    (key, region, unit) combination once, and emissions are computed with
+    NumPy array arithmetic.
+    """
+
+    SUCCESS = 'Success'
+    NO_EMISSIONS = 'No emissions calculated'
+
+    # Supplier_Input attribute for each batch column
+    INPUT_COLUMNS = {
+        'fuel_used': 'Fuel_Used',
+        'fuel_amount': 'Fuel_Amount',
+        'unit_of_fuel_amount': 'Unit_Of_Fuel_Amount',
+        'vehicle_type': 'Vehicle_Type',
+        'region': 'Region',
+        'units_of_measurement': 'Units_of_Measurement',
+        'distance_travelled': 'Distance_Travelled',
+        'total_weight': 'Total_Weight_Of_Freight_InTonne'
+    }
+
+    def __init__(self, resolved_factors):
+        """
+        Initialize the batch calculator.
+
+        Args:
+            resolved_factors: Resolved_Emission_Factors table for the gas being calculated
+        """
+        self.resolved_factors = resolved_factors
+
+    @classmethod
+    def columns_from_supplier_inputs(cls, supplier_inputs):
+        """
+        Transpose Supplier_Input objects into the column arrays accepted by calculate().
+
+        Returns:
+            dict: Column name -> list of values, one entry per input
+        """
+        return {column: [getattr(supplier_input, attribute, None) for supplier_input in supplier_inputs]
+                for column, attribute in cls.INPUT_COLUMNS.items()}
+
+    @staticmethod
+    def _string_column(values, row_count):
+        if values is None:
+            return [None] * row_count
+        values = list(values)
+        if len(values) != row_count:
+            raise ValueError("All batch columns must have the same length")
+        return values
+
+    @staticmethod
+    def _float_column(values, row_count):
+        """
+        Parse a numeric column.
+
+        Returns:
+            tuple: (float array with NaN for missing values, presence mask,
+                    {row: error message} for values that could not be parsed)
+        """
+        parsed = np.full(row_count, np.nan)
+        present = np.zeros(row_count, dtype=bool)
+        errors = {}
+        if values is None:
+            return parsed, present, errors
+        if len(values) != row_count:
+            raise ValueError("All batch columns must have the same length")
+
+        if isinstance(values, np.ndarray) and values.dtype.kind in 'fiu':
+            parsed = values.astype(np.float64)
+            return parsed, ~np.isnan(parsed), errors
+
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            present[i] = True
+            try:
+                parsed[i] = float(value)
+            except (ValueError, TypeError) as e:
+                errors[i] = str(e)
+        return parsed, present, errors
+
+    def _join_factors(self, path, rows, keys, regions, units):
+        """Look up the resolved factor for each selected row, resolving each distinct combination once."""
+        factors = np.zeros(len(keys))
+        if len(rows) == 0:
+            return factors
+        combinations = [(keys[i], regions[i], units[i]) for i in rows]
+        get = self.resolved_factors.get
+        resolved = {combination: get(path, *combination)
+                    for combination in set(combinations)}
+        factors[rows] = [resolved[combination]
+                         for combination in combinations]
+        return factors
+
+    def calculate(self, fuel_used=None, fuel_amount=None, unit_of_fuel_amount=None, vehicle_type=None, region=None,
+                  units_of_measurement=None, distance_travelled=None, total_weight=None):
+        """
+        Calculate emissions for column arrays of activity data.
+
+        All columns must have the same length; omitted columns are treated as
+        all-missing. Numeric columns may be lists (None for missing) or NumPy
+        float arrays (NaN for missing).
+
+        Returns:
+            dict: Columnar results:
+                - emissions: float array of calculated emissions
+                - emission_factor: float array of the factor applied
+                - calculation_path: object array of 'fuel', 'freight' or ''
+                - status: object array with the per-row status message
+        """
+        columns = [fuel_used, fuel_amount, unit_of_fuel_amount, vehicle_type, region,
+                   units_of_measurement, distance_travelled, total_weight]
+        row_count = max((len(column)
+                        for column in columns if column is not None), default=0)
+
+        fuel_used = self._string_column(fuel_used, row_count)
+        unit_of_fuel_amount = self._string_column(
+            unit_of_fuel_amount, row_count)
+        vehicle_type = self._string_column(vehicle_type, row_count)
+        region = self._string_column(region, row_count)
+        units_of_measurement = self._string_column(
+            units_of_measurement, row_count)
+        fuel_amount, fuel_amount_present, fuel_amount_errors = self._float_column(
+            fuel_amount, row_count)
+        distance, distance_present, distance_errors = self._float_column(
+            distance_travelled, row_count)
+        weight, weight_present, weight_errors = self._float_column(
+            total_weight, row_count)
+
+        has_fuel_used = np.array([bool(value)
+                                 for value in fuel_used], dtype=bool)
+        has_vehicle_and_region = np.array([bool(vehicle) and bool(row_region)
+                                           for vehicle, row_region in zip(vehicle_type, region)], dtype=bool)
+
+        # Fuel-based rows take precedence; vehicle/distance rows are the rest
+        fuel_rows = has_fuel_used & fuel_amount_present
+        freight_rows = ~fuel_rows & has_vehicle_and_region
+
+        fuel_factors = self._join_factors(self.resolved_factors.FUEL, np.flatnonzero(fuel_rows),
+                                          fuel_used, region, unit_of_fuel_amount)
+        freight_factors = self._join_factors(self.resolved_factors.FREIGHT, np.flatnonzero(freight_rows),
+                                             vehicle_type, region, units_of_measurement)
+
+        fuel_applies = fuel_rows & (fuel_factors > 0)
+        freight_applies = freight_rows & distance_present & weight_present & (
+            freight_factors > 0)
+
+        with np.errstate(invalid='ignore'):
+            emissions = np.where(fuel_applies, fuel_factors * fuel_amount, 0.0)
+            emissions = np.where(freight_applies,
+                                 freight_factors * distance * weight, emissions)
+        emission_factor = np.where(fuel_applies, fuel_factors, 0.0)
+        emission_factor = np.where(
+            freight_rows, freight_factors, emission_factor)
+
+        calculation_path = np.full(row_count, '', dtype=object)
+        calculation_path[fuel_rows] = self.resolved_factors.FUEL
+        calculation_path[freight_rows] = self.resolved_factors.FREIGHT
+
+        status = np.where(emissions > 0, self.SUCCESS,
+                          self.NO_EMISSIONS).astype(object)
+
+        # Values that cannot be parsed fail the row only where they are used
+        errors = {}
+        for i, message in fuel_amount_errors.items():
+            if fuel_applies[i]:
+                errors[i] = message
+        for column_errors in (distance_errors, weight_errors):
+            for i, message in column_errors.items():
+                if freight_rows[i] and freight_factors[i] > 0 and distance_present[i] and weight_present[i]:
+                    errors.setdefault(i, message)
+        for i, message in errors.items():
+            emissions[i] = 0.0
+            emission_factor[i] = 0.0
+            status[i] = f'Calculation error: {message}'
+
+        return {
+            'emissions': emissions,
+            'emission_factor': emission_factor,
+            'calculation_path': calculation_path,
+            'status': status
+        }
@@ -1,3 +1,8 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 class Ch4Calculator:
     """
     Calculator for CH4 emissions from fuel consumption and freight transport.
@@ -6,7 +11,7 @@ class Ch4Calculator:
     based on fuel usage data and freight transport data.
     """
 
-    def __init__(self, reference_ef_fuel_use_ch4_n2o=None, reference_ef_freight_co2=None, reference_unit_conversion=None):
+    def __init__(self, reference_ef_fuel_use_ch4_n2o=None, reference_ef_freight_co2=None, reference_unit_conversion=None, resolved_factors=None, trace=None):
         """
         Initialize the Ch4Calculator with reference data instances.
 
@@ -14,10 +19,32 @@ class Ch4Calculator:
             reference_ef_fuel_use_ch4_n2o: Reference_EF_Fuel_Use_CH4_N2O instance for fuel emission factors
             reference_ef_freight_co2: Reference_EF_Freight_CO2 instance for freight emission factors (contains CH4 data)
             reference_unit_conversion: Reference_Unit_Conversion instance for unit conversions
+            resolved_factors: Optional Resolved_Emission_Factors table for CH4; when given,
+                calculate_ch4_emissions uses its precomputed factors instead of resolving per row
+            trace: Optional CalculationTrace; when given, the lineage of every factor resolved
+                by the get_emission_factor_* methods is recorded into it
         """
         self.reference_ef_fuel_use_ch4_n2o = reference_ef_fuel_use_ch4_n2o
         self.reference_ef_freight_co2 = reference_ef_freight_co2
         self.reference_unit_conversion = reference_unit_conversion
+        self.resolved_factors = resolved_factors
+        self.trace = trace
+
+    def _trace_factor(self, path, key, region, input_unit, source_row, reference_factor, numerator_unit, numerator,
+                      denominator_unit, denominator, resolved_factor):
+        """Record how a CH4 emission factor was derived into the trace."""
+        self.trace.record(
+            gas='CH4',
+            calculation_path=path,
+            key=key,
+            region=region,
+            input_unit=input_unit,
+            source_row=dict(source_row),
+            reference_factor=reference_factor,
+            numerator={'from_unit': numerator_unit, 'to_unit': 'Metric Ton', 'conversion': numerator},
+            denominator={'from_unit': input_unit, 'to_unit': denominator_unit, 'conversion': denominator},
+            resolved_factor=resolved_factor
+        )
 
     def get_emission_factor_by_vehicle_and_region(self, vehicle_type, region=None, units_of_measurement=''):
         """
@@ -47,45 +74,19 @@ class Ch4Calculator:
                 ch4_unit_numerator = result.get('CH4 Unit - Numerator', '')
                 ch4_unit_denominator = result.get('CH4 Unit - Denominator', '')
 
-                print(f"=== DEBUG: CH4 Emission Factor Calculation ===")
-                print(f"Vehicle Type: {vehicle_type}")
-                print(f"Region: {region}")
-                print(f"Units of Measurement: {units_of_measurement}")
-                print(f"CH4 Unit Numerator: {ch4_unit_numerator}")
-                print(f"CH4 Unit Denominator: {ch4_unit_denominator}")
-
                 # 1. CH4 in Factor Unit Conversion Numerator = Lookup using Reference_Unit_Conversion
                 ch4_factor_unit_conversion_numerator = 0.0
                 if ch4_unit_numerator and self.reference_unit_conversion:
-                    try:
-                        ch4_factor_unit_conversion_numerator = self.reference_unit_conversion.get_conversion(
-                            ch4_unit_numerator, 'Metric Ton')
-                        if ch4_factor_unit_conversion_numerator is None or ch4_factor_unit_conversion_numerator == '':
-                            ch4_factor_unit_conversion_numerator = 0.0
-                        else:
-                            # Convert string to float if conversion value is found
-                            ch4_factor_unit_conversion_numerator = float(
-                                ch4_factor_unit_conversion_numerator)
-                    except (ValueError, TypeError, Exception):
-                        # Handle cases where compound units (e.g., "Short Ton Mile", "Tonne Kilometer")
-                        # are not available in the basic unit conversion matrix
-                        ch4_factor_unit_conversion_numerator = 0.0
+                    # Units missing from the basic conversion matrix resolve to 0.0
+                    ch4_factor_unit_conversion_numerator = self.reference_unit_conversion.get_conversion_factor(
+                        ch4_unit_numerator, 'Metric Ton') or 0.0
 
                 # 2. CH4 in Factor Unit Conversion Denominator = Lookup using Reference_Unit_Conversion
                 ch4_factor_unit_conversion_denominator = 0.0
                 if units_of_measurement and ch4_unit_denominator and self.reference_unit_conversion:
-                    try:
-                        ch4_factor_unit_conversion_denominator = self.reference_unit_conversion.get_conversion(
-                            units_of_measurement, ch4_unit_denominator)
-                        if ch4_factor_unit_conversion_denominator is None or ch4_factor_unit_conversion_denominator == '':
-                            ch4_factor_unit_conversion_denominator = 0.0
-                        else:
-                            # Convert string to float if conversion value is found
-                            ch4_factor_unit_conversion_denominator = float(
-                                ch4_factor_unit_conversion_denominator)
-                    except (ValueError, TypeError, Exception):
-                        # Handle cases where compound units are not available in the conversion matrix
-                        ch4_factor_unit_conversion_denominator = 0.0
+                    # No usable conversion in the matrix resolves to 0.0
+                    ch4_factor_unit_conversion_denominator = self.reference_unit_conversion.get_conversion_factor(
+                        units_of_measurement, ch4_unit_denominator) or 0.0
 
                 # 3. Calculate CH4 Emission Factor = emission_factor * numerator * denominator
                 ch4_emission_factor = 0.0
@@ -95,18 +96,16 @@ class Ch4Calculator:
                     if col_name in result and result[col_name]:
                         try:
                             emission_factor = float(result[col_name])
-                            print(
-                                f"Original Emission Factor ({col_name}): {emission_factor}")
 
                             # Calculate CH4 Emission Factor by multiplying all three components
                             ch4_emission_factor = emission_factor * \
                                 ch4_factor_unit_conversion_numerator * ch4_factor_unit_conversion_denominator
 
-                            print(
-                                f"Calculated CH4 Emission Factor: {ch4_emission_factor}")
-                            print(
-                                f"Calculation: {emission_factor} × {ch4_factor_unit_conversion_numerator} × {ch4_factor_unit_conversion_denominator} = {ch4_emission_factor}")
-                            print(f"=== END DEBUG ===")
+                            if self.trace is not None:
+                                self._trace_factor('freight', vehicle_type, region, units_of_measurement, result, emission_factor,
+                                                   ch4_unit_numerator, ch4_factor_unit_conversion_numerator,
+                                                   ch4_unit_denominator, ch4_factor_unit_conversion_denominator,
+                                                   ch4_emission_factor)
 
                             # Unit information is available for additional calculations within this method
                             # ch4_unit_numerator and ch4_unit_denominator can be used here
@@ -118,8 +117,7 @@ class Ch4Calculator:
 
         except Exception as e:
             # Handle lookup errors gracefully
-            print(
-                f"Error in get_emission_factor_by_vehicle_and_region: {str(e)}")
+            logger.warning("Error in get_emission_factor_by_vehicle_and_region: %s", e)
             return 0.0
 
     def get_emission_factor_by_fuel_consumption(self, fuel_used, fuel_amount, unit_of_fuel_amount, region=None):
@@ -151,45 +149,19 @@ class Ch4Calculator:
                 ch4_unit_numerator = result.get('CH4 Unit - Numerator', '')
                 ch4_unit_denominator = result.get('CH4 Unit - Denominator', '')
 
-                print(f"=== DEBUG: Fuel CH4 Emission Factor Calculation ===")
-                print(f"Fuel Used: {fuel_used}")
-                print(f"Fuel Amount: {fuel_amount}")
-                print(f"Unit of Fuel Amount: {unit_of_fuel_amount}")
-                print(f"Region: {region}")
-                print(f"CH4 Unit Numerator: {ch4_unit_numerator}")
-                print(f"CH4 Unit Denominator: {ch4_unit_denominator}")
-
                 # 1. CH4 in Factor Unit Conversion Numerator = Lookup using Reference_Unit_Conversion
                 ch4_factor_unit_conversion_numerator = 0.0
                 if ch4_unit_numerator and self.reference_unit_conversion:
-                    try:
-                        ch4_factor_unit_conversion_numerator = self.reference_unit_conversion.get_conversion(
-                            ch4_unit_numerator, 'Metric Ton')
-                        if ch4_factor_unit_conversion_numerator is None or ch4_factor_unit_conversion_numerator == '':
-                            ch4_factor_unit_conversion_numerator = 0.0
-                        else:
-                            # Convert string to float if conversion value is found
-                            ch4_factor_unit_conversion_numerator = float(
-                                ch4_factor_unit_conversion_numerator)
-                    except (ValueError, TypeError, Exception):
-                        # Handle cases where compound units are not available in the basic unit conversion matrix
-                        ch4_factor_unit_conversion_numerator = 0.0
+                    # Units missing from the basic conversion matrix resolve to 0.0
+                    ch4_factor_unit_conversion_numerator = self.reference_unit_conversion.get_conversion_factor(
+                        ch4_unit_numerator, 'Metric Ton') or 0.0
 
                 # 2. CH4 in Factor Unit Conversion Denominator = Lookup using Reference_Unit_Conversion
                 ch4_factor_unit_conversion_denominator = 0.0
                 if unit_of_fuel_amount and ch4_unit_denominator and self.reference_unit_conversion:
-                    try:
-                        ch4_factor_unit_conversion_denominator = self.reference_unit_conversion.get_conversion(
-                            unit_of_fuel_amount, ch4_unit_denominator)
-                        if ch4_factor_unit_conversion_denominator is None or ch4_factor_unit_conversion_denominator == '':
-                            ch4_factor_unit_conversion_denominator = 0.0
-                        else:
-                            # Convert string to float if conversion value is found
-                            ch4_factor_unit_conversion_denominator = float(
-                                ch4_factor_unit_conversion_denominator)
-                    except (ValueError, TypeError, Exception):
-                        # Handle cases where compound units are not available in the conversion matrix
-                        ch4_factor_unit_conversion_denominator = 0.0
+                    # No usable conversion in the matrix resolves to 0.0
+                    ch4_factor_unit_conversion_denominator = self.reference_unit_conversion.get_conversion_factor(
+                        unit_of_fuel_amount, ch4_unit_denominator) or 0.0
 
                 # 3. Calculate CH4 Emission Factor = emission_factor * numerator * denominator
                 ch4_emission_factor = 0.0
@@ -199,18 +171,16 @@ class Ch4Calculator:
                     if col_name in result and result[col_name]:
                         try:
                             emission_factor = float(result[col_name])
-                            print(
-                                f"Original Fuel Emission Factor ({col_name}): {emission_factor}")
 
                             # Calculate CH4 Emission Factor by multiplying all three components
                             ch4_emission_factor = emission_factor * \
                                 ch4_factor_unit_conversion_numerator * ch4_factor_unit_conversion_denominator
 
-                            print(
-                                f"Calculated Fuel CH4 Emission Factor: {ch4_emission_factor}")
-                            print(
-                                f"Calculation: {emission_factor} × {ch4_factor_unit_conversion_numerator} × {ch4_factor_unit_conversion_denominator} = {ch4_emission_factor}")
-                            print(f"=== END DEBUG ===")
+                            if self.trace is not None:
+                                self._trace_factor('fuel', fuel_used, region, unit_of_fuel_amount, result, emission_factor,
+                                                   ch4_unit_numerator, ch4_factor_unit_conversion_numerator,
+                                                   ch4_unit_denominator, ch4_factor_unit_conversion_denominator,
+                                                   ch4_emission_factor)
 
                             return ch4_emission_factor
                         except (ValueError, TypeError):
@@ -220,8 +190,7 @@ class Ch4Calculator:
 
         except Exception as e:
             # Handle lookup errors gracefully
-            print(
-                f"Error in get_emission_factor_by_fuel_consumption: {str(e)}")
+            logger.warning("Error in get_emission_factor_by_fuel_consumption: %s", e)
             return 0.0
 
     def calculate_ch4_emissions(self, supplier_inputs):
@@ -262,37 +231,34 @@ class Ch4Calculator:
                 if fuel_used and fuel_amount is not None:
                     unit_of_fuel_amount = getattr(
                         supplier_input, 'Unit_Of_Fuel_Amount', '')
-                    fuel_emission_factor = self.get_emission_factor_by_fuel_consumption(
-                        fuel_used, fuel_amount, unit_of_fuel_amount, region)
+                    if self.resolved_factors:
+                        fuel_emission_factor = self.resolved_factors.get(
+                            self.resolved_factors.FUEL, fuel_used, region, unit_of_fuel_amount)
+                    else:
+                        fuel_emission_factor = self.get_emission_factor_by_fuel_consumption(
+                            fuel_used, fuel_amount, unit_of_fuel_amount, region)
 
                     if fuel_emission_factor > 0:
                         # Calculate CH4 emissions = fuel_emission_factor * fuel_amount
                         ch4_emissions = fuel_emission_factor * \
                             float(fuel_amount)
                         emission_factor = fuel_emission_factor
-                        print(f"Fuel-based CH4 Emissions: {ch4_emissions}")
-                    else:
-                        print(
-                            f"Fuel-based CH4 Emissions: 0.0 (no fuel emission factor found)")
 
                 # If no fuel data or fuel-based calculation failed, try vehicle/distance-based calculation
                 elif vehicle_type and region:
-                    emission_factor = self.get_emission_factor_by_vehicle_and_region(
-                        vehicle_type, region, units_of_measurement)
+                    if self.resolved_factors:
+                        emission_factor = self.resolved_factors.get(
+                            self.resolved_factors.FREIGHT, vehicle_type, region, units_of_measurement)
+                    else:
+                        emission_factor = self.get_emission_factor_by_vehicle_and_region(
+                            vehicle_type, region, units_of_measurement)
 
                     # Calculate CH4 emissions = emission_factor * Distance_Travelled * Total_Weight_Of_Freight_InTonne
                     if distance_travelled is not None and total_weight is not None and emission_factor > 0:
                         ch4_emissions = emission_factor * \
                             float(distance_travelled) * float(total_weight)
-                        print(
-                            f"Distance/Weight-based CH4 Emissions: {ch4_emissions}")
                     else:
                         ch4_emissions = 0.0
-                        print(
-                            f"Distance/Weight-based CH4 Emissions: {ch4_emissions}")
-
-                else:
-                    print(f"CH4 Emissions: 0.0 (insufficient data for calculation)")
 
                 # Add result to results array (regardless of fuel data availability)
                 results.append({
@@ -0,0 +1,24 @@
+class CalculationTrace:
+    """
+    Collects emission factor lineage for an explain-mode calculation.
+
+    Calculators take an optional trace and only record into it when one is
+    given, so tracing costs a single `is not None` check per row when disabled.
+    Each recorded entry describes how a factor was derived: the reference
+    source row, the numerator and denominator unit conversions, and the final
+    resolved factor.
+    """
+
+    def __init__(self):
+        self.entries = []
+
+    def record(self, **entry):
+        """Append one lineage entry."""
+        self.entries.append(entry)
+
+    def to_dict(self):
+        """Structured form returned as the `explain` block of a response."""
+        return {
+            'row_count': len(self.entries),
+            'rows': self.entries
+        }
@@ -0,0 +1,77 @@
+import cProfile
+import os
+import pstats
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CallProfile:
+    """
+    cProfile run of one call, summarized as its top functions.
+
+    Deterministic profiling slows the profiled code down several times, so
+    this is meant for single diagnostic requests (?cprofile=1 on
+    /api/compute_ghg_emissions), not for regular traffic.
+    """
+
+    SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+    def __init__(self, top=30, sort='cumulative'):
+        """
+        Initialize the profile.
+
+        Args:
+            top (int): Number of functions reported by to_dict()
+            sort (str): One of SORT_KEYS
+
+        Raises:
+            ValueError: If sort is not one of SORT_KEYS
+        """
+        if sort not in self.SORT_KEYS:
+            raise ValueError(f"Unknown sort '{sort}'; expected one of {', '.join(self.SORT_KEYS)}")
+        self.top = top
+        self.sort = sort
+        self.profiler = cProfile.Profile()
+        self.wall_seconds = 0.0
+
+    def run(self, function, *args, **kwargs):
+        """Call function under the profiler and return its result; several calls add up."""
+        start = time.perf_counter()
+        try:
+            return self.profiler.runcall(function, *args, **kwargs)
+        finally:
+            self.wall_seconds += time.perf_counter() - start
+
+    @staticmethod
+    def function_name(filename, line, name):
+        # Built-in functions have no file ('~')
+        if filename == '~':
+            return name
+        # Relative to backend/ for the app's own modules, package/module.py for libraries
+        filename = os.path.abspath(filename)
+        if filename.startswith(BACKEND_DIR + os.sep):
+            filename = os.path.relpath(filename, BACKEND_DIR)
+        else:
+            filename = os.path.join(os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+        return f'{name} ({filename}:{line})'
+
+    def to_dict(self):
+        """Structured form returned as the `cprofile` block of a response."""
+        stats = pstats.Stats(self.profiler)
+        rows = [{
+            'function': self.function_name(*function),
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'tottime': round(tottime, 6),
+            'cumtime': round(cumtime, 6)
+        } for function, (primitive_calls, calls, tottime, cumtime, _) in stats.stats.items()]
+        sort_field = {'cumulative': 'cumtime', 'tottime': 'tottime', 'calls': 'calls'}[self.sort]
+        rows.sort(key=lambda row: row[sort_field], reverse=True)
+        return {
+            'wall_seconds': round(self.wall_seconds, 6),
+            'profiled_seconds': round(stats.total_tt, 6),
+            'function_count': len(rows),
+            'sort': self.sort,
+            'functions': rows[:self.top]
+        }
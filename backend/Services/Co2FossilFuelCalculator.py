@@ -1,3 +1,11 @@
+import logging
+
+from Components.resolved_emission_factors import Resolved_Emission_Factors
+from Services.BatchEmissionCalculator import BatchEmissionCalculator
+
+logger = logging.getLogger(__name__)
+
+
 class Co2FossilFuelCalculator:
     """
     Calculator for CO2 emissions from fossil fuel consumption.
@@ -6,7 +14,7 @@ class Co2FossilFuelCalculator:
     based on fossil fuel usage data.
     """
 
-    def __init__(self, reference_ef_fuel_use_co2=None, reference_ef_freight_co2=None, reference_unit_conversion=None):
+    def __init__(self, reference_ef_fuel_use_co2=None, reference_ef_freight_co2=None, reference_unit_conversion=None, resolved_factors=None, trace=None):
         """
         Initialize the Co2FossilFuelCalculator with reference data instances.
 
@@ -14,10 +22,32 @@ class Co2FossilFuelCalculator:
             reference_ef_fuel_use_co2: Reference_EF_Fuel_Use_CO2 instance for fuel emission factors
             reference_ef_freight_co2: Reference_EF_Freight_CO2 instance for freight emission factors  
             reference_unit_conversion: Reference_Unit_Conversion instance for unit conversions
+            resolved_factors: Optional Resolved_Emission_Factors table for CO2; when given,
+                calculate_co2_emissions uses its precomputed factors instead of resolving per row
+            trace: Optional CalculationTrace; when given, the lineage of every factor resolved
+                by the get_emission_factor_* methods is recorded into it
         """
         self.reference_ef_fuel_use_co2 = reference_ef_fuel_use_co2
         self.reference_ef_freight_co2 = reference_ef_freight_co2
         self.reference_unit_conversion = reference_unit_conversion
+        self.resolved_factors = resolved_factors
+        self.trace = trace
+
+    def _trace_factor(self, path, key, region, input_unit, source_row, reference_factor, numerator_unit, numerator,
+                      denominator_unit, denominator, resolved_factor):
+        """Record how a CO2 emission factor was derived into the trace."""
+        self.trace.record(
+            gas='CO2',
+            calculation_path=path,
+            key=key,
+            region=region,
+            input_unit=input_unit,
+            source_row=dict(source_row),
+            reference_factor=reference_factor,
+            numerator={'from_unit': numerator_unit, 'to_unit': 'Metric Ton', 'conversion': numerator},
+            denominator={'from_unit': input_unit, 'to_unit': denominator_unit, 'conversion': denominator},
+            resolved_factor=resolved_factor
+        )
 
     def get_emission_factor_by_vehicle_and_region(self, vehicle_type, region=None, units_of_measurement='',):
         """
@@ -46,45 +76,19 @@ class Co2FossilFuelCalculator:
                 co2_unit_numerator = result.get('CO2 Unit - Numerator', '')
                 co2_unit_denominator = result.get('CO2 Unit - Denominator', '')
 
-                print(f"=== DEBUG: CO2 Emission Factor Calculation ===")
-                print(f"Vehicle Type: {vehicle_type}")
-                print(f"Region: {region}")
-                print(f"Units of Measurement: {units_of_measurement}")
-                print(f"CO2 Unit Numerator: {co2_unit_numerator}")
-                print(f"CO2 Unit Denominator: {co2_unit_denominator}")
-
                 # 1. CO2 in Factor Unit Conversion Numerator = Lookup using Reference_Unit_Conversion
                 co2_factor_unit_conversion_numerator = 0.0
                 if co2_unit_numerator and self.reference_unit_conversion:
-                    try:
-                        co2_factor_unit_conversion_numerator = self.reference_unit_conversion.get_conversion(
-                            co2_unit_numerator, 'Metric Ton')
-                        if co2_factor_unit_conversion_numerator is None or co2_factor_unit_conversion_numerator == '':
-                            co2_factor_unit_conversion_numerator = 0.0
-                        else:
-                            # Convert string to float if conversion value is found
-                            co2_factor_unit_conversion_numerator = float(
-                                co2_factor_unit_conversion_numerator)
-                    except (ValueError, TypeError, Exception):
-                        # Handle cases where compound units (e.g., "Short Ton Mile", "Tonne Kilometer")
-                        # are not available in the basic unit conversion matrix
-                        co2_factor_unit_conversion_numerator = 0.0
+                    # Units missing from the basic conversion matrix resolve to 0.0
+                    co2_factor_unit_conversion_numerator = self.reference_unit_conversion.get_conversion_factor(
+                        co2_unit_numerator, 'Metric Ton') or 0.0
 
                 # 2. CO2 in Factor Unit Conversion Denominator = Lookup using Reference_Unit_Conversion
                 co2_factor_unit_conversion_denominator = 0.0
                 if units_of_measurement and co2_unit_denominator and self.reference_unit_conversion:
-                    try:
-                        co2_factor_unit_conversion_denominator = self.reference_unit_conversion.get_conversion(
-                            units_of_measurement, co2_unit_denominator)
-                        if co2_factor_unit_conversion_denominator is None or co2_factor_unit_conversion_denominator == '':
-                            co2_factor_unit_conversion_denominator = 0.0
-                        else:
-                            # Convert string to float if conversion value is found
-                            co2_factor_unit_conversion_denominator = float(
-                                co2_factor_unit_conversion_denominator)
-                    except (ValueError, TypeError, Exception):
-                        # Handle cases where compound units are not available in the conversion matrix
-                        co2_factor_unit_conversion_denominator = 0.0
+                    # No usable conversion in the matrix resolves to 0.0
+                    co2_factor_unit_conversion_denominator = self.reference_unit_conversion.get_conversion_factor(
+                        units_of_measurement, co2_unit_denominator) or 0.0
 
                 # 3. Calculate CO2 Emission Factor = emission_factor * numerator * denominator
                 co2_emission_factor = 0.0
@@ -94,18 +98,16 @@ class Co2FossilFuelCalculator:
                     if col_name in result and result[col_name]:
                         try:
                             emission_factor = float(result[col_name])
-                            print(
-                                f"Original Emission Factor ({col_name}): {emission_factor}")
 
                             # Calculate CO2 Emission Factor by multiplying all three components
                             co2_emission_factor = emission_factor * \
                                 co2_factor_unit_conversion_numerator * co2_factor_unit_conversion_denominator
 
-                            print(
-                                f"Calculated CO2 Emission Factor: {co2_emission_factor}")
-                            print(
-                                f"Calculation: {emission_factor} × {co2_factor_unit_conversion_numerator} × {co2_factor_unit_conversion_denominator} = {co2_emission_factor}")
-                            print(f"=== END DEBUG ===")
+                            if self.trace is not None:
+                                self._trace_factor('freight', vehicle_type, region, units_of_measurement, result, emission_factor,
+                                                   co2_unit_numerator, co2_factor_unit_conversion_numerator,
+                                                   co2_unit_denominator, co2_factor_unit_conversion_denominator,
+                                                   co2_emission_factor)
 
                             # Unit information is available for additional calculations within this method
                             # co2_unit_numerator and co2_unit_denominator can be used here
@@ -117,6 +119,7 @@ class Co2FossilFuelCalculator:
 
         except Exception as e:
             # Handle lookup errors gracefully
+            logger.warning("Error in get_emission_factor_by_vehicle_and_region: %s", e)
             return 0.0
 
     def get_emission_factor_by_fuel_consumption(self, fuel_used, fuel_amount, unit_of_fuel_amount, region=None):
@@ -148,45 +151,19 @@ class Co2FossilFuelCalculator:
                 co2_unit_numerator = result.get('CO2 Unit - Numerator', '')
                 co2_unit_denominator = result.get('CO2 Unit - Denominator', '')
 
-                print(f"=== DEBUG: Fuel CO2 Emission Factor Calculation ===")
-                print(f"Fuel Used: {fuel_used}")
-                print(f"Fuel Amount: {fuel_amount}")
-                print(f"Unit of Fuel Amount: {unit_of_fuel_amount}")
-                print(f"Region: {region}")
-                print(f"CO2 Unit Numerator: {co2_unit_numerator}")
-                print(f"CO2 Unit Denominator: {co2_unit_denominator}")
-
                 # 1. CO2 in Factor Unit Conversion Numerator = Lookup using Reference_Unit_Conversion
                 co2_factor_unit_conversion_numerator = 0.0
                 if co2_unit_numerator and self.reference_unit_conversion:
-                    try:
-                        co2_factor_unit_conversion_numerator = self.reference_unit_conversion.get_conversion(
-                            co2_unit_numerator, 'Metric Ton')
-                        if co2_factor_unit_conversion_numerator is None or co2_factor_unit_conversion_numerator == '':
-                            co2_factor_unit_conversion_numerator = 0.0
-                        else:
-                            # Convert string to float if conversion value is found
-                            co2_factor_unit_conversion_numerator = float(
-                                co2_factor_unit_conversion_numerator)
-                    except (ValueError, TypeError, Exception):
-                        # Handle cases where compound units are not available in the basic unit conversion matrix
-                        co2_factor_unit_conversion_numerator = 0.0
+                    # Units missing from the basic conversion matrix resolve to 0.0
+                    co2_factor_unit_conversion_numerator = self.reference_unit_conversion.get_conversion_factor(
+                        co2_unit_numerator, 'Metric Ton') or 0.0
 
                 # 2. CO2 in Factor Unit Conversion Denominator = Lookup using Reference_Unit_Conversion
                 co2_factor_unit_conversion_denominator = 0.0
                 if unit_of_fuel_amount and co2_unit_denominator and self.reference_unit_conversion:
-                    try:
-                        co2_factor_unit_conversion_denominator = self.reference_unit_conversion.get_conversion(
-                            unit_of_fuel_amount, co2_unit_denominator)
-                        if co2_factor_unit_conversion_denominator is None or co2_factor_unit_conversion_denominator == '':
-                            co2_factor_unit_conversion_denominator = 0.0
-                        else:
-                            # Convert string to float if conversion value is found
-                            co2_factor_unit_conversion_denominator = float(
-                                co2_factor_unit_conversion_denominator)
-                    except (ValueError, TypeError, Exception):
-                        # Handle cases where compound units are not available in the conversion matrix
-                        co2_factor_unit_conversion_denominator = 0.0
+                    # No usable conversion in the matrix resolves to 0.0
+                    co2_factor_unit_conversion_denominator = self.reference_unit_conversion.get_conversion_factor(
+                        unit_of_fuel_amount, co2_unit_denominator) or 0.0
 
                 # 3. Calculate CO2 Emission Factor = emission_factor * numerator * denominator
                 co2_emission_factor = 0.0
@@ -196,18 +173,16 @@ class Co2FossilFuelCalculator:
                     if col_name in result and result[col_name]:
                         try:
                             emission_factor = float(result[col_name])
-                            print(
-                                f"Original Fuel Emission Factor ({col_name}): {emission_factor}")
 
                             # Calculate CO2 Emission Factor by multiplying all three components
                             co2_emission_factor = emission_factor * \
                                 co2_factor_unit_conversion_numerator * co2_factor_unit_conversion_denominator
 
-                            print(
-                                f"Calculated Fuel CO2 Emission Factor: {co2_emission_factor}")
-                            print(
-                                f"Calculation: {emission_factor} × {co2_factor_unit_conversion_numerator} × {co2_factor_unit_conversion_denominator} = {co2_emission_factor}")
-                            print(f"=== END DEBUG ===")
+                            if self.trace is not None:
+                                self._trace_factor('fuel', fuel_used, region, unit_of_fuel_amount, result, emission_factor,
+                                                   co2_unit_numerator, co2_factor_unit_conversion_numerator,
+                                                   co2_unit_denominator, co2_factor_unit_conversion_denominator,
+                                                   co2_emission_factor)
 
                             return co2_emission_factor
                         except (ValueError, TypeError):
@@ -217,8 +192,7 @@ class Co2FossilFuelCalculator:
 
         except Exception as e:
             # Handle lookup errors gracefully
-            print(
-                f"Error in get_emission_factor_by_fuel_consumption: {str(e)}")
+            logger.warning("Error in get_emission_factor_by_fuel_consumption: %s", e)
             return 0.0
 
     def calculate_co2_emissions(self, supplier_inputs):
@@ -251,13 +225,6 @@ class Co2FossilFuelCalculator:
                 total_weight = getattr(
                     supplier_input, 'Total_Weight_Of_Freight_InTonne', None)
 
-                # print(f"=== DEBUG: Processing supplier input ===")
-                # print(f"Fuel Used: {fuel_used}")
-                # print(f"Fuel Amount: {fuel_amount}")
-                # print(f"Vehicle Type: {vehicle_type}")
-                # print(f"Region: {region}")
-                # print(f"Units of Measurement: {units_of_measurement}")
-
                 # Get emission factor for the vehicle type and region (try even if no fuel data)
                 emission_factor = 0.0
                 co2_emissions = 0.0
@@ -266,37 +233,34 @@ class Co2FossilFuelCalculator:
                 if fuel_used and fuel_amount is not None:
                     unit_of_fuel_amount = getattr(
                         supplier_input, 'Unit_Of_Fuel_Amount', '')
-                    fuel_emission_factor = self.get_emission_factor_by_fuel_consumption(
-                        fuel_used, fuel_amount, unit_of_fuel_amount, region)
+                    if self.resolved_factors:
+                        fuel_emission_factor = self.resolved_factors.get(
+                            self.resolved_factors.FUEL, fuel_used, region, unit_of_fuel_amount)
+                    else:
+                        fuel_emission_factor = self.get_emission_factor_by_fuel_consumption(
+                            fuel_used, fuel_amount, unit_of_fuel_amount, region)
 
                     if fuel_emission_factor > 0:
                         # Calculate CO2 emissions = fuel_emission_factor * fuel_amount
                         co2_emissions = fuel_emission_factor * \
                             float(fuel_amount)
                         emission_factor = fuel_emission_factor
-                        print(f"Fuel-based CO2 Emissions: {co2_emissions}")
-                    else:
-                        print(
-                            f"Fuel-based CO2 Emissions: 0.0 (no fuel emission factor found)")
 
                 # If no fuel data or fuel-based calculation failed, try vehicle/distance-based calculation
                 elif vehicle_type and region:
-                    emission_factor = self.get_emission_factor_by_vehicle_and_region(
-                        vehicle_type, region, units_of_measurement)
+                    if self.resolved_factors:
+                        emission_factor = self.resolved_factors.get(
+                            self.resolved_factors.FREIGHT, vehicle_type, region, units_of_measurement)
+                    else:
+                        emission_factor = self.get_emission_factor_by_vehicle_and_region(
+                            vehicle_type, region, units_of_measurement)
 
                     # Calculate CO2 emissions = emission_factor * Distance_Travelled * Total_Weight_Of_Freight_InTonne
                     if distance_travelled is not None and total_weight is not None and emission_factor > 0:
                         co2_emissions = emission_factor * \
                             float(distance_travelled) * float(total_weight)
-                        print(
-                            f"Distance/Weight-based CO2 Emissions: {co2_emissions}")
                     else:
                         co2_emissions = 0.0
-                        print(
-                            f"Distance/Weight-based CO2 Emissions: {co2_emissions}")
-
-                else:
-                    print(f"CO2 Emissions: 0.0 (insufficient data for calculation)")
 
                 # Add result to results array (regardless of fuel data availability)
                 results.append({
@@ -332,3 +296,40 @@ class Co2FossilFuelCalculator:
                 })
 
         return results
+
+    def calculate_co2_emissions_batch(self, fuel_used=None, fuel_amount=None, unit_of_fuel_amount=None, vehicle_type=None,
+                                      region=None, units_of_measurement=None, distance_travelled=None, total_weight=None):
+        """
+        Calculate CO2 emissions for column arrays of activity data.
+
+        Vectorized counterpart of calculate_co2_emissions for large uploads:
+        emission factors are joined in bulk against the resolved factor table
+        and emissions computed with NumPy. Results match the per-row path
+        within float tolerance.
+
+        Args:
+            fuel_used, unit_of_fuel_amount, vehicle_type, region, units_of_measurement (sequence):
+                String columns, None or '' for missing values
+            fuel_amount, distance_travelled, total_weight (sequence or numpy.ndarray):
+                Numeric columns, None (or NaN in float arrays) for missing values
+
+        Returns:
+            dict: Columnar results with 'co2_emissions', 'emission_factor',
+                'calculation_path' and 'status' arrays, one entry per row
+        """
+        if self.resolved_factors is None:
+            self.resolved_factors = Resolved_Emission_Factors(
+                'CO2', self.reference_ef_freight_co2, self.reference_ef_fuel_use_co2,
+                self.reference_unit_conversion, precompile=False)
+
+        results = BatchEmissionCalculator(self.resolved_factors).calculate(
+            fuel_used=fuel_used,
+            fuel_amount=fuel_amount,
+            unit_of_fuel_amount=unit_of_fuel_amount,
+            vehicle_type=vehicle_type,
+            region=region,
+            units_of_measurement=units_of_measurement,
+            distance_travelled=distance_travelled,
+            total_weight=total_weight)
+        results['co2_emissions'] = results.pop('emissions')
+        return results
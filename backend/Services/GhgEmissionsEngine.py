@@ -0,0 +1,208 @@
+from Components.resolved_emission_factors import Resolved_Emission_Factors
+
+
+class GhgEmissionsEngine:
+    """
+    Single-pass calculator for every greenhouse gas.
+
+    Each activity row is classified once (fuel or freight path) and its
+    emission factors for all gases are fetched with one lookup into a fused
+    factor-set table built from the per-gas Resolved_Emission_Factors tables.
+    Per-gas results have the same shape as Co2FossilFuelCalculator and
+    Ch4Calculator results, so adding a gas does not add another pass over the rows.
+    """
+
+    # Upper bound on fused factor sets memoized from user input
+    MAX_FACTOR_SETS = 10000
+
+    def __init__(self, resolved_factors):
+        """
+        Initialize the engine with one resolved factor table per gas.
+
+        Args:
+            resolved_factors (dict): Gas name (e.g. 'CO2') -> Resolved_Emission_Factors table
+        """
+        self.resolved_factors = resolved_factors
+        self.gases = tuple(resolved_factors)
+        self.result_keys = tuple(f'{gas.lower()}_emissions' for gas in self.gases)
+        self.factor_sets = {}
+        self.no_factors = (0.0,) * len(self.gases)
+
+    @classmethod
+    def from_references(cls, reference_ef_freight_co2, reference_ef_fuel_use_co2, reference_ef_fuel_use_ch4_n2o,
+                        reference_unit_conversion):
+        """
+        Build an engine for CO2, CH4 and N2O from the loaded reference data.
+
+        Freight factors for every gas come from Reference_EF_Freight_CO2; fuel
+        factors come from Reference_EF_Fuel_Use_CO2 (CO2) and
+        Reference_EF_Fuel_Use_CH4_N2O (CH4 and N2O).
+        """
+        return cls({
+            'CO2': Resolved_Emission_Factors('CO2', reference_ef_freight_co2, reference_ef_fuel_use_co2,
+                                             reference_unit_conversion),
+            'CH4': Resolved_Emission_Factors('CH4', reference_ef_freight_co2, reference_ef_fuel_use_ch4_n2o,
+                                             reference_unit_conversion),
+            'N2O': Resolved_Emission_Factors('N2O', reference_ef_freight_co2, reference_ef_fuel_use_ch4_n2o,
+                                             reference_unit_conversion)
+        })
+
+    def get_factors(self, path, key, region, input_unit):
+        """
+        Get the resolved factor for every gas for one (path, key, region, unit).
+
+        Returns:
+            tuple: One resolved factor per gas, in self.gases order
+        """
+        factor_set_key = (path, key, region, input_unit)
+        factors = self.factor_sets.get(factor_set_key)
+        if factors is None:
+            factors = tuple(self.resolved_factors[gas].get(path, key, region, input_unit)
+                            for gas in self.gases)
+            if not any(factors):
+                # One shared tuple for every combination without a factor,
+                # so calculate() counts them with an identity check
+                factors = self.no_factors
+            if len(self.factor_sets) < self.MAX_FACTOR_SETS:
+                self.factor_sets[factor_set_key] = factors
+        return factors
+
+    def explain_factors(self, path, key, region, input_unit):
+        """
+        Get the lineage of every gas's factor for one (path, key, region, unit).
+
+        Returns:
+            dict: Gas name -> lineage from Resolved_Emission_Factors.explain
+        """
+        return {gas: self.resolved_factors[gas].explain(path, key, region, input_unit)
+                for gas in self.gases}
+
+    def calculate(self, supplier_inputs, trace=None, stats=None):
+        """
+        Calculate emissions of every gas for an array of supplier input objects.
+
+        Args:
+            supplier_inputs (list): Array of Supplier_Input objects
+            trace (CalculationTrace, optional): When given, the factor lineage
+                of every row is recorded into it (explain mode)
+            stats (dict, optional): When given, these counts are added to it:
+                - factor_cache_hits / factor_cache_misses: factor set lookups
+                  answered from / missing in the memoized factor sets
+                - factors_not_found: rows whose lookup found no factor for any gas
+                - rows_without_factor_key: rows lacking the fuel or vehicle and
+                  region fields needed for a lookup
+
+        Returns:
+            dict: Gas name -> list of per-row results, each containing:
+                - supplier_info: Supplier identification data
+                - <gas>_emissions: Calculated emissions value (e.g. co2_emissions)
+                - fuel_data: Original fuel consumption data used in calculation
+                - emission_factor: Emission factor applied
+                - status: 'Success', 'No emissions calculated' or the calculation error
+        """
+        results = {gas: [] for gas in self.gases}
+        gas_results = [(results[gas], result_key)
+                       for gas, result_key in zip(self.gases, self.result_keys)]
+        no_factors = self.no_factors
+        factor_sets = self.factor_sets
+        explanations = {}
+        # Counted in the uncommon branches only; hits are derived after the loop
+        factor_cache_misses = 0
+        factors_not_found = 0
+        rows_without_factor_key = 0
+
+        for row_index, supplier_input in enumerate(supplier_inputs):
+            fuel_used = supplier_input.Fuel_Used
+            fuel_amount = supplier_input.Fuel_Amount
+            vehicle_type = supplier_input.Vehicle_Type
+            region = supplier_input.Region
+
+            supplier_info = {
+                'supplier_container': supplier_input.Supplier_and_Container,
+                'source_description': supplier_input.Source_Description
+            }
+            fuel_data = {
+                'fuel_used': fuel_used,
+                'fuel_amount': fuel_amount,
+                'unit': supplier_input.Unit_Of_Fuel_Amount
+            }
+
+            # Fuel-based calculation takes precedence over vehicle/distance-based calculation
+            if fuel_used and fuel_amount is not None:
+                factor_key = (Resolved_Emission_Factors.FUEL, fuel_used, region,
+                              supplier_input.Unit_Of_Fuel_Amount)
+                factors = factor_sets.get(factor_key)
+                if factors is None:
+                    factor_cache_misses += 1
+                    factors = self.get_factors(*factor_key)
+                if factors is no_factors:
+                    factors_not_found += 1
+                activity_amounts = (fuel_amount,)
+                fuel_path = True
+            elif vehicle_type and region:
+                factor_key = (Resolved_Emission_Factors.FREIGHT, vehicle_type, region,
+                              supplier_input.Units_of_Measurement)
+                factors = factor_sets.get(factor_key)
+                if factors is None:
+                    factor_cache_misses += 1
+                    factors = self.get_factors(*factor_key)
+                if factors is no_factors:
+                    factors_not_found += 1
+                distance_travelled = supplier_input.Distance_Travelled
+                total_weight = supplier_input.Total_Weight_Of_Freight_InTonne
+                activity_amounts = (distance_travelled, total_weight) if (
+                    distance_travelled is not None and total_weight is not None) else None
+                fuel_path = False
+            else:
+                factor_key = None
+                factors = no_factors
+                activity_amounts = None
+                fuel_path = False
+                rows_without_factor_key += 1
+
+            for (gas_result_list, result_key), factor in zip(gas_results, factors):
+                emissions = 0.0
+                emission_factor = 0.0 if fuel_path else factor
+                status = None
+                try:
+                    if factor > 0 and activity_amounts is not None:
+                        emissions = factor
+                        for amount in activity_amounts:
+                            emissions = emissions * float(amount)
+                        emission_factor = factor
+                except (ValueError, TypeError) as e:
+                    emissions = 0.0
+                    emission_factor = 0.0
+                    status = f'Calculation error: {str(e)}'
+
+                gas_result_list.append({
+                    'supplier_info': supplier_info,
+                    result_key: emissions,
+                    'fuel_data': fuel_data,
+                    'emission_factor': emission_factor,
+                    'status': status or ('Success' if emissions > 0 else 'No emissions calculated')
+                })
+
+            if trace is not None:
+                if factor_key is not None and factor_key not in explanations:
+                    explanations[factor_key] = self.explain_factors(
+                        *factor_key)
+                trace.record(
+                    row_index=row_index,
+                    calculation_path=factor_key[0] if factor_key else None,
+                    key=factor_key[1] if factor_key else None,
+                    region=region,
+                    input_unit=factor_key[3] if factor_key else None,
+                    factors=explanations.get(factor_key, {}),
+                    emissions={gas: gas_result_list[-1][result_key]
+                               for gas, (gas_result_list, result_key) in zip(self.gases, gas_results)}
+                )
+
+        if stats is not None:
+            factor_lookups = len(supplier_inputs) - rows_without_factor_key
+            for name, count in (('factor_cache_hits', factor_lookups - factor_cache_misses),
+                                ('factor_cache_misses', factor_cache_misses),
+                                ('factors_not_found', factors_not_found),
+                                ('rows_without_factor_key', rows_without_factor_key)):
+                stats[name] = stats.get(name, 0) + count
+        return results
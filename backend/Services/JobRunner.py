@@ -0,0 +1,66 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Services.SupplierEmissionsCalculator import SupplierEmissionsCalculator
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    """
+    Worker pool running the queued jobs of a JobStore.
+
+    submit() hands a stored job to one of `workers` threads, which reads the
+    payload back from the store, runs SupplierEmissionsCalculator with a
+    progress callback that records rows done in the store, and stores the
+    serialized result (or the error). Status and results are only read from
+    the store, so they can be answered by any process using the same file.
+    """
+
+    def __init__(self, store, workers):
+        """
+        Initialize the runner; worker threads start on first use.
+
+        Args:
+            store (JobStore): Job store the jobs are read from and written to
+            workers (int): Number of jobs computed at the same time
+        """
+        self.store = store
+        self.workers = workers
+        self.executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, job_id, registry, profile):
+        """
+        Queue a stored job for computation.
+
+        Args:
+            job_id (str): Id returned by JobStore.create()
+            registry: Reference_Registry the job computes with
+            profile (str): Response profile of the result
+        """
+        with self._lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='compute-job')
+            return self.executor.submit(self.run, job_id, registry, profile)
+
+    def run(self, job_id, registry, profile):
+        """Compute one job and store its result; errors are stored, not raised."""
+        try:
+            self.store.start(job_id)
+            payload = json.loads(self.store.get_payload(job_id))
+            report = SupplierEmissionsCalculator(registry).calculate(
+                payload.get('supplier_data', {}), payload.get('activity_rows', []), profile=profile,
+                progress=lambda rows_done, rows_total: self.store.progress(job_id, rows_done))
+            self.store.succeed(job_id, json.dumps(report, separators=(',', ':'), sort_keys=True).encode())
+        except Exception as e:
+            logger.exception("Compute job %s failed", job_id)
+            self.store.fail(job_id, str(e))
+
+    def shutdown(self):
+        with self._lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by another user
+        return True
+    return True
+
+
+class JobStore:
+    """
+    SQLite store of asynchronous compute jobs.
+
+    Each job row holds the submitted payload, its status ('queued',
+    'running', 'succeeded' or 'failed'), progress as rows done of rows total,
+    and once finished the serialized result or the error. Every call opens
+    its own connection, so any thread or worker process sharing the database
+    file can create jobs and answer status queries. Finished jobs are deleted
+    by remove_expired() once their TTL has passed, and so are jobs that never
+    finished. Each job records the pid of the process computing it, so jobs
+    left queued or running by a process that has exited are marked as failed
+    by fail_orphaned() without touching those of live processes.
+    """
+
+    STATUS_COLUMNS = ('job_id', 'status', 'profile', 'rows_total', 'rows_done', 'error',
+                      'reference_version', 'created_at', 'started_at', 'finished_at')
+
+    def __init__(self, path):
+        """
+        Initialize the store, creating the database file and table if needed.
+
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    profile TEXT NOT NULL,
+                    rows_total INTEGER NOT NULL,
+                    rows_done INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    reference_version TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    payload BLOB NOT NULL,
+                    result BLOB,
+                    owner_pid INTEGER
+                )''')
+            # Stores created before jobs recorded their owner
+            columns = [row[1] for row in connection.execute('PRAGMA table_info(jobs)')]
+            if 'owner_pid' not in columns:
+                connection.execute('ALTER TABLE jobs ADD COLUMN owner_pid INTEGER')
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)')
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _execute(self, sql, parameters=()):
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(sql, parameters).rowcount
+
+    def create(self, payload, rows_total, profile, reference_version, owner_pid=None):
+        """
+        Store a new queued job.
+
+        Args:
+            payload (bytes): Serialized request payload
+            rows_total (int): Number of activity rows
+            profile (str): Response profile of the result
+            reference_version (str): Reference data version the job computes with
+            owner_pid (int, optional): Process that computes the job; defaults
+                to the calling process
+
+        Returns:
+            str: The job id
+        """
+        job_id = uuid.uuid4().hex
+        self._execute(
+            'INSERT INTO jobs (job_id, status, profile, rows_total, reference_version, created_at, payload, '
+            'owner_pid) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, 'queued', profile, rows_total, reference_version, time.time(), payload,
+             os.getpid() if owner_pid is None else owner_pid))
+        return job_id
+
+    def get(self, job_id):
+        """Status of a job (STATUS_COLUMNS), or None if unknown or expired."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                f'SELECT {", ".join(self.STATUS_COLUMNS)} FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return dict(zip(self.STATUS_COLUMNS, row)) if row else None
+
+    def _get_blob(self, job_id, column):
+        with closing(self._connect()) as connection:
+            row = connection.execute(f'SELECT {column} FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_payload(self, job_id):
+        """Serialized request payload of a job, or None."""
+        return self._get_blob(job_id, 'payload')
+
+    def get_result(self, job_id):
+        """Serialized result of a succeeded job, or None."""
+        return self._get_blob(job_id, 'result')
+
+    def start(self, job_id):
+        """Mark a job as running."""
+        self._execute("UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?", (time.time(), job_id))
+
+    def progress(self, job_id, rows_done):
+        """Record how many rows of a running job are calculated."""
+        self._execute('UPDATE jobs SET rows_done = ? WHERE job_id = ?', (rows_done, job_id))
+
+    def succeed(self, job_id, result):
+        """Store the serialized result; the payload is no longer needed and is dropped."""
+        self._execute(
+            "UPDATE jobs SET status = 'succeeded', rows_done = rows_total, result = ?, payload = x'', "
+            'finished_at = ? WHERE job_id = ?', (result, time.time(), job_id))
+
+    def fail(self, job_id, error):
+        """Mark a job as failed with an error message."""
+        self._execute(
+            "UPDATE jobs SET status = 'failed', error = ?, payload = x'', finished_at = ? WHERE job_id = ?",
+            (error, time.time(), job_id))
+
+    def fail_orphaned(self, error):
+        """
+        Mark the queued or running jobs of processes that have exited as failed.
+
+        Called when the server starts and when one of its workers exits: no
+        thread is working on these jobs any more, so they would otherwise stay
+        unfinished until they expire. Jobs of processes still alive (other
+        workers, other servers on the same file) are left alone.
+
+        Returns:
+            int: Number of jobs marked as failed
+        """
+        with closing(self._connect()) as connection:
+            owners = [row[0] for row in connection.execute(
+                "SELECT DISTINCT owner_pid FROM jobs WHERE status IN ('queued', 'running')")]
+        failed = 0
+        for owner_pid in owners:
+            if owner_pid is not None and _is_alive(owner_pid):
+                continue
+            failed += self._execute(
+                "UPDATE jobs SET status = 'failed', error = ?, payload = x'', finished_at = ? "
+                "WHERE status IN ('queued', 'running') AND owner_pid IS ?", (error, time.time(), owner_pid))
+        return failed
+
+    def remove_expired(self, ttl_seconds, unfinished_ttl_seconds=None):
+        """
+        Delete jobs that finished more than ttl_seconds ago.
+
+        Args:
+            ttl_seconds (float): How long finished jobs are kept
+            unfinished_ttl_seconds (float): Also delete jobs created more than
+                this long ago that have not finished (None keeps them)
+
+        Returns:
+            int: Number of jobs deleted
+        """
+        now = time.time()
+        if unfinished_ttl_seconds is None:
+            return self._execute('DELETE FROM jobs WHERE finished_at < ?', (now - ttl_seconds,))
+        return self._execute(
+            'DELETE FROM jobs WHERE finished_at < ? OR (finished_at IS NULL AND created_at < ?)',
+            (now - ttl_seconds, now - unfinished_ttl_seconds))
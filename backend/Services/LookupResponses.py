@@ -0,0 +1,100 @@
+import json
+
+from Services.ResponseCompression import ResponseCompression
+
+
+class LookupResponses:
+    """
+    Pre-serialized JSON bodies of the dropdown endpoints.
+
+    The responses of /api/lookup/<name>, /api/fuel_types, /api/suppliers and
+    /api/bootstrap only change when the reference data is reloaded, so they
+    are built once per reference version (as registry tables) and served as
+    bytes instead of being rebuilt and serialized on every request. Bodies of
+    at least 1 KB are also stored compressed, at maximum density, with every
+    available encoding.
+    """
+
+    # Compressed once per reference version, so the densest settings are affordable
+    COMPRESSION = ResponseCompression(min_bytes=1024, gzip_level=9, brotli_quality=11)
+
+    def __init__(self, bodies):
+        """
+        Initialize with serialized bodies and compress the large ones.
+
+        Args:
+            bodies (dict): Response name (e.g. 'lookup/region', 'fuel_types') -> JSON bytes
+        """
+        self.bodies = bodies
+        self.encoded = {
+            encoding: {name: self.COMPRESSION.compress(body, encoding) for name, body in bodies.items()
+                       if len(body) >= self.COMPRESSION.min_bytes}
+            for encoding in self.COMPRESSION.encodings
+        }
+
+    @staticmethod
+    def serialize(payload):
+        return json.dumps(payload, separators=(',', ':'), sort_keys=True).encode() + b'\n'
+
+    @classmethod
+    def from_references(cls, lookups, reference_ef_fuel_use_co2, supplier_catalog):
+        """
+        Build every dropdown response from the loaded reference data.
+
+        Args:
+            lookups (dict): Lookup name (e.g. 'region') -> ReferenceLookup
+            reference_ef_fuel_use_co2: Reference_EF_Fuel_Use_CO2 providing the fuel types
+            supplier_catalog (Reference_Supplier_Catalog): Supplier names
+        """
+        bodies = {
+            f'lookup/{name}': cls.serialize({'lookup': name, 'values': lookup.get_all()})
+            for name, lookup in lookups.items()
+        }
+
+        fuel_types = sorted(set(
+            row.get('Fuel', '') for row in reference_ef_fuel_use_co2.data if row.get('Fuel', '').strip()))
+        bodies['fuel_types'] = cls.serialize({'fuel_types': fuel_types})
+
+        bodies['suppliers'] = cls.serialize({'suppliers': supplier_catalog.suppliers})
+
+        return cls(bodies)
+
+    @classmethod
+    def bootstrap(cls, lookup_responses, reference_version):
+        """
+        Build the /api/bootstrap response: every dropdown catalog in one body.
+
+        Args:
+            lookup_responses (LookupResponses): The dropdown responses to combine
+            reference_version (str): Reference data version the catalogs belong to
+        """
+        payloads = {name: json.loads(body) for name, body in lookup_responses.bodies.items()}
+        return cls({'bootstrap': cls.serialize({
+            'reference_version': reference_version,
+            'suppliers': payloads['suppliers']['suppliers'],
+            'fuel_types': payloads['fuel_types']['fuel_types'],
+            'lookups': {payload['lookup']: payload['values']
+                        for name, payload in payloads.items() if name.startswith('lookup/')}
+        })})
+
+    def get(self, name):
+        """Serialized body of one response, or None if unknown."""
+        return self.bodies.get(name)
+
+    def get_encoded(self, name, accepted_encodings):
+        """
+        Body of one response in the preferred accepted encoding it is stored in.
+
+        Args:
+            name (str): Response name
+            accepted_encodings (iterable): Content-Encodings the client accepts
+
+        Returns:
+            tuple: (body, content_encoding); content_encoding is None for the plain body
+        """
+        accepted_encodings = set(accepted_encodings)
+        for encoding in self.COMPRESSION.encodings:
+            encoded_bodies = self.encoded.get(encoding, {})
+            if encoding in accepted_encodings and name in encoded_bodies:
+                return encoded_bodies[name], encoding
+        return self.bodies.get(name), None
@@ -0,0 +1,223 @@
+import heapq
+import itertools
+import logging
+import queue
+import smtplib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """
+    Background outbound mail delivery over a reused SMTP connection.
+
+    enqueue() only puts the message on an in-memory queue and returns, so
+    request threads never wait on the mail server. A single daemon thread
+    takes messages off the queue in batches of up to batch_size and sends
+    them over one SMTP connection (STARTTLS and login happen once per
+    connection, not per message); the connection stays open until it has
+    been idle for idle_timeout seconds. A message that fails with a
+    temporary error (connection problems, 4xx replies) is retried with
+    exponential backoff up to max_retries times; permanent (5xx) rejections
+    and exhausted retries are logged and counted as failed.
+    """
+
+    def __init__(self, host, port, username='', password='', starttls=True, timeout=10,
+                 batch_size=20, max_retries=5, backoff_seconds=2.0, max_backoff_seconds=300,
+                 idle_timeout=60, max_queued=1000, smtp_factory=smtplib.SMTP):
+        """
+        Initialize the queue; the delivery thread starts on the first enqueue().
+
+        Args:
+            host (str): SMTP server host
+            port (int): SMTP server port
+            username (str): Login user; no login when empty
+            password (str): Login password
+            starttls (bool): Upgrade the connection with STARTTLS before login
+            timeout (float): Socket timeout of the SMTP connection, seconds
+            batch_size (int): Messages sent per batch over the connection
+            max_retries (int): Retries of a temporarily failing message
+            backoff_seconds (float): Delay before the first retry; doubled for each further retry
+            max_backoff_seconds (float): Upper bound of the retry delay
+            idle_timeout (float): Close the connection after this many idle seconds
+            max_queued (int): Messages held at most; enqueue() refuses more
+            smtp_factory (callable): Creates the connection (smtplib.SMTP signature)
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.idle_timeout = idle_timeout
+        self.smtp_factory = smtp_factory
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.connections = 0
+        self.pending = 0
+
+        self._queue = queue.Queue(maxsize=max_queued)
+        # (next attempt time, sequence, attempt, message) of messages waiting to be retried
+        self._retries = []
+        self._sequence = itertools.count()
+        self._smtp = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._thread = None
+        self._stop = threading.Event()
+
+    def enqueue(self, sender, recipients, message):
+        """
+        Queue a message for delivery.
+
+        Args:
+            sender (str): Envelope sender
+            recipients (list): Envelope recipients
+            message (str): Complete message (e.g. MIMEMultipart.as_string())
+
+        Returns:
+            bool: False if the queue is full and the message was not accepted
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='mail-queue', daemon=True)
+                self._thread.start()
+            try:
+                self._queue.put_nowait((sender, list(recipients), message))
+            except queue.Full:
+                return False
+            self.pending += 1
+        return True
+
+    def _next_batch(self):
+        """Wait for queued or due messages; returns [(attempt, message)], empty when idle."""
+        timeout = self.idle_timeout
+        if self._retries:
+            timeout = min(timeout, max(0.0, self._retries[0][0] - time.monotonic()))
+        batch = []
+        try:
+            batch.append((0, self._queue.get(timeout=timeout)))
+        except queue.Empty:
+            pass
+        while len(batch) < self.batch_size:
+            try:
+                batch.append((0, self._queue.get_nowait()))
+            except queue.Empty:
+                break
+        # None is the wake-up sent by close()
+        batch = [(attempt, message) for attempt, message in batch if message is not None]
+        now = time.monotonic()
+        while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+            _, _, attempt, message = heapq.heappop(self._retries)
+            batch.append((attempt, message))
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                if not self._retries:
+                    self._disconnect()
+                continue
+            for attempt, message in batch:
+                self._deliver(attempt, message)
+
+    def _connect(self):
+        if self._smtp is None:
+            smtp = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username and self.password:
+                    smtp.login(self.username, self.password)
+            except BaseException:
+                smtp.close()
+                raise
+            self._smtp = smtp
+            self.connections += 1
+        return self._smtp
+
+    def _disconnect(self, graceful=True):
+        if self._smtp is not None:
+            try:
+                if graceful:
+                    self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp.close()
+            self._smtp = None
+
+    def _deliver(self, attempt, message):
+        sender, recipients, body = message
+        try:
+            try:
+                self._connect().sendmail(sender, recipients, body)
+            except smtplib.SMTPServerDisconnected:
+                # The reused connection was closed by the server; reconnect once
+                self._disconnect(graceful=False)
+                self._connect().sendmail(sender, recipients, body)
+        except Exception as e:
+            permanent = (isinstance(e, smtplib.SMTPResponseException) and e.smtp_code >= 500) or \
+                isinstance(e, smtplib.SMTPRecipientsRefused)
+            if not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                # The connection state is unknown after a network error
+                self._disconnect(graceful=False)
+            if permanent or attempt >= self.max_retries:
+                logger.error("Giving up on mail to %s after %d attempts: %s",
+                             ', '.join(recipients), attempt + 1, e)
+                self._finish(failed=True)
+                return
+            delay = min(self.backoff_seconds * (2 ** attempt), self.max_backoff_seconds)
+            logger.warning("Mail to %s failed (%s); retrying in %.2f s", ', '.join(recipients), e, delay)
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._sequence), attempt + 1, message))
+            with self._lock:
+                self.retried += 1
+            return
+        self._finish(failed=False)
+
+    def _finish(self, failed):
+        with self._lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.sent += 1
+            self.pending -= 1
+            if self.pending == 0:
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Block until every queued message is sent or has failed; returns False on timeout."""
+        with self._lock:
+            return self._idle.wait_for(lambda: self.pending == 0, timeout)
+
+    def close(self):
+        """Stop the delivery thread after its current batch and close the connection."""
+        self._stop.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._disconnect()
+
+    def stats(self):
+        """Delivery counters."""
+        with self._lock:
+            return {
+                'pending': self.pending,
+                'sent': self.sent,
+                'failed': self.failed,
+                'retried': self.retried,
+                'connections': self.connections
+            }
@@ -0,0 +1,148 @@
+import bisect
+import os
+import threading
+import time
+
+
+class Metrics:
+    """
+    Counters and latency histograms served in the Prometheus text format.
+
+    Metrics are declared once with counter() or histogram() and updated with
+    inc() and observe(), each time series identified by its label values.
+    Updates are made per request or per calculation stage, never per
+    activity row, so the lock is uncontended in practice. Values are kept
+    per process. With a process_label, every series is labelled with the
+    process id and a process_start_time_seconds gauge is added, and
+    render() can include the export() of other processes (the workers of
+    serve.py, see WorkerExchange) so one scrape reports all of them. Safe to
+    use from several threads.
+    """
+
+    # Histogram bucket upper bounds in seconds (+Inf is implied)
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, process_label=None):
+        """
+        Initialize an empty set of metrics.
+
+        Args:
+            buckets (tuple): Increasing histogram bucket upper bounds, in seconds
+            process_label (str, optional): Label holding the process id of
+                every series (e.g. 'pid'); None renders unlabelled series
+        """
+        self.buckets = tuple(buckets)
+        self.process_label = process_label
+        self.definitions = {}
+        self.values = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def counter(self, name, description, labels=()):
+        """Declare a counter with the given label names."""
+        self.definitions[name] = ('counter', description, tuple(labels))
+        self.values[name] = {}
+
+    def histogram(self, name, description, labels=()):
+        """Declare a histogram with the given label names."""
+        self.definitions[name] = ('histogram', description, tuple(labels))
+        self.values[name] = {}
+
+    def _series(self, name, labels):
+        # Label values in declaration order; unknown names raise KeyError
+        return tuple(str(labels[label]) for label in self.definitions[name][2])
+
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter."""
+        series = self._series(name, labels)
+        with self._lock:
+            values = self.values[name]
+            values[series] = values.get(series, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Record one observation in a histogram."""
+        series = self._series(name, labels)
+        bucket = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self.values[name].get(series)
+            if histogram is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                histogram = self.values[name][series] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][bucket] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def reset(self):
+        """Zero every series and restart the process clock (e.g. in a freshly forked worker)."""
+        with self._lock:
+            self.values = {name: {} for name in self.definitions}
+            self.started_at = time.time()
+
+    def export(self):
+        """
+        JSON-serializable copy of every series, read by render() in another process.
+
+        Returns:
+            dict: {'started_at', 'values': {name: [[label values, value], ...]}}
+        """
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'values': {name: [[list(series), [list(value[0]), value[1], value[2]]
+                                   if isinstance(value, list) else value]
+                                  for series, value in values.items()]
+                           for name, values in self.values.items()}
+            }
+
+    @staticmethod
+    def _labels(names, values, extra=None, process=None):
+        pairs = list(zip(names, values))
+        if process:
+            pairs.insert(0, process)
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+    def render(self, processes=None):
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4).
+
+        Args:
+            processes (dict, optional): Process id -> export() of other
+                processes to include; only used with a process_label
+
+        Returns:
+            str: The exposition, this process's live values included
+        """
+        exports = dict(processes or {}) if self.process_label else {}
+        exports[os.getpid()] = self.export()
+
+        lines = []
+        if self.process_label:
+            lines.append('# HELP process_start_time_seconds Start time of the process since unix epoch in seconds')
+            lines.append('# TYPE process_start_time_seconds gauge')
+            for pid in sorted(exports):
+                lines.append(f'process_start_time_seconds{{{self.process_label}="{pid}"}} '
+                             f'{float(exports[pid]["started_at"])!r}')
+        for name, (metric_type, description, label_names) in self.definitions.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for pid in sorted(exports):
+                process = (self.process_label, str(pid)) if self.process_label else None
+                for series, value in sorted(exports[pid]['values'].get(name, [])):
+                    if metric_type == 'counter':
+                        lines.append(f'{name}{self._labels(label_names, series, process=process)} {value}')
+                        continue
+                    bucket_counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets + ('+Inf',), bucket_counts):
+                        cumulative += bucket_count
+                        le = bound if isinstance(bound, str) else repr(float(bound))
+                        lines.append(f'{name}_bucket{self._labels(label_names, series, ("le", le), process)} '
+                                     f'{cumulative}')
+                    lines.append(f'{name}_sum{self._labels(label_names, series, process=process)} {total!r}')
+                    lines.append(f'{name}_count{self._labels(label_names, series, process=process)} {count}')
+        return '\n'.join(lines) + '\n'
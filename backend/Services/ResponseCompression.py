@@ -0,0 +1,62 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    # Optional dependency: without it responses are gzip-compressed only
+    brotli = None
+
+
+class ResponseCompression:
+    """
+    Content-Encoding negotiation and compression of response bodies.
+
+    Supports brotli ('br', when the brotli package is installed) and gzip,
+    preferring brotli when the client accepts both. Bodies smaller than
+    min_bytes are not compressed. Precomputed bodies use the slowest, densest
+    settings; bodies compressed per request use faster levels.
+    """
+
+    def __init__(self, min_bytes=1024, gzip_level=6, brotli_quality=5):
+        """
+        Initialize the compression settings.
+
+        Args:
+            min_bytes (int): Smallest body worth compressing
+            gzip_level (int): gzip compression level (1-9)
+            brotli_quality (int): brotli quality (0-11)
+        """
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def choose(self, accepted_encodings, body_size):
+        """
+        Pick the Content-Encoding for a body.
+
+        Args:
+            accepted_encodings (iterable): Encodings the client accepts (quality > 0)
+            body_size (int): Size of the uncompressed body in bytes
+
+        Returns:
+            str: The encoding to use, or None to send the body uncompressed
+        """
+        if body_size < self.min_bytes:
+            return None
+        return self.preferred(accepted_encodings)
+
+    def preferred(self, accepted_encodings):
+        """The preferred supported encoding among accepted_encodings, or None."""
+        accepted_encodings = set(accepted_encodings)
+        for encoding in self.encodings:
+            if encoding in accepted_encodings:
+                return encoding
+        return None
+
+    def compress(self, body, encoding):
+        """Compress body with one of self.encodings."""
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime=0 keeps the output (and so ETags of precomputed bodies) deterministic
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    LRU + TTL cache of serialized compute responses.
+
+    Calculations are deterministic for a given request payload and reference
+    data version, so a resubmitted form can be answered with the stored
+    response bytes. Keys are a canonical hash of the request (see key());
+    entries expire ttl_seconds after they were stored, and the least recently
+    used ones are evicted beyond max_entries or max_bytes. clear() drops
+    everything, e.g. when the reference data is reloaded. Safe to use from
+    several threads.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl_seconds=600):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of entries; 0 disables the cache
+            max_bytes (int): Maximum total size of the stored values
+            ttl_seconds (float): Lifetime of an entry
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts):
+        """
+        Canonical hash of JSON-serializable request parts.
+
+        Dict key order and whitespace do not matter, so resubmitting the same
+        form produces the same key.
+        """
+        canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key):
+        """Stored value of key, or None if missing or expired."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value, size):
+        """
+        Store value under key, evicting least recently used entries to stay within bounds.
+
+        Args:
+            key (str): Cache key from key()
+            value: Value to store
+            size (int): Size of value in bytes; values above max_bytes are not stored
+        """
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self.total_bytes -= self.entries.pop(key)[1]
+
+    def clear(self):
+        """Drop every entry (e.g. after a reference data reload)."""
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            self.invalidations += 1
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds
+            }
@@ -0,0 +1,198 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler aggregating the stacks of request threads.
+
+    A daemon thread wakes every `interval` seconds and records the current
+    Python stack of each thread that is serving a request (threads mark
+    themselves with enter() and leave()). Identical stacks are counted
+    together, and collapsed() returns them in the collapsed-stack format read
+    by flamegraph.pl and speedscope, one 'outermost;...;innermost count' line
+    per stack. Request threads only pay for a set insert and removal; the
+    sampling itself costs a few microseconds per sampled thread on the
+    profiler thread. Profilers of several processes (the workers of
+    serve.py) are combined with merge() over their export().
+    """
+
+    def __init__(self, interval=0.01, max_stacks=10000, max_depth=128):
+        """
+        Initialize a stopped profiler.
+
+        Args:
+            interval (float): Seconds between samples
+            max_stacks (int): Maximum number of distinct stacks kept; samples
+                of further stacks are only counted as dropped
+            max_depth (int): Innermost frames kept per stack
+        """
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.stacks = {}
+        self.samples = 0
+        self.dropped = 0
+        self.sampling_seconds = 0.0
+        self.started_at = None
+        self.threads = set()
+        self.labels = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def enter(self):
+        """Mark the calling thread as serving a request (sampled until leave())."""
+        self.threads.add(threading.get_ident())
+
+    def leave(self):
+        self.threads.discard(threading.get_ident())
+
+    def start(self):
+        """
+        Start sampling on a daemon thread.
+
+        Returns:
+            bool: False if the profiler is already running
+        """
+        if self.running:
+            return False
+        self._stop.clear()
+        self.started_at = time.time()
+
+        def sample_forever():
+            while not self._stop.wait(self.interval):
+                try:
+                    self.sample()
+                except Exception:
+                    logger.exception("Profiler sample failed")
+
+        self._thread = threading.Thread(target=sample_forever, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def label(self, code):
+        # 'function (file:first line)', file relative to backend/ for the app's
+        # own modules and package/module.py for libraries
+        label = self.labels.get(code)
+        if label is None:
+            filename = os.path.abspath(code.co_filename)
+            if filename.startswith(BACKEND_DIR + os.sep):
+                filename = os.path.relpath(filename, BACKEND_DIR)
+            else:
+                filename = os.path.join(os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+            label = self.labels[code] = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+        return label
+
+    def sample(self):
+        """Record the current stack of every thread marked with enter()."""
+        start = time.perf_counter()
+        frames = sys._current_frames()
+        sampled = []
+        for ident in list(self.threads):
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self.label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            sampled.append(';'.join(stack))
+        del frames
+        with self._lock:
+            for stack in sampled:
+                if stack in self.stacks:
+                    self.stacks[stack] += 1
+                elif len(self.stacks) < self.max_stacks:
+                    self.stacks[stack] = 1
+                else:
+                    self.dropped += 1
+            self.samples += len(sampled)
+            self.sampling_seconds += time.perf_counter() - start
+
+    def collapsed(self, stacks=None):
+        """
+        Aggregated stacks in the collapsed-stack format, most frequent first.
+
+        Args:
+            stacks (dict, optional): Stack -> count to format instead of this
+                profiler's own, e.g. from merge()
+        """
+        if stacks is None:
+            with self._lock:
+                stacks = dict(self.stacks)
+        ordered = sorted(stacks.items(), key=lambda item: item[1], reverse=True)
+        return ''.join(f'{stack} {count}\n' for stack, count in ordered)
+
+    def clear(self):
+        """Drop every recorded stack and reset the counters."""
+        with self._lock:
+            self.stacks = {}
+            self.samples = 0
+            self.dropped = 0
+            self.sampling_seconds = 0.0
+            self.started_at = time.time() if self.running else None
+
+    def export(self):
+        """JSON-serializable stats() and stacks, combined with other processes' by merge()."""
+        with self._lock:
+            stacks = dict(self.stacks)
+        return {'stats': self.stats(), 'stacks': stacks}
+
+    @staticmethod
+    def merge(exports):
+        """
+        Combine the export() of several profilers.
+
+        Args:
+            exports (dict): Process id -> export()
+
+        Returns:
+            tuple: (stacks, stats) - stack counts summed over the processes,
+                and their stats summed, with each process's own under 'workers'
+        """
+        stacks = {}
+        for export in exports.values():
+            for stack, count in export['stacks'].items():
+                stacks[stack] = stacks.get(stack, 0) + count
+        workers = {str(pid): exports[pid]['stats'] for pid in sorted(exports)}
+        stats = {
+            'running': any(worker['running'] for worker in workers.values()),
+            'samples': sum(worker['samples'] for worker in workers.values()),
+            'distinct_stacks': len(stacks),
+            'dropped_samples': sum(worker['dropped_samples'] for worker in workers.values()),
+            'sampling_seconds': round(sum(worker['sampling_seconds'] for worker in workers.values()), 6),
+            'workers': workers
+        }
+        return stacks, stats
+
+    def stats(self):
+        """Sample counts and the time spent sampling."""
+        with self._lock:
+            return {
+                'running': self.running,
+                'interval': self.interval,
+                'started_at': self.started_at,
+                'samples': self.samples,
+                'distinct_stacks': len(self.stacks),
+                'dropped_samples': self.dropped,
+                'sampling_seconds': round(self.sampling_seconds, 6)
+            }
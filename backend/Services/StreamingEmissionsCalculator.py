@@ -0,0 +1,173 @@
+import itertools
+import json
+
+from Services.SupplierEmissionsCalculator import SupplierEmissionsCalculator
+
+
+class StreamingEmissionsCalculator:
+    """
+    Emissions for an unbounded stream of activity rows in constant memory.
+
+    Input is NDJSON: an optional first line {"supplier_data": {...}} followed
+    by one activity row object per line, in the same shape as the
+    activity_rows of /api/compute_ghg_emissions. Rows are parsed as they are
+    read and calculated in chunks of chunk_size with the GhgEmissionsEngine;
+    each chunk yields one 'row' record per activity row (or an 'error'
+    record for rows that cannot be parsed) and is then discarded. Only the
+    running totals are kept, so the final 'summary' record carries the totals
+    by mode of transport, scope, activity type and gas without the per-row
+    details of the single-document response.
+    """
+
+    def __init__(self, registry, chunk_size=1000):
+        """
+        Initialize the calculator.
+
+        Args:
+            registry: Reference_Registry the whole stream is calculated with
+            chunk_size (int): Activity rows calculated per engine call
+        """
+        self.registry = registry
+        self.chunk_size = max(1, chunk_size)
+        self.supplier_calculator = SupplierEmissionsCalculator(registry)
+
+    def iter_chunks(self, lines):
+        """
+        Calculate an NDJSON stream of activity rows chunk by chunk.
+
+        Args:
+            lines (iterable): NDJSON lines (str or bytes); blank lines are skipped
+
+        Yields:
+            list: Records of one chunk, in row order. The last list ends with
+                the 'summary' record.
+        """
+        rows = self._parse_lines(lines)
+        supplier_data = {}
+        first = next(rows, None)
+        if first is not None:
+            line_number, row_data = first
+            if isinstance(row_data, dict) and 'supplier_data' in row_data:
+                supplier_data = row_data['supplier_data'] or {}
+                if not isinstance(supplier_data, dict):
+                    supplier_data = {}
+                    rows = itertools.chain(
+                        [(line_number, ValueError('supplier_data must be a JSON object'))], rows)
+            else:
+                rows = itertools.chain([first], rows)
+        yield from self.iter_row_chunks(rows, supplier_data)
+
+    @staticmethod
+    def _parse_lines(lines):
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row_data = json.loads(line)
+                if not isinstance(row_data, dict):
+                    raise ValueError('Activity row must be a JSON object')
+            except ValueError as e:
+                row_data = e
+            yield line_number, row_data
+
+    def iter_row_chunks(self, rows, supplier_data):
+        """
+        Calculate parsed activity rows chunk by chunk.
+
+        Args:
+            rows (iterable): (line_number, row) pairs where row is an activity
+                row dict, or the exception raised while reading it
+            supplier_data (dict): Supplier fields applied to every row
+
+        Yields:
+            list: Records of one chunk, in row order. The last list ends with
+                the 'summary' record.
+        """
+        engine = self.registry.get('ghg_emissions_engine')
+        totals = dict.fromkeys(engine.result_keys, 0.0)
+        summary_data = {}
+        failed_rows = 0
+        chunk = []
+        row_count = 0
+
+        for row_index, (line_number, row_data) in enumerate(rows):
+            row_count += 1
+            try:
+                if isinstance(row_data, Exception):
+                    raise row_data
+                chunk.append((row_index, row_data,
+                              self.supplier_calculator.build_supplier_input(supplier_data, row_data)))
+            except (ValueError, TypeError) as e:
+                # Kept in the chunk so the error record is written in row order
+                failed_rows += 1
+                chunk.append((row_index, None, {'type': 'error', 'row_index': row_index,
+                                                'line': line_number, 'error': str(e)}))
+
+            if len(chunk) >= self.chunk_size:
+                yield self._calculate_chunk(engine, chunk, totals, summary_data)
+                chunk = []
+
+        records = self._calculate_chunk(engine, chunk, totals, summary_data)
+
+        manufacturing_emissions, manufacturing_details = \
+            self.supplier_calculator.calculate_manufacturing(supplier_data)
+        records.append({
+            'type': 'summary',
+            'status': 'success',
+            'supplier_data': supplier_data,
+            'processed_rows': row_count - failed_rows,
+            'failed_rows': failed_rows,
+            'manufacturing_emissions': manufacturing_emissions,
+            'manufacturing_details': manufacturing_details,
+            'transport_emissions': {
+                'co2': totals['co2_emissions'],
+                'ch4': totals['ch4_emissions'],
+                'n2o': totals['n2o_emissions'],
+                'summary_by_transport_scope_activity': summary_data
+            },
+            'total_emissions': (manufacturing_details['manufacturing_emissions_metric_tonnes'] +
+                                totals['co2_emissions'] + totals['ch4_emissions']),
+            'reference_version': self.registry.version
+        })
+        yield records
+
+    def _calculate_chunk(self, engine, chunk, totals, summary_data):
+        gas_results = engine.calculate([supplier_input for _, row_data, supplier_input in chunk
+                                        if row_data is not None])
+        gases = list(zip(engine.gases, engine.result_keys))
+        records = []
+        position = 0
+
+        for row_index, row_data, supplier_input in chunk:
+            if row_data is None:
+                # supplier_input holds the error record of an unparseable row
+                records.append(supplier_input)
+                continue
+
+            activity_summary = summary_data.setdefault(
+                row_data.get('Mode_of_Transport', 'Unknown'), {}).setdefault(
+                row_data.get('Scope', 'Unknown'), {}).setdefault(
+                self.supplier_calculator.activity_type(row_data), {})
+
+            record = {
+                'type': 'row',
+                'row_index': row_index,
+                'source_description': row_data.get('Source_Description', ''),
+                'vehicle_type': row_data.get('Vehicle_Type', ''),
+                'region': row_data.get('Region', '')
+            }
+            emission_factors = {}
+            statuses = {}
+            for gas, result_key in gases:
+                result = gas_results[gas][position]
+                emissions = result[result_key]
+                record[result_key] = emissions
+                emission_factors[gas] = result['emission_factor']
+                statuses[gas] = result['status']
+                totals[result_key] += emissions
+                activity_summary.setdefault(gas, {'total_emissions': 0.0})['total_emissions'] += emissions
+            record['emission_factor'] = emission_factors
+            record['status'] = statuses
+            records.append(record)
+            position += 1
+        return records
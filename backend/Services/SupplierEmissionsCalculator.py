@@ -0,0 +1,312 @@
+import time
+
+from Components.Supplier_Input import Supplier_Input
+
+
+class SupplierEmissionsCalculator:
+    """
+    Emissions report for one supplier payload.
+
+    Combines the transport emissions of every activity row (all gases, via
+    the GhgEmissionsEngine) with the supplier's manufacturing emissions from
+    Reference_Source_Product_Matrix, and summarizes them by mode of
+    transport, scope, activity type and gas. This is the body of
+    /api/compute_ghg_emissions, shared with the batch endpoint.
+
+    The profile selects which per-row sections are built:
+    - 'full': every section, with per-row results in detailed_results, in the
+      backward-compatible co2/ch4_emissions_results lists and as details
+      lists in summary_by_transport_scope_activity
+    - 'summary': totals only, no per-row data
+    - 'compact-columnar': totals plus one transport_emissions['rows'] table
+      holding each per-row field once, as a list per column
+    """
+
+    PROFILES = ('full', 'summary', 'compact-columnar')
+    # Rows calculated between two progress reports
+    PROGRESS_CHUNK_ROWS = 1000
+
+    def __init__(self, registry):
+        """
+        Initialize the calculator.
+
+        Args:
+            registry: Reference_Registry providing 'ghg_emissions_engine' and
+                'source_product_matrix'; its version is reported in the result
+        """
+        self.registry = registry
+
+    @staticmethod
+    def activity_type(row_data):
+        """'Fuel' for fuel-based activity rows, otherwise 'Distance'."""
+        return 'Fuel' if row_data.get('Fuel_Used') and row_data.get('Fuel_Amount') else 'Distance'
+
+    @staticmethod
+    def build_supplier_input(supplier_data, row_data):
+        """
+        Create the Supplier_Input of one activity row.
+
+        Raises:
+            ValueError, TypeError: If a numeric field cannot be parsed
+        """
+        return Supplier_Input(
+            Supplier_and_Container=supplier_data.get(
+                'Supplier_and_Container', ''),
+            Container_Weight=float(
+                supplier_data.get('Container_Weight', 0)),
+            Number_Of_Containers=int(
+                supplier_data.get('Number_Of_Containers', 0)),
+            Source_Description=row_data.get('Source_Description', ''),
+            Region=row_data.get('Region', ''),
+            Mode_of_Transport=row_data.get('Mode_of_Transport', ''),
+            Scope=row_data.get('Scope', ''),
+            Type_Of_Activity_Data=row_data.get(
+                'Type_Of_Activity_Data', ''),
+            Vehicle_Type=row_data.get('Vehicle_Type'),
+            Distance_Travelled=float(row_data['Distance_Travelled']) if row_data.get(
+                'Distance_Travelled') is not None else None,
+            Total_Weight_Of_Freight_InTonne=float(row_data['Total_Weight_Of_Freight_InTonne']) if row_data.get(
+                'Total_Weight_Of_Freight_InTonne') is not None else None,
+            Num_Of_Passenger=int(row_data['Num_Of_Passenger']) if row_data.get(
+                'Num_Of_Passenger') is not None else None,
+            Units_of_Measurement=row_data.get('Units_of_Measurement'),
+            Fuel_Used=row_data.get('Fuel_Used'),
+            Fuel_Amount=float(row_data['Fuel_Amount']) if row_data.get(
+                'Fuel_Amount') is not None else None,
+            Unit_Of_Fuel_Amount=row_data.get('Unit_Of_Fuel_Amount')
+        )
+
+    def calculate_manufacturing(self, supplier_data):
+        """
+        Calculate the manufacturing emissions of the supplier's containers.
+
+        Returns:
+            tuple: (manufacturing_emissions, manufacturing_details)
+        """
+        container_weight = float(supplier_data.get('Container_Weight', 0))
+        number_of_containers = int(
+            supplier_data.get('Number_Of_Containers', 0))
+
+        # Get supplier emission factor from Reference_Source_Product_Matrix
+        supplier_and_container = supplier_data.get(
+            'Supplier_and_Container', '')
+        supplier_emission_factor = None
+
+        if supplier_and_container:
+            # Look up the emission factor using the Reference_Source_Product_Matrix
+            supplier_emission_factor = self.registry.get('source_product_matrix').get_manufacturing_emissions_factor(
+                supplier_and_container)
+
+        # If no emission factor found in matrix, try to get from supplied data or use default
+        if supplier_emission_factor is None:
+            supplier_emission_factor = float(
+                # Default fallback
+                supplier_data.get('Supplier_Emission_Factor', 0.5))
+            emission_factor_source = 'default/supplied'
+        else:
+            emission_factor_source = 'reference_matrix'
+
+        manufacturing_emissions = (container_weight * number_of_containers *
+                                   supplier_emission_factor) / 907184.74  # Convert to tonnes
+
+        manufacturing_emissions_metric_tonnes = manufacturing_emissions * \
+            (0.907185)  # Convert to Mertic tonnes
+
+
+        return manufacturing_emissions, {
+            'supplier_emission_factor': supplier_emission_factor,
+            'emission_factor_source': emission_factor_source,
+            'container_weight': container_weight,
+            'number_of_containers': number_of_containers,
+            'total_material_weight_tonnes': (container_weight * number_of_containers) / 1000000,
+            'manufacturing_emissions_metric_tonnes': manufacturing_emissions_metric_tonnes
+        }
+
+    def build_row_columns(self, activity_rows, gas_results, gas_result_keys):
+        """
+        Per-row results as columns (compact-columnar profile).
+
+        Returns:
+            dict: Column name -> list with one value per activity row
+        """
+        columns = {
+            'source_description': [row_data.get('Source_Description', '') for row_data in activity_rows],
+            'mode_of_transport': [row_data.get('Mode_of_Transport', 'Unknown') for row_data in activity_rows],
+            'scope': [row_data.get('Scope', 'Unknown') for row_data in activity_rows],
+            'activity_type': [self.activity_type(row_data) for row_data in activity_rows],
+            'vehicle_type': [row_data.get('Vehicle_Type', '') for row_data in activity_rows],
+            'region': [row_data.get('Region', '') for row_data in activity_rows]
+        }
+        for gas, result_key in gas_result_keys:
+            results = gas_results[gas]
+            gas_name = gas.lower()
+            columns[result_key] = [result.get(result_key, 0.0) for result in results]
+            columns[f'{gas_name}_emission_factor'] = [result.get('emission_factor', 0.0) for result in results]
+            columns[f'{gas_name}_status'] = [result.get('status', '') for result in results]
+        return columns
+
+    def calculate(self, supplier_data, activity_rows, trace=None, profile='full', progress=None, stats=None):
+        """
+        Calculate the emissions report for one supplier.
+
+        Args:
+            supplier_data (dict): Supplier_and_Container, Container_Weight,
+                Number_Of_Containers and optional Supplier_Emission_Factor
+            activity_rows (list): Activity row dicts as posted to /api/compute_ghg_emissions
+            trace (CalculationTrace, optional): Records factor lineage (explain mode)
+            profile (str): One of PROFILES
+            progress (callable, optional): Called with (rows_done, rows_total) after
+                every PROGRESS_CHUNK_ROWS calculated rows; not combined with trace
+            stats (dict, optional): Filled in with the seconds spent per stage
+                under 'stages' ('supplier_input', 'emissions', 'summary') and
+                the factor lookup counts of GhgEmissionsEngine.calculate
+
+        Returns:
+            dict: The /api/compute_ghg_emissions response body
+
+        Raises:
+            ValueError, TypeError: If a numeric field cannot be parsed
+            ValueError: If profile is not one of PROFILES
+        """
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown profile '{profile}'; expected one of {', '.join(self.PROFILES)}")
+        with_details = profile == 'full'
+
+        stage_start = time.perf_counter()
+        stages = {}
+
+        # Process each activity row
+        supplier_input_objects = [self.build_supplier_input(supplier_data, row_data)
+                                  for row_data in activity_rows]
+        stages['supplier_input'], stage_start = self._lap(stage_start)
+
+        # Calculate CO2, CH4 and N2O emissions in a single pass over the rows
+        ghg_emissions_engine = self.registry.get('ghg_emissions_engine')
+        if progress is None:
+            gas_results = ghg_emissions_engine.calculate(
+                supplier_input_objects, trace=trace, stats=stats)
+        else:
+            gas_results = {gas: [] for gas in ghg_emissions_engine.gases}
+            rows_total = len(supplier_input_objects)
+            for start in range(0, rows_total, self.PROGRESS_CHUNK_ROWS):
+                chunk_results = ghg_emissions_engine.calculate(
+                    supplier_input_objects[start:start + self.PROGRESS_CHUNK_ROWS], stats=stats)
+                for gas, results in chunk_results.items():
+                    gas_results[gas].extend(results)
+                progress(min(start + self.PROGRESS_CHUNK_ROWS, rows_total), rows_total)
+        stages['emissions'], stage_start = self._lap(stage_start)
+        co2_results = gas_results['CO2']
+        ch4_results = gas_results['CH4']
+        n2o_results = gas_results['N2O']
+
+        # Create summarized data by Mode of Transport, Scope, Activity type, and GHG Type
+        summary_data = {}
+        gas_result_keys = list(zip(ghg_emissions_engine.gases, ghg_emissions_engine.result_keys))
+
+        if with_details:
+            for i, row_data in enumerate(activity_rows):
+                mode_of_transport = row_data.get('Mode_of_Transport', 'Unknown')
+                scope = row_data.get('Scope', 'Unknown')
+                activity_type = self.activity_type(row_data)
+
+                # Initialize nested structure if not exists
+                activity_summary = summary_data.setdefault(mode_of_transport, {}).setdefault(
+                    scope, {}).setdefault(activity_type, {})
+
+                # Row fields shared by the detail entry of every gas
+                if activity_type == 'Fuel':
+                    activity_detail = {
+                        'fuel_used': row_data.get('Fuel_Used', ''),
+                        'fuel_amount': row_data.get('Fuel_Amount', 0),
+                        'unit_of_fuel_amount': row_data.get('Unit_Of_Fuel_Amount', '')
+                    }
+                else:
+                    activity_detail = {
+                        'distance_travelled': row_data.get('Distance_Travelled', 0),
+                        'total_weight_of_freight': row_data.get('Total_Weight_Of_Freight_InTonne', 0),
+                        'units_of_measurement': row_data.get('Units_of_Measurement', '')
+                    }
+
+                for gas, result_key in gas_result_keys:
+                    result = gas_results[gas][i]
+                    gas_summary = activity_summary.setdefault(gas, {
+                        'total_emissions': 0.0,
+                        'details': []
+                    })
+
+                    # Add emissions to the appropriate category
+                    gas_summary['total_emissions'] += result.get(result_key, 0.0)
+
+                    # Add detailed information
+                    detail = {
+                        'row_index': i,
+                        'source_description': row_data.get('Source_Description', ''),
+                        'vehicle_type': row_data.get('Vehicle_Type', ''),
+                        'region': row_data.get('Region', ''),
+                        result_key: result.get(result_key, 0.0),
+                        'emission_factor': result.get('emission_factor', 0.0),
+                        'status': result.get('status', '')
+                    }
+                    detail.update(activity_detail)
+                    gas_summary['details'].append(detail)
+        else:
+            # Totals only: no per-row detail entries are built
+            for i, row_data in enumerate(activity_rows):
+                activity_summary = summary_data.setdefault(row_data.get('Mode_of_Transport', 'Unknown'), {}).setdefault(
+                    row_data.get('Scope', 'Unknown'), {}).setdefault(self.activity_type(row_data), {})
+                for gas, result_key in gas_result_keys:
+                    gas_summary = activity_summary.setdefault(gas, {'total_emissions': 0.0})
+                    gas_summary['total_emissions'] += gas_results[gas][i].get(result_key, 0.0)
+
+        # Calculate overall totals
+        total_co2_emissions = sum(result['co2_emissions']
+                                  for result in co2_results)
+        total_ch4_emissions = sum(result['ch4_emissions']
+                                  for result in ch4_results)
+        total_n2o_emissions = sum(result['n2o_emissions']
+                                  for result in n2o_results)
+
+        manufacturing_emissions, manufacturing_details = self.calculate_manufacturing(
+            supplier_data)
+
+        # Return comprehensive results including summarized data
+        transport_emissions = {
+            'co2': total_co2_emissions,
+            'ch4': total_ch4_emissions,
+            'n2o': total_n2o_emissions,
+            'summary_by_transport_scope_activity': summary_data
+        }
+        report = {
+            'status': 'success',
+            'supplier_data': supplier_data,
+            'processed_rows': len(supplier_input_objects),
+            'manufacturing_emissions': manufacturing_emissions,
+            'manufacturing_details': manufacturing_details,
+            'transport_emissions': transport_emissions,
+            'total_emissions': manufacturing_details['manufacturing_emissions_metric_tonnes'] + total_co2_emissions + total_ch4_emissions,
+            'total_co2_emissions': total_co2_emissions,  # Keep for backward compatibility
+            'total_ch4_emissions': total_ch4_emissions,  # Keep for backward compatibility
+            'reference_version': self.registry.version
+        }
+        if with_details:
+            transport_emissions['detailed_results'] = {
+                'co2': co2_results,
+                'ch4': ch4_results,
+                'n2o': n2o_results
+            }
+            report['co2_emissions_results'] = co2_results  # Keep for backward compatibility
+            report['ch4_emissions_results'] = ch4_results  # Keep for backward compatibility
+        elif profile == 'compact-columnar':
+            transport_emissions['rows'] = self.build_row_columns(activity_rows, gas_results, gas_result_keys)
+        if trace is not None:
+            report['explain'] = trace.to_dict()
+        stages['summary'], _ = self._lap(stage_start)
+        if stats is not None:
+            stats['stages'] = stages
+        return report
+
+    @staticmethod
+    def _lap(start):
+        # (seconds since start, now)
+        now = time.perf_counter()
+        return now - start, now
@@ -0,0 +1,146 @@
+import codecs
+import collections
+import csv
+import os
+import re
+
+from Services.StreamingEmissionsCalculator import StreamingEmissionsCalculator
+
+# Spreadsheet column headers (normalized, see _normalize_header) -> activity row fields.
+# The layout is the one of Unit Test/Data/Co2TestDataFreightDistance.csv and Co2TestDataFuel.csv;
+# the activity row field names themselves are accepted as headers too.
+COLUMN_MAP = {
+    'source description': 'Source_Description',
+    'description': 'Source_Description',
+    'region': 'Region',
+    'mode of transport': 'Mode_of_Transport',
+    'scope': 'Scope',
+    'type of activity data': 'Type_Of_Activity_Data',
+    'vehicle type': 'Vehicle_Type',
+    'distance travelled': 'Distance_Travelled',
+    'total weight of freight (tonne)': 'Total_Weight_Of_Freight_InTonne',
+    'units of measurement (tonne miles)': 'Units_of_Measurement',
+    'units of measurement': 'Units_of_Measurement',
+    'number of passengers': 'Num_Of_Passenger',
+    'fuel used': 'Fuel_Used',
+    'fuel amount': 'Fuel_Amount',
+    'unit of fuel amount': 'Unit_Of_Fuel_Amount'
+}
+for _field in list(COLUMN_MAP.values()):
+    COLUMN_MAP.setdefault(_field.lower(), _field)
+
+# Gases whose calculation status is reported, one column each
+STATUS_GASES = ('CO2', 'CH4', 'N2O')
+# Columns appended to the input columns in the results file
+RESULT_COLUMNS = ['CO2 Emissions (metric tonnes)', 'CH4 Emissions (metric tonnes)',
+                  'N2O Emissions (metric tonnes)'] + [f'{gas} Status' for gas in STATUS_GASES]
+
+
+def _normalize_header(header):
+    return re.sub(r'\s+', ' ', str(header or '')).strip().lower()
+
+
+class UploadEmissionsCalculator:
+    """
+    Emissions for an uploaded CSV or XLSX file of activity rows.
+
+    The file is read as a stream (csv.reader over the upload, openpyxl in
+    read-only mode for XLSX), its columns are mapped to Supplier_Input
+    fields with COLUMN_MAP and the rows are calculated in fixed-size chunks
+    by the StreamingEmissionsCalculator. Every input row is written to the
+    results CSV as it is calculated, with RESULT_COLUMNS appended, so memory
+    use does not depend on the number of rows.
+    """
+
+    FORMATS = ('csv', 'xlsx')
+
+    def __init__(self, registry, chunk_size=1000):
+        """
+        Initialize the calculator.
+
+        Args:
+            registry: Reference_Registry the whole file is calculated with
+            chunk_size (int): Rows calculated per engine call
+        """
+        self.streaming_calculator = StreamingEmissionsCalculator(registry, chunk_size)
+
+    @classmethod
+    def detect_format(cls, filename):
+        """File format from the upload filename ('csv' or 'xlsx'), or None."""
+        extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+        return extension if extension in cls.FORMATS else None
+
+    @staticmethod
+    def _iter_csv(file):
+        # utf-8-sig drops the byte order mark Excel writes at the start of CSV exports
+        text = codecs.getreader('utf-8-sig')(file, errors='replace')
+        return csv.reader(text)
+
+    @staticmethod
+    def _iter_xlsx(file):
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    def calculate(self, file, file_format, output_path, supplier_data=None):
+        """
+        Calculate every row of an uploaded file and write the results CSV.
+
+        Args:
+            file: Binary file object of the upload
+            file_format (str): 'csv' or 'xlsx'
+            output_path (str): Results CSV to write
+            supplier_data (dict, optional): Supplier fields applied to every row
+
+        Returns:
+            dict: The summary record of StreamingEmissionsCalculator, plus 'columns'
+                (the input columns mapped to activity row fields)
+
+        Raises:
+            ValueError: If the format is not supported or no column can be mapped
+        """
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Unsupported file format: {file_format}")
+        sheet_rows = iter(self._iter_csv(file) if file_format == 'csv' else self._iter_xlsx(file))
+
+        header = [str(cell) if cell is not None else '' for cell in next(sheet_rows, None) or []]
+        fields = [COLUMN_MAP.get(_normalize_header(column)) for column in header]
+        if not any(fields):
+            raise ValueError('No recognised activity columns in the header row')
+        columns = {column: field for column, field in zip(header, fields) if field}
+
+        # Input cells of the rows in the current chunk, released as their results are written
+        pending_cells = collections.deque()
+
+        def activity_rows():
+            for line_number, cells in enumerate(sheet_rows, start=2):
+                if not any(cell not in (None, '') for cell in cells):
+                    continue
+                pending_cells.append(cells)
+                yield line_number, {field: (cell if cell != '' else None)
+                                    for field, cell in zip(fields, cells) if field}
+
+        with open(output_path, 'w', encoding='utf-8', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow(header + RESULT_COLUMNS)
+            for records in self.streaming_calculator.iter_row_chunks(activity_rows(), supplier_data or {}):
+                for record in records:
+                    if record['type'] == 'summary':
+                        summary = record
+                        continue
+                    cells = list(pending_cells.popleft())
+                    cells += [''] * (len(header) - len(cells))
+                    if record['type'] == 'error':
+                        # The row could not be read, so no gas was calculated
+                        writer.writerow(cells + ['', '', ''] + [f"Error: {record['error']}"] * len(STATUS_GASES))
+                    else:
+                        writer.writerow(cells + [record['co2_emissions'], record['ch4_emissions'],
+                                                 record['n2o_emissions']]
+                                        + [record['status'].get(gas, '') for gas in STATUS_GASES])
+
+        summary['columns'] = columns
+        return summary
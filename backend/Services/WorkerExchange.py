@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerExchange:
+    """
+    Directory through which the worker processes of serve.py share state.
+
+    Each worker periodically publishes its own state (metrics, profiler
+    stacks) as '<kind>-<pid>.json', and collect() reads the latest file of
+    every worker, so whichever worker answers a request can report on all of
+    them. Control files ('control-<name>.json') carry requests meant for
+    every worker, such as starting the profiler; workers apply them on their
+    next sync. Files are replaced atomically, so readers never see a partial
+    write. The master removes a worker's files when it exits.
+    """
+
+    def __init__(self, directory):
+        """
+        Initialize the exchange, creating the directory if needed.
+
+        Args:
+            directory (str): Directory shared by the master and its workers
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _write(self, filename, data):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(data, file)
+            os.replace(temp_path, os.path.join(self.directory, filename))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _read(self, filename):
+        try:
+            with open(os.path.join(self.directory, filename)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            # Removed by the master after its worker exited
+            return None
+
+    def publish(self, kind, data):
+        """Replace this process's state of the given kind."""
+        self._write(f'{kind}-{os.getpid()}.json', data)
+
+    def collect(self, kind):
+        """
+        Latest published state of every worker.
+
+        Returns:
+            dict: Worker pid -> published data
+        """
+        states = {}
+        prefix = f'{kind}-'
+        for filename in os.listdir(self.directory):
+            pid = filename[len(prefix):-len('.json')]
+            if filename.startswith(prefix) and filename.endswith('.json') and pid.isdigit():
+                data = self._read(filename)
+                if data is not None:
+                    states[int(pid)] = data
+        return states
+
+    def set_control(self, name, data):
+        """Store a request that every worker applies on its next sync."""
+        self._write(f'control-{name}.json', data)
+
+    def get_control(self, name):
+        """The last request stored under name, or None."""
+        return self._read(f'control-{name}.json')
+
+    def remove_worker(self, pid):
+        """Delete every file published by a worker that has exited."""
+        suffix = f'-{pid}.json'
+        for filename in os.listdir(self.directory):
+            if filename.endswith(suffix) and not filename.startswith('control-'):
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except FileNotFoundError:
+                    pass
+
+    def clear(self):
+        """Delete every published state and control file (e.g. left by a previous server)."""
+        for filename in os.listdir(self.directory):
+            if filename.endswith(('.json', '.tmp')):
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except FileNotFoundError:
+                    pass
+
+    def start_sync(self, sync, interval):
+        """
+        Call sync() every `interval` seconds on a daemon thread.
+
+        Returns:
+            bool: False if a sync thread is already running
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._stop.clear()
+
+        def sync_forever():
+            while not self._stop.wait(interval):
+                try:
+                    sync()
+                except Exception:
+                    logger.exception("Worker state sync failed")
+
+        self._thread = threading.Thread(target=sync_forever, name='worker-sync', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop_sync(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -4,40 +4,58 @@
 
 
 from config import get_config
-import importlib.util
-from flask import Flask, jsonify, request
-import csv
+from flask import Flask, Request, Response, g, jsonify, request, send_file, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+import hmac
 import os
 import logging
+import time
+import uuid
 from flask_cors import CORS
 import json
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-from Components.Supplier_Input import Supplier_Input
-from Components.reference_ef import Reference_EF_Public, Reference_EF_Freight_CO2, Reference_EF_Freight_CH4_NO2, Reference_EF_Road, Reference_EF_Fuel_Use_CH4_N2O, Reference_EF_Fuel_Use_CO2, Reference_Unit_Conversion
-from Components.reference_lookups import ReferenceLookup
-from Components.Reference_Source_Product_Matrix import Reference_Source_Product_Matrix
-from Services.Co2FossilFuelCalculator import Co2FossilFuelCalculator
-
-# Import CH4 Calculator - handling space in filename
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'Services'))
-spec = importlib.util.spec_from_file_location("ch4_calculator", os.path.join(
-    os.path.dirname(__file__), "Services/CH4 Calculator.py"))
-if spec and spec.loader:
-    ch4_calculator_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(ch4_calculator_module)
-    Ch4Calculator = ch4_calculator_module.Ch4Calculator
+from Components.reference_registry import create_reference_registry, FACET_PREFIX, LOOKUP_PREFIX
+from Components.reference_reloader import Reference_Reloader
+from Services.CalculationTrace import CalculationTrace
+from Services.SupplierEmissionsCalculator import SupplierEmissionsCalculator
+from Services.BatchComputePool import BatchComputePool
+from Services.StreamingEmissionsCalculator import StreamingEmissionsCalculator
+from Services.UploadEmissionsCalculator import UploadEmissionsCalculator
+from Services.ResponseCompression import ResponseCompression
+from Services.ResultCache import ResultCache
+from Services.MailQueue import MailQueue
+from Services.JobStore import JobStore
+from Services.JobRunner import JobRunner
+from Services.Metrics import Metrics
+from Services.SamplingProfiler import SamplingProfiler
+from Services.CallProfile import CallProfile
+
+
+# Get configuration (the class named by FLASK_ENV, development by default)
+config = get_config()
 
+class UploadLimitedRequest(Request):
+    """
+    Request whose body is capped at UPLOAD_MAX_BYTES on /api/uploads.
+
+    Werkzeug stops reading a body at max_content_length whether or not it
+    declares a Content-Length (chunked uploads included) and raises
+    RequestEntityTooLarge. Flask only has an app-wide MAX_CONTENT_LENGTH,
+    which would also cap the NDJSON bodies of /api/compute_ghg_emissions/stream.
+    """
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'upload_activity_file':
+            return config.UPLOAD_MAX_BYTES
+        return super().max_content_length
 
-# Get configuration
-config = get_config()
 
 # Initialize Flask app and CORS at the top
 app = Flask(__name__)
+app.request_class = UploadLimitedRequest
 CORS(app, origins=config.CORS_ORIGINS)
 
 # Configure logging to reduce verbose output
@@ -47,77 +65,238 @@ if config.DEBUG:
     # Set Flask app logger to WARNING level
     app.logger.setLevel(logging.WARNING)
 
-# --- Reference - Lookups.csv Lookups ---
-lookups_csv_path = config.get_csv_path('lookups')
-lookup_columns = config.LOOKUP_COLUMNS
-reference_lookups = {col: ReferenceLookup(
-    lookups_csv_path, col) for col in lookup_columns}
+# Reference tables load lazily on first use (through the on-disk snapshot);
+# endpoints get them from the current registry rather than module globals.
+# Reloads build a new registry in the background and swap it in atomically.
+reference_data = Reference_Reloader(lambda: create_reference_registry(config))
+if config.REFERENCE_PRELOAD:
+    reference_data.current.preload()
+# Worker processes for the batch endpoint, forked before any thread starts
+# (see BatchComputePool): here for the development server, in each worker by
+# serve.py, which imports this module in its master
+batch_compute_pool = BatchComputePool(config.BATCH_WORKERS, config)
+if __name__ == '__main__':
+    batch_compute_pool.start(reference_data.current)
+if config.REFERENCE_WATCH_INTERVAL > 0:
+    reference_data.start_watcher(config.REFERENCE_WATCH_INTERVAL)
+
+
+def get_reference_registry():
+    # Pin one registry per request so a reload mid-request cannot mix versions
+    if 'reference_registry' not in g:
+        g.reference_registry = reference_data.current
+    return g.reference_registry
+
+
+def get_reference_lookup(col):
+    # Reference - Lookups.csv table for one lookup column
+    return get_reference_registry().get(LOOKUP_PREFIX + col)
+
+
+@app.after_request
+def add_reference_version_header(response):
+    # Every response that read reference data states which version it used
+    registry = g.get('reference_registry')
+    if registry is not None:
+        response.headers['X-Reference-Version'] = registry.version
+    return response
+
+
+# Served by /metrics; see record_compute_metrics() for the compute counters.
+# Every series is labelled with the process id of the worker it comes from
+metrics = Metrics(process_label='pid')
+metrics.histogram('http_request_duration_seconds', 'Request latency by route, up to the response body',
+                  ('method', 'route', 'status'))
+metrics.histogram('ghg_compute_stage_duration_seconds', 'compute_ghg_emissions time per stage', ('stage',))
+metrics.counter('ghg_compute_rows_total', 'Activity rows calculated by compute_ghg_emissions')
+metrics.counter('ghg_factor_cache_lookups_total', 'Emission factor set lookups by memo hit or miss', ('result',))
+metrics.counter('ghg_factor_lookups_total', 'Emission factor lookups by whether a factor was found', ('result',))
+metrics.counter('ghg_zero_emission_rows_total', 'Activity rows without emissions because no factor applies',
+                ('reason',))
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def observe_request_latency(response):
+    start = g.get('request_start')
+    if start is not None:
+        # Route patterns, not paths, so ids do not create a series each
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - start,
+                        method=request.method, route=route, status=response.status_code)
+    return response
+
+
+# Stacks of the threads serving requests, sampled while the profiler runs (see /api/admin/profiler)
+sampling_profiler = SamplingProfiler(config.PROFILER_INTERVAL, config.PROFILER_MAX_STACKS)
+if config.PROFILER_ENABLED:
+    sampling_profiler.start()
+# Last profiler request applied here: whether it should run, and a counter
+# bumped by every clear (see request_profiler())
+profiler_control = {'running': config.PROFILER_ENABLED, 'generation': 0}
+
+
+@app.before_request
+def mark_profiled_thread():
+    sampling_profiler.enter()
+
+
+@app.teardown_request
+def unmark_profiled_thread(exception=None):
+    sampling_profiler.leave()
+
+
+def record_compute_metrics(stats, rows):
+    """Add one calculation's stage timings and lookup counts (SupplierEmissionsCalculator stats) to metrics."""
+    for stage, seconds in stats.get('stages', {}).items():
+        metrics.observe('ghg_compute_stage_duration_seconds', seconds, stage=stage)
+    metrics.inc('ghg_compute_rows_total', rows)
+    metrics.inc('ghg_factor_cache_lookups_total', stats.get('factor_cache_hits', 0), result='hit')
+    metrics.inc('ghg_factor_cache_lookups_total', stats.get('factor_cache_misses', 0), result='miss')
+    factors_not_found = stats.get('factors_not_found', 0)
+    metrics.inc('ghg_factor_lookups_total', stats.get('factor_cache_hits', 0) + stats.get('factor_cache_misses', 0)
+                - factors_not_found, result='found')
+    metrics.inc('ghg_factor_lookups_total', factors_not_found, result='not_found')
+    metrics.inc('ghg_zero_emission_rows_total', factors_not_found, reason='no_factor')
+    metrics.inc('ghg_zero_emission_rows_total', stats.get('rows_without_factor_key', 0), reason='missing_fields')
+
+
+def is_admin_request():
+    # Fails closed: without a configured token only the development opt-out opens it
+    if not config.ADMIN_TOKEN:
+        return config.ADMIN_ALLOW_UNAUTHENTICATED
+    return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), config.ADMIN_TOKEN)
+
+
+def accepted_encodings():
+    """Content-Encodings the client accepts (quality > 0)."""
+    return [encoding for encoding, quality in request.accept_encodings if quality > 0]
+
+
+# Compression of responses built per request (precomputed ones are compressed at load time)
+response_compression = ResponseCompression(
+    config.COMPRESS_MIN_BYTES, config.COMPRESS_GZIP_LEVEL, config.COMPRESS_BROTLI_QUALITY)
+
+
+def encode_json(payload):
+    """
+    Serialize payload and compress it with the best encoding the client accepts.
+
+    Returns:
+        tuple: (body, content_encoding); content_encoding is None for an uncompressed body
+    """
+    body = app.json.dumps(payload, separators=(',', ':')).encode() + b'\n'
+    content_encoding = response_compression.choose(accepted_encodings(), len(body))
+    if content_encoding:
+        body = response_compression.compress(body, content_encoding)
+    return body, content_encoding
+
+
+def encoded_json_response(body, content_encoding):
+    """JSON response from an encode_json() result."""
+    response = Response(body, mimetype='application/json')
+    if content_encoding:
+        response.headers['Content-Encoding'] = content_encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def compressed_json_response(payload):
+    """JSON response compressed with the best encoding the client accepts (see ResponseCompression)."""
+    return encoded_json_response(*encode_json(payload))
+
+
+def precomputed_response(name, table='lookup_responses'):
+    """
+    Serve a pre-serialized dropdown response (see LookupResponses).
+
+    The ETag is the reference data version plus the response name (and
+    encoding), so it changes exactly when a reload swaps in new data;
+    requests with a matching If-None-Match get 304 without a body. Large
+    bodies are sent precompressed when the client accepts the encoding.
+    """
+    registry = get_reference_registry()
+    body, content_encoding = registry.get(table).get_encoded(name, accepted_encodings())
+    response = Response(body, mimetype='application/json')
+    etag = f'{registry.version}-{name.replace("/", "-")}'
+    if content_encoding:
+        response.headers['Content-Encoding'] = content_encoding
+        etag += f'-{content_encoding}'
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = f'public, max-age={config.LOOKUP_CACHE_MAX_AGE}'
+    return response.make_conditional(request)
+
+
+@app.route('/api/reference_data', methods=['GET'])
+def get_reference_data_status():
+    return jsonify(reference_data.status())
+
+
+@app.route('/api/admin/reload_reference_data', methods=['POST'])
+def reload_reference_data():
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    wait = request.args.get('wait', '').lower() in ('1', 'true', 'yes')
+    reload_status = reference_data.reload(wait=wait)
+    return jsonify({
+        'reload': reload_status,
+        'version': reference_data.current.version
+    }), 200 if wait else 202
+
 # API endpoint for Reference_Unit_Conversion
 
 
+# --- API endpoint: bootstrap ---
+@app.route('/api/bootstrap', methods=['GET'])
+def get_bootstrap():
+    """Every dropdown catalog of the SupplierData page and the reference version, in one response."""
+    try:
+        return precomputed_response('bootstrap', table='bootstrap_response')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # --- API endpoints for Reference - Lookups.csv ---
 @app.route('/api/lookup/<lookup_name>', methods=['GET'])
 def get_lookup_values(lookup_name):
-    lookup_map = {
-        'region': 'Region',
-        'mode_of_transport': 'Mode of Transport',
-        'type_of_activity_data': 'Type of Activity Data',
-        'scope': 'Scope',
-        'units': 'Units ',
-        'ipcc_gwp_version': 'IPCC GWP Version',
-        'activity_data_columns': 'Activity Data Columns',
-        'unit_of_fuel_amount': 'Unit of Fuel Amount',
-    }
-    col = lookup_map.get(lookup_name.lower())
-    if not col or col not in reference_lookups:
+    name = lookup_name.lower()
+    if name not in config.LOOKUP_NAMES:
         return jsonify({'error': f'Unknown lookup: {lookup_name}'}), 404
-    values = reference_lookups[col].get_all()
-    return jsonify({'lookup': lookup_name, 'values': values})
+    return precomputed_response(f'lookup/{name}')
 
 # Explicit endpoint for Scope lookup (optional, for clarity)
 
 
 @app.route('/api/lookup/scope', methods=['GET'])
 def get_scope_lookup():
-    values = reference_lookups['Scope'].get_all()
-    return jsonify({'lookup': 'scope', 'values': values})
+    return precomputed_response('lookup/scope')
 
 # Explicit endpoint for Unit of Fuel Amount lookup (optional, for clarity)
 
 
 @app.route('/api/lookup/unit_of_fuel_amount', methods=['GET'])
 def get_unit_of_fuel_amount_lookup():
-    values = reference_lookups['Unit of Fuel Amount'].get_all()
-    return jsonify({'lookup': 'unit_of_fuel_amount', 'values': values})
+    return precomputed_response('lookup/unit_of_fuel_amount')
 
 
 @app.route('/api/lookup/<lookup_name>/value', methods=['GET'])
 def get_lookup_by_value(lookup_name):
     from flask import request
     value = request.args.get('value', '')
-    lookup_map = {
-        'region': 'Region',
-        'mode_of_transport': 'Mode of Transport',
-        'type_of_activity_data': 'Type of Activity Data',
-        'scope': 'Scope',
-        'units': 'Units ',
-        'ipcc_gwp_version': 'IPCC GWP Version',
-        'activity_data_columns': 'Activity Data Columns',
-        'unit_of_fuel_amount': 'Unit of Fuel Amount',
-    }
-    col = lookup_map.get(lookup_name.lower())
-    if not col or col not in reference_lookups:
+    col = config.LOOKUP_NAMES.get(lookup_name.lower())
+    if not col or LOOKUP_PREFIX + col not in get_reference_registry():
         return jsonify({'error': f'Unknown lookup: {lookup_name}'}), 404
     if not value:
         return jsonify({'error': 'Missing value parameter'}), 400
-    results = reference_lookups[col].get_by_value(value)
+    results = get_reference_lookup(col).get_by_value(value)
     return jsonify({'lookup': lookup_name, 'value': value, 'results': results})
 
 
-# Initialize Reference_Unit_Conversion instance (load once at startup)
-unit_conversion_csv_path = config.get_csv_path('unit_conversion')
-reference_unit_conversion = Reference_Unit_Conversion(unit_conversion_csv_path)
-
 # API endpoint for Reference_Unit_Conversion
 
 
@@ -128,16 +307,12 @@ def get_unit_conversion():
     to_unit = request.args.get('to_unit', '')
     if not from_unit or not to_unit:
         return jsonify({'error': 'Both from_unit and to_unit query parameters are required'}), 400
-    value = reference_unit_conversion.get_conversion(from_unit, to_unit)
+    value = get_reference_registry().get('unit_conversion').get_conversion(from_unit, to_unit)
     if value is None or value == '':
         return jsonify({'error': f'No conversion value found for from_unit: {from_unit}, to_unit: {to_unit}'}), 404
     return jsonify({'from_unit': from_unit, 'to_unit': to_unit, 'value': value})
 
 
-# Initialize Reference_EF_Fuel_Use_CO2 instance (load once at startup)
-ef_fuel_use_co2_csv_path = config.get_csv_path('ef_fuel_use_co2')
-reference_ef_fuel_use_co2 = Reference_EF_Fuel_Use_CO2(ef_fuel_use_co2_csv_path)
-
 # API endpoint for Reference_EF_Fuel_Use_CO2
 
 
@@ -148,17 +323,12 @@ def get_ef_fuel_use_co2_by_fuel_and_region():
     region = request.args.get('region', '')
     if not fuel or not region:
         return jsonify({'error': 'Both fuel and region query parameters are required'}), 400
-    results = reference_ef_fuel_use_co2.get_by_fuel_and_region(fuel, region)
+    results = get_reference_registry().get('ef_fuel_use_co2').get_by_fuel_and_region(fuel, region)
     if not results:
         return jsonify({'error': f'No data found for fuel: {fuel}, region: {region}'}), 404
     return jsonify({'results': results})
 
 
-# Initialize Reference_EF_Fuel_Use_CH4_N2O instance (load once at startup)
-ef_fuel_use_ch4_n2o_csv_path = config.get_csv_path('ef_fuel_use_ch4_n2o')
-reference_ef_fuel_use_ch4_n2o = Reference_EF_Fuel_Use_CH4_N2O(
-    ef_fuel_use_ch4_n2o_csv_path)
-
 # API endpoint for Reference_EF_Fuel_Use_CH4_N2O
 
 
@@ -169,17 +339,13 @@ def get_ef_fuel_use_ch4_n2o_by_transport_and_region():
     region = request.args.get('region', '')
     if not transport_and_fuel or not region:
         return jsonify({'error': 'Both transport_and_fuel and region query parameters are required'}), 400
-    results = reference_ef_fuel_use_ch4_n2o.get_by_transport_and_region(
+    results = get_reference_registry().get('ef_fuel_use_ch4_n2o').get_by_transport_and_region(
         transport_and_fuel, region)
     if not results:
         return jsonify({'error': f'No data found for transport_and_fuel: {transport_and_fuel}, region: {region}'}), 404
     return jsonify({'results': results})
 
 
-# Initialize Reference_EF_Road instance (load once at startup)
-ef_road_csv_path = config.get_csv_path('ef_road')
-reference_ef_road = Reference_EF_Road(ef_road_csv_path)
-
 # API endpoint for Reference_EF_Road
 
 
@@ -190,27 +356,13 @@ def get_ef_road_by_vehicle_and_region():
     region = request.args.get('region', '')
     if not vehicle_fuel_year or not region:
         return jsonify({'error': 'Both vehicle_fuel_year and region query parameters are required'}), 400
-    results = reference_ef_road.get_by_vehicle_and_region(
+    results = get_reference_registry().get('ef_road').get_by_vehicle_and_region(
         vehicle_fuel_year, region)
     if not results:
         return jsonify({'error': f'No data found for vehicle_fuel_year: {vehicle_fuel_year}, region: {region}'}), 404
     return jsonify({'results': results})
 
 
-# Initialize Reference_EF_Public instance (load once at startup)
-ef_csv_path = config.get_csv_path('ef_public')
-reference_ef = Reference_EF_Public(ef_csv_path)
-
-
-# Initialize Reference_EF_Freight_CO2 instance (load once at startup)
-ef_freight_csv_path = config.get_csv_path('ef_freight_co2')
-reference_ef_freight = Reference_EF_Freight_CO2(ef_freight_csv_path)
-
-# Initialize Reference_EF_Freight_CH4_NO2 instance (load once at startup)
-ef_freight_ch4_no2_csv_path = config.get_csv_path('ef_freight_ch4_no2')
-reference_ef_freight_ch4_no2 = Reference_EF_Freight_CH4_NO2(
-    ef_freight_ch4_no2_csv_path)
-
 # API endpoint for Reference_EF_Freight_CH4_NO2
 
 
@@ -221,7 +373,7 @@ def get_ef_freight_ch4_no2_by_vehicle_and_region():
     region = request.args.get('region', '')
     if not vehicle_type or not region:
         return jsonify({'error': 'Both vehicle_type and region query parameters are required'}), 400
-    results = reference_ef_freight_ch4_no2.get_by_vehicle_and_region(
+    results = get_reference_registry().get('ef_freight_ch4_no2').get_by_vehicle_and_region(
         vehicle_type, region)
     if not results:
         return jsonify({'error': f'No data found for vehicle_type: {vehicle_type}, region: {region}'}), 404
@@ -237,7 +389,7 @@ def get_ef_freight_co2_by_vehicle_and_region():
     region = request.args.get('region', '')
     if not vehicle_size or not region:
         return jsonify({'error': 'Both vehicle_size and region query parameters are required'}), 400
-    results = reference_ef_freight.get_by_vehicle_and_region(
+    results = get_reference_registry().get('ef_freight_co2').get_by_vehicle_and_region(
         vehicle_size, region)
     if not results:
         return jsonify({'error': f'No data found for vehicle_size: {vehicle_size}, region: {region}'}), 404
@@ -251,7 +403,7 @@ def get_ef_by_vehicle_and_region():
     region = request.args.get('region', '')
     if not vehicle_type or not region:
         return jsonify({'error': 'Both vehicle_type and region query parameters are required'}), 400
-    results = reference_ef.get_by_vehicle_and_region(vehicle_type, region)
+    results = get_reference_registry().get('ef_public').get_by_vehicle_and_region(vehicle_type, region)
     if not results:
         return jsonify({'error': f'No data found for vehicle_type: {vehicle_type}, region: {region}'}), 404
     return jsonify({'results': results})
@@ -264,32 +416,28 @@ def home():
 
 @app.route('/api/suppliers', methods=['GET'])
 def get_suppliers():
-    suppliers = []
-    csv_path = config.get_csv_path('supplier_list')
-
     try:
-        with open(csv_path, 'r', encoding='utf-8-sig') as file:
-            csv_reader = csv.reader(file)
-            # Skip header row
-            header = next(csv_reader)
-
-            for row in csv_reader:
-                if row:  # Check if row is not empty
-                    # Remove quotes and trim whitespace
-                    supplier = row[0].strip('"').strip()
-                    suppliers.append(supplier)
-
-        result = {'suppliers': suppliers}
-        return jsonify(result)
+        if 'q' not in request.args and 'limit' not in request.args and 'offset' not in request.args:
+            # Whole supplier catalog, serialized at load time
+            return precomputed_response('suppliers')
+
+        # Typeahead search: ?q=amc&limit=20&offset=0
+        query = request.args.get('q', '')
+        try:
+            limit = int(request.args.get('limit', config.SUPPLIER_SEARCH_LIMIT))
+            offset = int(request.args.get('offset', 0))
+        except ValueError:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+        limit = max(1, min(limit, config.SUPPLIER_SEARCH_MAX_LIMIT))
+        offset = max(0, offset)
+
+        suppliers, has_more = get_reference_registry().get('supplier_catalog').search(query, limit, offset)
+        return jsonify({'suppliers': suppliers, 'q': query, 'limit': limit, 'offset': offset,
+                        'has_more': has_more})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-# --- Load Reference_Source_Product_Matrix at startup ---
-source_product_matrix_csv_path = config.get_csv_path('source_product_matrix')
-reference_source_product_matrix = Reference_Source_Product_Matrix(
-    source_product_matrix_csv_path)
-
 # --- API endpoint: source_product_matrix ---
 
 
@@ -301,7 +449,7 @@ def get_source_product_matrix():
     if not supplier or not product or not location:
         return jsonify({'error': 'Missing supplier, product, or location parameter'}), 400
     supplier_product_location = f"{supplier} - {product} - {location}"
-    results = reference_source_product_matrix.filter_by_supplier_product_location(
+    results = get_reference_registry().get('source_product_matrix').filter_by_supplier_product_location(
         supplier_product_location)
     return jsonify({'results': results})
 
@@ -318,45 +466,12 @@ def get_vehicle_and_size_by_region_and_mode():
     if not region or not mode_of_transport:
         return jsonify({'error': 'Both region and mode_of_transport query parameters are required'}), 400
 
-    # Determine which data source to use based on type_of_activity_data
-    matches = []
-    data_source = 'Reference_EF_Freight_CO2'  # Default data source
-
-    if type_of_activity_data == 'Weight Distance (e.g. Freight Transport)':
-        # Use Reference_EF_Freight_CO2.csv for freight transport - apply all filters
-        for row in reference_ef_freight.data:
-            if (row.get('Region', '').strip().lower() == region.strip().lower() and
-                row.get('Mode of Transport', '').strip().lower() == mode_of_transport.strip().lower() and
-                    row.get('Vehicle and Size')):
-                matches.append(row['Vehicle and Size'])
-        data_source = 'Reference_EF_Freight_CO2'
-    elif type_of_activity_data == 'Fuel Use':
-        # For fuel use activities, still use freight data but could be filtered differently
-        for row in reference_ef_freight.data:
-            if (row.get('Region', '').strip().lower() == region.strip().lower() and
-                row.get('Mode of Transport', '').strip().lower() == mode_of_transport.strip().lower() and
-                    row.get('Vehicle and Size')):
-                matches.append(row['Vehicle and Size'])
-        data_source = 'Reference_EF_Freight_CO2'
-    elif type_of_activity_data == 'Fuel Use and Vehicle Distance':
-        # For combined fuel use and vehicle distance
-        for row in reference_ef_freight.data:
-            if (row.get('Region', '').strip().lower() == region.strip().lower() and
-                row.get('Mode of Transport', '').strip().lower() == mode_of_transport.strip().lower() and
-                    row.get('Vehicle and Size')):
-                matches.append(row['Vehicle and Size'])
-        data_source = 'Reference_EF_Freight_CO2'
-    else:
-        # Default: use Reference_EF_Freight_CO2 with all filters applied
-        for row in reference_ef_freight.data:
-            if (row.get('Region', '').strip().lower() == region.strip().lower() and
-                row.get('Mode of Transport', '').strip().lower() == mode_of_transport.strip().lower() and
-                    row.get('Vehicle and Size')):
-                matches.append(row['Vehicle and Size'])
-        data_source = 'Reference_EF_Freight_CO2'
-
-    # Return unique values, sorted
-    unique_vehicle_and_size = sorted(list(set(matches)))
+    # Every activity type lists the vehicles of Reference_EF_Freight_CO2; the
+    # answer for each (region, mode of transport) is built at load time
+    unique_vehicle_and_size = get_reference_registry().get(FACET_PREFIX + 'ef_freight_co2').query(
+        'Vehicle and Size', {'Region': region, 'Mode of Transport': mode_of_transport})
+    data_source = 'Reference_EF_Freight_CO2'
+
     return jsonify({
         'region': region,
         'mode_of_transport': mode_of_transport,
@@ -366,268 +481,374 @@ def get_vehicle_and_size_by_region_and_mode():
         'total_matches': len(unique_vehicle_and_size)
     })
 
+
+# --- API endpoint: facets ---
+@app.route('/api/facets', methods=['GET'])
+def get_facets():
+    """
+    Distinct values of one column of a reference table, filtered by other columns.
+
+    /api/facets?table=ef_freight_co2&field=Vehicle and Size&Region=US&Mode of Transport=Road
+    Every query parameter other than table and field is a column filter,
+    matched case- and whitespace-insensitively.
+    """
+    table = request.args.get('table', '')
+    field = request.args.get('field', '')
+    if not table or not field:
+        return jsonify({'error': 'Both table and field query parameters are required'}), 400
+    if table not in config.FACET_TABLES:
+        return jsonify({'error': f'Unknown table: {table}', 'tables': config.FACET_TABLES}), 404
+
+    filters = {column: value for column, value in request.args.items() if column not in ('table', 'field')}
+    facet_index = get_reference_registry().get(FACET_PREFIX + table)
+    try:
+        values = facet_index.query(field, filters)
+    except KeyError as e:
+        return jsonify({'error': e.args[0], 'columns': facet_index.columns}), 400
+    return jsonify({'table': table, 'field': field, 'filters': filters, 'values': values,
+                    'total_matches': len(values)})
+
+
 # API endpoint to get unique fuel types
 
 
 @app.route('/api/fuel_types', methods=['GET'])
 def get_fuel_types():
     try:
-        # Get unique fuel types from reference_ef_fuel_use_co2
-        fuel_types = sorted(list(set([
-            row.get('Fuel', '')
-            for row in reference_ef_fuel_use_co2.data
-            if row.get('Fuel', '').strip()
-        ])))
-        return jsonify({'fuel_types': fuel_types})
+        # Unique fuel types from reference_ef_fuel_use_co2, serialized at load time
+        return precomputed_response('fuel_types')
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve fuel types'}), 500
 
 
+# Responses of /api/compute_ghg_emissions, dropped whenever a reload swaps the reference data
+result_cache = ResultCache(config.RESULT_CACHE_MAX_ENTRIES, config.RESULT_CACHE_MAX_BYTES, config.RESULT_CACHE_TTL)
+reference_data.add_swap_listener(lambda registry: result_cache.clear())
+
+
 # --- API endpoint: compute_ghg_emissions ---
 @app.route('/api/compute_ghg_emissions', methods=['POST'])
 def compute_ghg_emissions():
     try:
+        # Reference data version used for the whole request, even if a reload swaps it meanwhile
+        registry = get_reference_registry()
+
+        parse_start = time.perf_counter()
         data = request.get_json()
         if not data:
             return jsonify({'error': 'Missing JSON body'}), 400
+        metrics.observe('ghg_compute_stage_duration_seconds', time.perf_counter() - parse_start, stage='parse')
 
         # Extract supplier data
         supplier_data = data.get('supplier_data', {})
         activity_rows = data.get('activity_rows', [])
 
-        # Process each activity row
-        supplier_input_objects = []
-        for i, row_data in enumerate(activity_rows):
-            # Create Supplier_Input object for this row
-            supplier_input = Supplier_Input(
-                Supplier_and_Container=supplier_data.get(
-                    'Supplier_and_Container', ''),
-                Container_Weight=float(
-                    supplier_data.get('Container_Weight', 0)),
-                Number_Of_Containers=int(
-                    supplier_data.get('Number_Of_Containers', 0)),
-                Source_Description=row_data.get('Source_Description', ''),
-                Region=row_data.get('Region', ''),
-                Mode_of_Transport=row_data.get('Mode_of_Transport', ''),
-                Scope=row_data.get('Scope', ''),
-                Type_Of_Activity_Data=row_data.get(
-                    'Type_Of_Activity_Data', ''),
-                Vehicle_Type=row_data.get('Vehicle_Type'),
-                Distance_Travelled=float(row_data['Distance_Travelled']) if row_data.get(
-                    'Distance_Travelled') is not None else None,
-                Total_Weight_Of_Freight_InTonne=float(row_data['Total_Weight_Of_Freight_InTonne']) if row_data.get(
-                    'Total_Weight_Of_Freight_InTonne') is not None else None,
-                Num_Of_Passenger=int(row_data['Num_Of_Passenger']) if row_data.get(
-                    'Num_Of_Passenger') is not None else None,
-                Units_of_Measurement=row_data.get('Units_of_Measurement'),
-                Fuel_Used=row_data.get('Fuel_Used'),
-                Fuel_Amount=float(row_data['Fuel_Amount']) if row_data.get(
-                    'Fuel_Amount') is not None else None,
-                Unit_Of_Fuel_Amount=row_data.get('Unit_Of_Fuel_Amount')
-            )
-
-            supplier_input_objects.append(supplier_input)
-
-        # Calculate CO2 emissions using Co2FossilFuelCalculator with cached reference data
-        co2_calculator = Co2FossilFuelCalculator(
-            reference_ef_fuel_use_co2=reference_ef_fuel_use_co2,
-            reference_ef_freight_co2=reference_ef_freight,
-            reference_unit_conversion=reference_unit_conversion
-        )
-
-        co2_results = co2_calculator.calculate_co2_emissions(
-            supplier_input_objects)
-
-        # Calculate CH4 emissions using Ch4Calculator with cached reference data
-        ch4_calculator = Ch4Calculator(
-            reference_ef_fuel_use_ch4_n2o=reference_ef_fuel_use_ch4_n2o,
-            reference_ef_freight_co2=reference_ef_freight,
-            reference_unit_conversion=reference_unit_conversion
-        )
-
-        ch4_results = ch4_calculator.calculate_ch4_emissions(
-            supplier_input_objects)
-
-        # Create summarized data by Mode of Transport, Scope, Activity type, and GHG Type
-        summary_data = {}
-
-        # Initialize summary structure
-        for i, row_data in enumerate(activity_rows):
-            mode_of_transport = row_data.get('Mode_of_Transport', 'Unknown')
-            scope = row_data.get('Scope', 'Unknown')
-            activity_type = 'Fuel' if row_data.get(
-                'Fuel_Used') and row_data.get('Fuel_Amount') else 'Distance'
-
-            # Initialize nested structure if not exists
-            if mode_of_transport not in summary_data:
-                summary_data[mode_of_transport] = {}
-            if scope not in summary_data[mode_of_transport]:
-                summary_data[mode_of_transport][scope] = {}
-            if activity_type not in summary_data[mode_of_transport][scope]:
-                summary_data[mode_of_transport][scope][activity_type] = {}
-            if 'CO2' not in summary_data[mode_of_transport][scope][activity_type]:
-                summary_data[mode_of_transport][scope][activity_type]['CO2'] = {
-                    'total_emissions': 0.0,
-                    'details': []
-                }
-            if 'CH4' not in summary_data[mode_of_transport][scope][activity_type]:
-                summary_data[mode_of_transport][scope][activity_type]['CH4'] = {
-                    'total_emissions': 0.0,
-                    'details': []
-                }
-
-        # Aggregate the results into summary structure
-        for i, result in enumerate(co2_results):
-            if i < len(activity_rows):
-                row_data = activity_rows[i]
-                mode_of_transport = row_data.get(
-                    'Mode_of_Transport', 'Unknown')
-                scope = row_data.get('Scope', 'Unknown')
-                activity_type = 'Fuel' if row_data.get(
-                    'Fuel_Used') and row_data.get('Fuel_Amount') else 'Distance'
-
-                # Add CO2 emissions to the appropriate category
-                summary_data[mode_of_transport][scope][activity_type]['CO2']['total_emissions'] += result.get(
-                    'co2_emissions', 0.0)
-
-                # Add detailed information
-                detail = {
-                    'row_index': i,
-                    'source_description': row_data.get('Source_Description', ''),
-                    'vehicle_type': row_data.get('Vehicle_Type', ''),
-                    'region': row_data.get('Region', ''),
-                    'co2_emissions': result.get('co2_emissions', 0.0),
-                    'emission_factor': result.get('emission_factor', 0.0),
-                    'status': result.get('status', '')
-                }
-
-                if activity_type == 'Fuel':
-                    detail.update({
-                        'fuel_used': row_data.get('Fuel_Used', ''),
-                        'fuel_amount': row_data.get('Fuel_Amount', 0),
-                        'unit_of_fuel_amount': row_data.get('Unit_Of_Fuel_Amount', '')
-                    })
-                else:
-                    detail.update({
-                        'distance_travelled': row_data.get('Distance_Travelled', 0),
-                        'total_weight_of_freight': row_data.get('Total_Weight_Of_Freight_InTonne', 0),
-                        'units_of_measurement': row_data.get('Units_of_Measurement', '')
-                    })
-
-                summary_data[mode_of_transport][scope][activity_type]['CO2']['details'].append(
-                    detail)
-
-        # Aggregate the CH4 results into summary structure
-        for i, result in enumerate(ch4_results):
-            if i < len(activity_rows):
-                row_data = activity_rows[i]
-                mode_of_transport = row_data.get(
-                    'Mode_of_Transport', 'Unknown')
-                scope = row_data.get('Scope', 'Unknown')
-                activity_type = 'Fuel' if row_data.get(
-                    'Fuel_Used') and row_data.get('Fuel_Amount') else 'Distance'
-
-                # Add CH4 emissions to the appropriate category
-                summary_data[mode_of_transport][scope][activity_type]['CH4']['total_emissions'] += result.get(
-                    'ch4_emissions', 0.0)
-
-                # Add detailed information
-                detail = {
-                    'row_index': i,
-                    'source_description': row_data.get('Source_Description', ''),
-                    'vehicle_type': row_data.get('Vehicle_Type', ''),
-                    'region': row_data.get('Region', ''),
-                    'ch4_emissions': result.get('ch4_emissions', 0.0),
-                    'emission_factor': result.get('emission_factor', 0.0),
-                    'status': result.get('status', '')
-                }
-
-                if activity_type == 'Fuel':
-                    detail.update({
-                        'fuel_used': row_data.get('Fuel_Used', ''),
-                        'fuel_amount': row_data.get('Fuel_Amount', 0),
-                        'unit_of_fuel_amount': row_data.get('Unit_Of_Fuel_Amount', '')
-                    })
-                else:
-                    detail.update({
-                        'distance_travelled': row_data.get('Distance_Travelled', 0),
-                        'total_weight_of_freight': row_data.get('Total_Weight_Of_Freight_InTonne', 0),
-                        'units_of_measurement': row_data.get('Units_of_Measurement', '')
-                    })
-
-                summary_data[mode_of_transport][scope][activity_type]['CH4']['details'].append(
-                    detail)
-
-        # Calculate overall totals
-        total_co2_emissions = sum(result['co2_emissions']
-                                  for result in co2_results)
-        total_ch4_emissions = sum(result['ch4_emissions']
-                                  for result in ch4_results)
-
-        # Manufacturing emissions calculation (from supplier data)
-        container_weight = float(supplier_data.get('Container_Weight', 0))
-        number_of_containers = int(
-            supplier_data.get('Number_Of_Containers', 0))
-
-        # Get supplier emission factor from Reference_Source_Product_Matrix
-        supplier_and_container = supplier_data.get(
-            'Supplier_and_Container', '')
-        supplier_emission_factor = None
-
-        if supplier_and_container:
-            # Look up the emission factor using the Reference_Source_Product_Matrix
-            supplier_emission_factor = reference_source_product_matrix.get_manufacturing_emissions_factor(
-                supplier_and_container)
-
-        # If no emission factor found in matrix, try to get from supplied data or use default
-        if supplier_emission_factor is None:
-            supplier_emission_factor = float(
-                # Default fallback
-                supplier_data.get('Supplier_Emission_Factor', 0.5))
-            emission_factor_source = 'default/supplied'
-        else:
-            emission_factor_source = 'reference_matrix'
-
-        manufacturing_emissions = (container_weight * number_of_containers *
-                                   supplier_emission_factor) / 907184.74  # Convert to tonnes
-
-        manufacturing_emissions_metric_tonnes = manufacturing_emissions * \
-            (0.907185)  # Convert to Mertic tonnes
-
-        # Return comprehensive results including summarized data
-        return jsonify({
+        # ?explain=1 returns the lineage of every emission factor applied
+        explain = request.args.get('explain', '').lower() in ('1', 'true', 'yes')
+        trace = CalculationTrace() if explain else None
+
+        # ?profile=summary or compact-columnar skips building the per-row sections
+        profile = request.args.get('profile', config.COMPUTE_DEFAULT_PROFILE)
+        if profile not in SupplierEmissionsCalculator.PROFILES:
+            return jsonify({'error': f"Unknown profile '{profile}'; expected one of "
+                                     f"{', '.join(SupplierEmissionsCalculator.PROFILES)}"}), 400
+
+        # ?cprofile=1 (or a CallProfile sort key) profiles this request, bypassing the result cache
+        cprofile = request.args.get('cprofile', '').lower()
+        if cprofile:
+            if not config.COMPUTE_CPROFILE_ENABLED or not is_admin_request():
+                return jsonify({'error': 'cprofile is disabled; set COMPUTE_CPROFILE_ENABLED'}), 403
+            sort = 'cumulative' if cprofile in ('1', 'true', 'yes') else cprofile
+            if sort not in CallProfile.SORT_KEYS:
+                return jsonify({'error': f"Unknown cprofile sort '{sort}'; expected 1 or one of "
+                                         f"{', '.join(CallProfile.SORT_KEYS)}"}), 400
+            call_profile = CallProfile(config.COMPUTE_CPROFILE_TOP, sort)
+            report = call_profile.run(SupplierEmissionsCalculator(registry).calculate,
+                                      supplier_data, activity_rows, trace=trace, profile=profile)
+            # Serialization is profiled too; that body is discarded for one including the profile
+            call_profile.run(encode_json, report)
+            report['cprofile'] = call_profile.to_dict()
+            return compressed_json_response(report)
+
+        # Identical requests against the same reference version get the stored response bytes
+        cache_key = result_cache.key(data, registry.version, profile, explain,
+                                     response_compression.preferred(accepted_encodings()))
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            response = encoded_json_response(*cached)
+            response.headers['X-Result-Cache'] = 'hit'
+            return response
+
+        stats = {}
+        report = SupplierEmissionsCalculator(registry).calculate(
+            supplier_data, activity_rows, trace=trace, profile=profile, stats=stats)
+        serialize_start = time.perf_counter()
+        body, content_encoding = encode_json(report)
+        stats['stages']['serialization'] = time.perf_counter() - serialize_start
+        record_compute_metrics(stats, report['processed_rows'])
+        result_cache.put(cache_key, (body, content_encoding), len(body))
+        response = encoded_json_response(body, content_encoding)
+        response.headers['X-Result-Cache'] = 'miss'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# --- API endpoint: compute_ghg_emissions result cache counters ---
+@app.route('/api/compute_ghg_emissions/cache', methods=['GET'])
+def get_result_cache_stats():
+    return jsonify(result_cache.stats())
+
+
+
+# --- API endpoint: compute_ghg_emissions/batch ---
+@app.route('/api/compute_ghg_emissions/batch', methods=['POST'])
+def compute_ghg_emissions_batch():
+    try:
+        registry = get_reference_registry()
+
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Missing JSON body'}), 400
+
+        # Each entry has the same supplier_data / activity_rows shape as /api/compute_ghg_emissions
+        suppliers = data.get('suppliers')
+        if not isinstance(suppliers, list) or not suppliers:
+            return jsonify({'error': 'suppliers must be a non-empty list of supplier payloads'}), 400
+        if len(suppliers) > config.BATCH_MAX_SUPPLIERS:
+            return jsonify({'error': f'Batch of {len(suppliers)} suppliers exceeds the limit of '
+                                     f'{config.BATCH_MAX_SUPPLIERS}'}), 413
+
+        supplier_results = batch_compute_pool.map(registry, suppliers)
+
+        # Portfolio totals over the suppliers that computed successfully
+        portfolio_total = {
+            'suppliers': len(suppliers),
+            'failed_suppliers': 0,
+            'processed_rows': 0,
+            'manufacturing_emissions_metric_tonnes': 0.0,
+            'co2': 0.0,
+            'ch4': 0.0,
+            'n2o': 0.0,
+            'total_emissions': 0.0
+        }
+        results = []
+        for index, (payload, supplier_result) in enumerate(zip(suppliers, supplier_results)):
+            supplier_data = (payload.get('supplier_data') or {}) if isinstance(payload, dict) else {}
+            supplier_result['index'] = index
+            supplier_result['supplier_and_container'] = supplier_data.get(
+                'Supplier_and_Container', '')
+            results.append(supplier_result)
+
+            if supplier_result['status'] != 'success':
+                portfolio_total['failed_suppliers'] += 1
+                continue
+            report = supplier_result['result']
+            portfolio_total['processed_rows'] += report['processed_rows']
+            portfolio_total['manufacturing_emissions_metric_tonnes'] += \
+                report['manufacturing_details']['manufacturing_emissions_metric_tonnes']
+            for gas in ('co2', 'ch4', 'n2o'):
+                portfolio_total[gas] += report['transport_emissions'][gas]
+            portfolio_total['total_emissions'] += report['total_emissions']
+
+        return compressed_json_response({
             'status': 'success',
-            'supplier_data': supplier_data,
-            'processed_rows': len(supplier_input_objects),
-            'manufacturing_emissions': manufacturing_emissions,
-            'manufacturing_details': {
-                'supplier_emission_factor': supplier_emission_factor,
-                'emission_factor_source': emission_factor_source,
-                'container_weight': container_weight,
-                'number_of_containers': number_of_containers,
-                'total_material_weight_tonnes': (container_weight * number_of_containers) / 1000000,
-                'manufacturing_emissions_metric_tonnes': manufacturing_emissions_metric_tonnes
-            },
-            'transport_emissions': {
-                'co2': total_co2_emissions,
-                'ch4': total_ch4_emissions,
-                'summary_by_transport_scope_activity': summary_data,
-                'detailed_results': {
-                    'co2': co2_results,
-                    'ch4': ch4_results
-                }
-            },
-            'total_emissions': manufacturing_emissions_metric_tonnes + total_co2_emissions + total_ch4_emissions,
-            'co2_emissions_results': co2_results,  # Keep for backward compatibility
-            'ch4_emissions_results': ch4_results,  # Keep for backward compatibility
-            'total_co2_emissions': total_co2_emissions,  # Keep for backward compatibility
-            'total_ch4_emissions': total_ch4_emissions  # Keep for backward compatibility
+            'reference_version': registry.version,
+            'results': results,
+            'portfolio_total': portfolio_total
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+# --- API endpoint: compute_ghg_emissions/stream ---
+@app.route('/api/compute_ghg_emissions/stream', methods=['POST'])
+def compute_ghg_emissions_stream():
+    """
+    Streaming variant of /api/compute_ghg_emissions for very large activity lists.
+
+    The request body is NDJSON (an optional {"supplier_data": {...}} line,
+    then one activity row per line) and is read incrementally; the response
+    is NDJSON with one record per row and a final summary record.
+    """
+    registry = get_reference_registry()
+    calculator = StreamingEmissionsCalculator(registry, config.STREAM_CHUNK_ROWS)
+    # Read the body line by line instead of buffering it for get_json()
+    lines = request.stream
+
+    def generate():
+        try:
+            for records in calculator.iter_chunks(lines):
+                yield ''.join(json.dumps(record) + '\n' for record in records)
+        except Exception as e:
+            # The status line has already been sent; end the stream with an error record
+            app.logger.exception("Streaming compute failed")
+            yield json.dumps({'type': 'summary', 'status': 'error', 'error': str(e)}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def get_upload_results_path(upload_id):
+    return os.path.join(config.UPLOAD_RESULTS_DIR, f'{upload_id}.csv')
+
+
+def remove_expired_upload_results():
+    """Delete results files older than UPLOAD_RESULTS_TTL."""
+    expires_before = time.time() - config.UPLOAD_RESULTS_TTL
+    for entry in os.scandir(config.UPLOAD_RESULTS_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < expires_before:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+# --- API endpoint: uploads ---
+@app.route('/api/uploads', methods=['POST'])
+def upload_activity_file():
+    """
+    Calculate an uploaded CSV or XLSX file of activity rows.
+
+    Multipart form with the file in 'file' and optional Supplier_and_Container,
+    Container_Weight, Number_Of_Containers and Supplier_Emission_Factor fields.
+    Returns the summary and the download URL of the results CSV.
+    """
+    try:
+        # Reads the whole body, which UploadLimitedRequest stops at UPLOAD_MAX_BYTES
+        upload = request.files.get('file')
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Upload exceeds the limit of {config.UPLOAD_MAX_BYTES} bytes'}), 413
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'Missing file'}), 400
+    file_format = UploadEmissionsCalculator.detect_format(upload.filename)
+    if file_format is None:
+        return jsonify({'error': 'Unsupported file type, expected .csv or .xlsx'}), 400
+
+    supplier_data = {key: request.form[key] for key in
+                     ('Supplier_and_Container', 'Container_Weight', 'Number_Of_Containers',
+                      'Supplier_Emission_Factor') if request.form.get(key)}
+
+    os.makedirs(config.UPLOAD_RESULTS_DIR, exist_ok=True)
+    remove_expired_upload_results()
+    upload_id = uuid.uuid4().hex
+    results_path = get_upload_results_path(upload_id)
+    partial_path = results_path + '.part'
+    try:
+        calculator = UploadEmissionsCalculator(get_reference_registry(), config.STREAM_CHUNK_ROWS)
+        # Werkzeug spools large uploads to a temporary file, so upload.stream is read from disk
+        summary = calculator.calculate(upload.stream, file_format, partial_path, supplier_data)
+        os.replace(partial_path, results_path)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        app.logger.exception("Upload calculation failed")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    summary['upload_id'] = upload_id
+    summary['filename'] = upload.filename
+    summary['results_url'] = f'/api/uploads/{upload_id}/results'
+    return jsonify(summary)
+
+
+@app.route('/api/uploads/<upload_id>/results', methods=['GET'])
+def download_upload_results(upload_id):
+    # Upload ids are uuid4 hex strings; anything else cannot name a results file
+    if not upload_id.isalnum() or not os.path.isfile(get_upload_results_path(upload_id)):
+        return jsonify({'error': 'Results not found or expired'}), 404
+    return send_file(get_upload_results_path(upload_id), mimetype='text/csv', as_attachment=True,
+                     download_name=f'ghg_emissions_results_{upload_id}.csv')
+
+
+# Long-running computations: jobs live in a SQLite file so any worker process can report them
+job_store = JobStore(config.JOB_STORE_PATH)
+job_runner = JobRunner(job_store, config.JOB_WORKERS)
+# Jobs run on threads of the process that accepted them. Those left unfinished
+# by processes that exited are failed when a server starts (below and in
+# serve.py) and when a serve.py worker exits, never on import: other processes
+# using the same store may still be computing theirs
+
+
+def job_status(job):
+    """Status body of a job, with progress and, once succeeded, the result URL."""
+    job = dict(job)
+    job['progress'] = round(job['rows_done'] / job['rows_total'], 4) if job['rows_total'] else \
+        (1.0 if job['status'] == 'succeeded' else 0.0)
+    if job['finished_at'] is not None:
+        job['expires_at'] = job['finished_at'] + config.JOB_RESULT_TTL
+    if job['status'] == 'succeeded':
+        job['result_url'] = f"/api/jobs/{job['job_id']}/result"
+    return job
+
+
+# --- API endpoint: jobs ---
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue a computation; the body is the same as for /api/compute_ghg_emissions.
+
+    Returns 202 with the job id and the URL to poll for progress and the result.
+    """
+    try:
+        registry = get_reference_registry()
+
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Missing JSON body'}), 400
+        activity_rows = data.get('activity_rows', [])
+        if not isinstance(activity_rows, list):
+            return jsonify({'error': 'activity_rows must be a list'}), 400
+
+        profile = request.args.get('profile', config.COMPUTE_DEFAULT_PROFILE)
+        if profile not in SupplierEmissionsCalculator.PROFILES:
+            return jsonify({'error': f"Unknown profile '{profile}'; expected one of "
+                                     f"{', '.join(SupplierEmissionsCalculator.PROFILES)}"}), 400
+
+        job_store.remove_expired(config.JOB_RESULT_TTL, config.JOB_UNFINISHED_TTL)
+        job_id = job_store.create(request.get_data(), len(activity_rows), profile, registry.version)
+        job_runner.submit(job_id, registry, profile)
+        return jsonify(dict(job_status(job_store.get(job_id)), status_url=f'/api/jobs/{job_id}')), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status and progress (rows done of rows total); includes the result once succeeded."""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    body = job_status(job)
+    if job['status'] == 'succeeded' and request.args.get('include_result', '1').lower() not in ('0', 'false', 'no'):
+        body['result'] = json.loads(job_store.get_result(job_id))
+    return compressed_json_response(body)
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Stored result bytes of a succeeded job."""
+    job = job_store.get(job_id)
+    if job is None or job['status'] != 'succeeded':
+        return jsonify({'error': 'Result not found, not ready or expired'}), 404
+    body = job_store.get_result(job_id)
+    content_encoding = response_compression.choose(accepted_encodings(), len(body))
+    if content_encoding:
+        body = response_compression.compress(body, content_encoding)
+    return encoded_json_response(body, content_encoding)
+
+
 # Contact Admin endpoint
+# Outbound mail of /api/contact-admin, delivered by a background thread
+mail_queue = MailQueue(
+    config.SMTP_HOST, config.SMTP_PORT, config.MAIL_SENDER, config.MAIL_PASSWORD,
+    starttls=config.SMTP_STARTTLS, timeout=config.SMTP_TIMEOUT, batch_size=config.MAIL_BATCH_SIZE,
+    max_retries=config.MAIL_MAX_RETRIES, backoff_seconds=config.MAIL_RETRY_BACKOFF,
+    max_backoff_seconds=config.MAIL_RETRY_MAX_BACKOFF, idle_timeout=config.SMTP_IDLE_TIMEOUT,
+    max_queued=config.MAIL_QUEUE_MAX)
+
+
 @app.route('/api/contact-admin', methods=['POST'])
 def contact_admin():
     try:
@@ -640,12 +861,11 @@ def contact_admin():
             if not data.get(field):
                 return jsonify({'error': f'{field} is required'}), 400
 
-        # Email configuration (you should move these to environment variables)
-        admin_email = "mohan.ganadal@gmail.com"  # Updated to send to Mohan's email
-        smtp_server = "smtp.gmail.com"  # Gmail SMTP server
-        smtp_port = 587
-        system_email = "saxco.calculator@gmail.com"  # System Gmail address for sending
-        sender_password = "xsbo okii wapp qmta"  # Replace with Gmail App Password
+        # Email configuration (MAIL_* / SMTP_* settings in config.py)
+        if not config.MAIL_ADMIN_EMAIL or not config.MAIL_SENDER:
+            return jsonify({'error': 'Contact requests are not configured'}), 503
+        admin_email = config.MAIL_ADMIN_EMAIL
+        system_email = config.MAIL_SENDER  # System Gmail address for sending
         user_email = data['email']  # User's email for Reply-To header
 
         # Create email content
@@ -688,30 +908,140 @@ def contact_admin():
         msg.attach(html_part)
 
         # For development/testing purposes, we'll log the email content
-        print("=== EMAIL BEING SENT ===")
+        print("=== EMAIL QUEUED ===")
         print(f"To: {admin_email}")
         print(f"Subject: {subject}")
         print("=== EMAIL CONTENT LOGGED ===")
 
-        # Send email
-        try:
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                server.starttls()
-                server.login(system_email, sender_password)
-                text = msg.as_string()
-                server.sendmail(system_email, admin_email, text)
-            print("✅ Email sent successfully!")
-        except Exception as email_error:
-            print(f"❌ Failed to send email: {str(email_error)}")
-            # Still return success to user, but log the email error
-            pass
+        # Sent in the background; delivery errors are retried and logged by the queue
+        if not mail_queue.enqueue(system_email, [admin_email], msg.as_string()):
+            return jsonify({'error': 'Too many pending requests, please try again later'}), 503
 
-        return jsonify({'message': 'Request sent successfully'}), 200
+        return jsonify({'message': 'Request sent successfully'}), 202
 
     except Exception as e:
         print(f"Error in contact_admin: {str(e)}")
         return jsonify({'error': 'Failed to send request'}), 500
 
 
+# --- API endpoint: contact-admin mail queue counters ---
+@app.route('/api/contact-admin/queue', methods=['GET'])
+def get_mail_queue_stats():
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(mail_queue.stats())
+
+
+def apply_profiler_control(control):
+    """Start, stop or clear this process's profiler as a profiler request asks."""
+    if control['generation'] != profiler_control['generation']:
+        sampling_profiler.clear()
+    if control['running'] and not sampling_profiler.running:
+        sampling_profiler.start()
+    elif not control['running'] and sampling_profiler.running:
+        sampling_profiler.stop()
+    profiler_control.update(control)
+
+
+def request_profiler(running=None, clear=False):
+    """
+    Start, stop or clear the profiler here and, under serve.py, in every
+    other worker (which apply the request on their next sync).
+    """
+    control = dict(profiler_control)
+    if worker_exchange is not None:
+        control = worker_exchange.get_control('profiler') or control
+    if running is not None:
+        control['running'] = running
+    if clear:
+        control['generation'] += 1
+    if worker_exchange is not None:
+        worker_exchange.set_control('profiler', control)
+    apply_profiler_control(control)
+
+
+def profiler_exports():
+    """export() of this process's profiler and, under serve.py, of the other workers."""
+    exports = worker_exchange.collect('profiler') if worker_exchange is not None else {}
+    exports[os.getpid()] = sampling_profiler.export()
+    return exports
+
+
+# --- API endpoint: admin sampling profiler ---
+@app.route('/api/admin/profiler', methods=['GET'])
+def get_profiler_stacks():
+    """
+    Stacks sampled since the profiler started or was last cleared, summed
+    over every worker, in the collapsed-stack format (flamegraph.pl,
+    speedscope); ?reset=1 clears them after the dump.
+    """
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    stacks, stats = SamplingProfiler.merge(profiler_exports())
+    response = Response(sampling_profiler.collapsed(stacks), mimetype='text/plain')
+    response.headers['X-Profiler-Samples'] = str(stats['samples'])
+    response.headers['X-Profiler-Workers'] = str(len(stats['workers']))
+    if request.args.get('reset', '').lower() in ('1', 'true', 'yes'):
+        request_profiler(clear=True)
+    return response
+
+
+@app.route('/api/admin/profiler', methods=['DELETE'])
+def clear_profiler_stacks():
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    request_profiler(clear=True)
+    return jsonify(SamplingProfiler.merge(profiler_exports())[1])
+
+
+@app.route('/api/admin/profiler/stats', methods=['GET'])
+def get_profiler_stats():
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(SamplingProfiler.merge(profiler_exports())[1])
+
+
+@app.route('/api/admin/profiler/<action>', methods=['POST'])
+def control_profiler(action):
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    if action not in ('start', 'stop'):
+        return jsonify({'error': f'Unknown action: {action}; expected start or stop'}), 404
+    request_profiler(running=action == 'start')
+    # The other workers follow on their next sync (WORKER_SYNC_INTERVAL)
+    return jsonify(SamplingProfiler.merge(profiler_exports())[1])
+
+
+# State shared with the other workers under serve.py, which sets it and calls
+# sync_worker_state() periodically in every worker; None in a single process
+worker_exchange = None
+published_profiler_stats = {}
+
+
+def sync_worker_state():
+    """
+    Apply profiler requests made through other workers, and publish this
+    worker's metrics and profiler stacks for the other workers' responses.
+    """
+    control = worker_exchange.get_control('profiler')
+    if control is not None:
+        apply_profiler_control(control)
+    worker_exchange.publish('metrics', metrics.export())
+    profiler_export = sampling_profiler.export()
+    # The stacks only change while the profiler runs or is cleared
+    if profiler_export['stats'] != published_profiler_stats.get('stats'):
+        worker_exchange.publish('profiler', profiler_export)
+        published_profiler_stats['stats'] = profiler_export['stats']
+
+
+# --- API endpoint: metrics (Prometheus text format) ---
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Other workers' values are as of their last sync (WORKER_SYNC_INTERVAL)
+    processes = worker_exchange.collect('metrics') if worker_exchange is not None else None
+    return Response(metrics.render(processes), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
+    job_store.fail_orphaned('Interrupted by a server restart')
     app.run(host=config.HOST, port=config.PORT, debug=config.DEBUG)
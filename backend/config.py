@@ -14,6 +14,18 @@ class Config:
     PORT = int(os.getenv('FLASK_PORT', 5002))
     DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
 
+    # serve.py (production entry point): worker processes forked after the
+    # reference data is loaded, request threads per worker, and the listen backlog
+    SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', os.cpu_count() or 1))
+    SERVER_THREADS = int(os.getenv('SERVER_THREADS', 8))
+    SERVER_BACKLOG = int(os.getenv('SERVER_BACKLOG', 128))
+    # serve.py: directory (one per server) through which the workers share
+    # their metrics and profiler stacks, so /metrics and /api/admin/profiler
+    # report every worker, and how often (seconds) each worker syncs with it
+    WORKER_STATE_DIR = os.getenv('WORKER_STATE_DIR', os.path.join(
+        os.path.dirname(__file__), 'cache', 'workers'))
+    WORKER_SYNC_INTERVAL = float(os.getenv('WORKER_SYNC_INTERVAL', 1.0))
+
     # CORS configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
 
@@ -34,6 +46,83 @@ class Config:
         'source_product_matrix': 'Source_Product_Matrix.csv'
     }
 
+    # Binary snapshot of the parsed reference tables, rebuilt automatically
+    # when a source CSV changes; set to an empty string to always parse CSVs
+    REFERENCE_SNAPSHOT_PATH = os.getenv('REFERENCE_SNAPSHOT_PATH', os.path.join(
+        os.path.dirname(__file__), 'cache', 'reference_snapshot.pickle'))
+
+    # Reference tables load lazily on first use; set REFERENCE_PRELOAD to load
+    # them all at startup on a pool of REFERENCE_LOAD_WORKERS threads
+    REFERENCE_PRELOAD = os.getenv('REFERENCE_PRELOAD', 'False').lower() == 'true'
+    REFERENCE_LOAD_WORKERS = int(os.getenv('REFERENCE_LOAD_WORKERS', 4))
+
+    # Poll the reference CSVs every N seconds and hot reload on change (0 disables)
+    REFERENCE_WATCH_INTERVAL = float(os.getenv('REFERENCE_WATCH_INTERVAL', 0))
+
+    # /api/compute_ghg_emissions/batch: worker processes (0 computes in the
+    # request thread; the default leaves one CPU for the web process) and the
+    # maximum number of suppliers per request
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', min(4, (os.cpu_count() or 1) - 1)))
+    BATCH_MAX_SUPPLIERS = int(os.getenv('BATCH_MAX_SUPPLIERS', 200))
+
+    # /api/compute_ghg_emissions: response profile when ?profile= is not given
+    # ('full', 'summary' or 'compact-columnar')
+    COMPUTE_DEFAULT_PROFILE = os.getenv('COMPUTE_DEFAULT_PROFILE', 'full')
+
+    # /api/compute_ghg_emissions result cache: responses of identical requests
+    # (same payload, profile and reference version) are reused for
+    # RESULT_CACHE_TTL seconds; least recently used entries are evicted beyond
+    # RESULT_CACHE_MAX_ENTRIES or RESULT_CACHE_MAX_BYTES. 0 entries disables it
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', 256))
+    RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 600))
+
+    # ?cprofile=1 on /api/compute_ghg_emissions runs that request under
+    # cProfile and returns its COMPUTE_CPROFILE_TOP slowest functions
+    COMPUTE_CPROFILE_ENABLED = os.getenv('COMPUTE_CPROFILE_ENABLED', 'False').lower() == 'true'
+    COMPUTE_CPROFILE_TOP = int(os.getenv('COMPUTE_CPROFILE_TOP', 30))
+
+    # Sampling profiler aggregating the stacks of request threads every
+    # PROFILER_INTERVAL seconds, served by /api/admin/profiler; it can also be
+    # started and stopped there at runtime. Stacks beyond PROFILER_MAX_STACKS
+    # distinct ones are counted as dropped
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'False').lower() == 'true'
+    PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', 0.01))
+    PROFILER_MAX_STACKS = int(os.getenv('PROFILER_MAX_STACKS', 10000))
+
+    # Compression of computed JSON responses: bodies of at least
+    # COMPRESS_MIN_BYTES are sent as brotli (when installed) or gzip if the
+    # client accepts it
+    COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+
+    # /api/compute_ghg_emissions/stream: activity rows calculated and written per chunk
+    STREAM_CHUNK_ROWS = int(os.getenv('STREAM_CHUNK_ROWS', 1000))
+
+    # /api/uploads: maximum CSV/XLSX upload size, where the results files are
+    # written and how long (seconds) they stay available for download
+    UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', 200 * 1024 * 1024))
+    UPLOAD_RESULTS_DIR = os.getenv('UPLOAD_RESULTS_DIR', os.path.join(
+        os.path.dirname(__file__), 'cache', 'uploads'))
+    UPLOAD_RESULTS_TTL = int(os.getenv('UPLOAD_RESULTS_TTL', 24 * 60 * 60))
+
+    # /api/jobs: SQLite file holding queued jobs and their results, how many
+    # jobs compute at the same time, how long (seconds) finished jobs are kept,
+    # and after how long (seconds from creation) jobs that never finished are dropped
+    JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', os.path.join(
+        os.path.dirname(__file__), 'cache', 'jobs.sqlite3'))
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 60 * 60))
+    JOB_UNFINISHED_TTL = int(os.getenv('JOB_UNFINISHED_TTL', 24 * 60 * 60))
+
+    # Token required in the X-Admin-Token header by /api/admin endpoints and
+    # ?cprofile= (they answer 403 while it is unset)
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+    # Open the admin endpoints without a token (only honoured by
+    # DevelopmentConfig, for local debugging)
+    ADMIN_ALLOW_UNAUTHENTICATED = False
+
     # Lookup columns configuration
     LOOKUP_COLUMNS = [
         'Region',
@@ -46,6 +135,57 @@ class Config:
         'Unit of Fuel Amount'
     ]
 
+    # /api/lookup/<name> names of the lookup columns
+    LOOKUP_NAMES = {
+        'region': 'Region',
+        'mode_of_transport': 'Mode of Transport',
+        'type_of_activity_data': 'Type of Activity Data',
+        'scope': 'Scope',
+        'units': 'Units ',
+        'ipcc_gwp_version': 'IPCC GWP Version',
+        'activity_data_columns': 'Activity Data Columns',
+        'unit_of_fuel_amount': 'Unit of Fuel Amount',
+    }
+
+    # /api/contact-admin mail: queued by the request and sent by a background
+    # thread over a reused SMTP connection, in batches of MAIL_BATCH_SIZE;
+    # temporary failures are retried MAIL_MAX_RETRIES times with a backoff
+    # starting at MAIL_RETRY_BACKOFF seconds and doubling up to MAIL_RETRY_MAX_BACKOFF.
+    # Addresses and the password only come from the environment; the endpoint
+    # answers 503 until MAIL_ADMIN_EMAIL and MAIL_SENDER are set
+    MAIL_ADMIN_EMAIL = os.getenv('MAIL_ADMIN_EMAIL', '')
+    MAIL_SENDER = os.getenv('MAIL_SENDER', '')
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD', '')
+    SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+    SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() in ('1', 'true', 'yes')
+    SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', 10))
+    SMTP_IDLE_TIMEOUT = float(os.getenv('SMTP_IDLE_TIMEOUT', 60))
+    MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 20))
+    MAIL_MAX_RETRIES = int(os.getenv('MAIL_MAX_RETRIES', 5))
+    MAIL_RETRY_BACKOFF = float(os.getenv('MAIL_RETRY_BACKOFF', 2))
+    MAIL_RETRY_MAX_BACKOFF = float(os.getenv('MAIL_RETRY_MAX_BACKOFF', 300))
+    MAIL_QUEUE_MAX = int(os.getenv('MAIL_QUEUE_MAX', 1000))
+
+    # Cache-Control max-age (seconds) of the pre-serialized dropdown responses;
+    # clients revalidate with If-None-Match after it expires
+    LOOKUP_CACHE_MAX_AGE = int(os.getenv('LOOKUP_CACHE_MAX_AGE', 300))
+
+    # Reference tables that /api/facets can query (registry names)
+    FACET_TABLES = [
+        'ef_freight_co2',
+        'ef_freight_ch4_no2',
+        'ef_fuel_use_co2',
+        'ef_fuel_use_ch4_n2o',
+        'ef_road',
+        'ef_public',
+        'source_product_matrix',
+    ]
+
+    # /api/suppliers?q=: default and maximum page size of the supplier search
+    SUPPLIER_SEARCH_LIMIT = int(os.getenv('SUPPLIER_SEARCH_LIMIT', 20))
+    SUPPLIER_SEARCH_MAX_LIMIT = int(os.getenv('SUPPLIER_SEARCH_MAX_LIMIT', 200))
+
     # API configuration
     API_PREFIX = '/api'
 
@@ -74,6 +214,7 @@ class DevelopmentConfig(Config):
     DEBUG = True
     HOST = '127.0.0.1'
     PORT = 5002
+    ADMIN_ALLOW_UNAUTHENTICATED = os.getenv('ADMIN_ALLOW_UNAUTHENTICATED', 'False').lower() == 'true'
 
 
 class ProductionConfig(Config):
@@ -81,6 +222,7 @@ class ProductionConfig(Config):
     DEBUG = False
     HOST = '0.0.0.0'
     PORT = int(os.getenv('PORT', 5000))
+    REFERENCE_PRELOAD = os.getenv('REFERENCE_PRELOAD', 'True').lower() == 'true'
 
 
 class TestingConfig(Config):
@@ -100,10 +242,10 @@ config_map: Dict[str, type] = {
 }
 
 
-def get_config(config_name: str = 'development') -> Config:
-    """Get configuration class based on environment."""
+def get_config(config_name: str = None) -> Config:
+    """Get configuration class based on environment (FLASK_ENV when no name is given)."""
     if config_name is None:
-        config_name = 'development'
+        config_name = os.getenv('FLASK_ENV', 'development')
 
     config_class = config_map.get(config_name, config_map['default'])
     return config_class()
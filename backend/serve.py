@@ -0,0 +1,220 @@
+"""
+Production entry point: prefork WSGI server with copy-on-write reference data.
+
+The master process imports the app, loads and freezes every reference table,
+opens the listening socket and then forks SERVER_WORKERS worker processes.
+Workers inherit the loaded tables as shared copy-on-write memory instead of
+each parsing its own copy, and serve requests on SERVER_THREADS threads
+each, with BATCH_WORKERS batch compute processes forked from each worker
+before it starts any thread. The master only supervises: it restarts
+workers that die, failing the jobs (/api/jobs) they were computing, and
+stops them all on SIGTERM/SIGINT.
+
+    FLASK_ENV=production python serve.py
+
+Every worker publishes its metrics and profiler stacks to WORKER_STATE_DIR
+each WORKER_SYNC_INTERVAL, so /metrics and /api/admin/profiler report all
+workers whichever one answers; profiler start, stop and clear requests are
+passed to every worker the same way.
+
+Reference reloads (admin endpoint or REFERENCE_WATCH_INTERVAL) happen per
+worker; a reloaded worker holds its own copy of the new tables, so restart
+the server to share a new reference version again.
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer
+
+logger = logging.getLogger('serve')
+
+STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug WSGI server handling requests on a fixed pool of threads.
+
+    A connection is only accepted when a thread is free, so connections
+    waiting in the shared listen backlog go to the worker with spare capacity.
+    """
+
+    def __init__(self, host, port, app, threads, fd):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='request')
+        self.slots = threading.BoundedSemaphore(threads)
+        super().__init__(host, port, app, fd=fd)
+        # Another worker may accept a connection first; a non-blocking accept just returns then
+        self.socket.setblocking(False)
+
+    def process_request(self, request, client_address):
+        self.slots.acquire()
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+
+def load_shared_state(backend_app):
+    """
+    Load every reference table in the master and freeze it for sharing.
+
+    gc.freeze() moves every object allocated so far out of the collector's
+    generations, so garbage collections in the workers never write to the
+    pages holding the shared tables (which would copy them per worker).
+    """
+    reference_data = backend_app.reference_data
+    # Threads do not survive fork; the watcher and profiler are restarted in each worker
+    reference_data.stop_watcher()
+    backend_app.sampling_profiler.stop()
+    start = time.perf_counter()
+    reference_data.current.preload()
+    gc.collect()
+    gc.freeze()
+    logger.info("Reference data %s loaded in %.0f ms, %d objects frozen",
+                reference_data.current.version, (time.perf_counter() - start) * 1000, gc.get_freeze_count())
+
+
+def run_worker(backend_app, listener, threads):
+    """Serve requests on the inherited listening socket until SIGTERM."""
+    config = backend_app.config
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Batch compute processes are forked from this worker before it starts
+    # any thread, and share its copy-on-write tables
+    backend_app.batch_compute_pool.start(backend_app.reference_data.current)
+    # Metrics start from zero in every worker, which publishes them for the
+    # others; the first sync also starts the profiler if it was requested
+    backend_app.metrics.reset()
+    backend_app.sync_worker_state()
+    backend_app.worker_exchange.start_sync(backend_app.sync_worker_state, config.WORKER_SYNC_INTERVAL)
+    if config.REFERENCE_WATCH_INTERVAL > 0:
+        backend_app.reference_data.start_watcher(config.REFERENCE_WATCH_INTERVAL)
+
+    host, port = listener.getsockname()[:2]
+    server = PooledWSGIServer(host, port, backend_app.app, threads, listener.fileno())
+    # shutdown() waits for serve_forever() to return, so it must run on another thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    # Blocked by the master around fork(); a SIGTERM sent meanwhile is delivered now
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+    try:
+        server.serve_forever()
+    finally:
+        # Finish the requests in progress
+        server.executor.shutdown(wait=True)
+        server.server_close()
+        backend_app.batch_compute_pool.shutdown()
+
+
+class PreforkServer:
+    """Master process: forks the workers and keeps SERVER_WORKERS of them running."""
+
+    # Minimum seconds between restarts of crashed workers
+    RESTART_DELAY = 1.0
+
+    def __init__(self, backend_app, host, port, workers, threads, backlog=128):
+        self.backend_app = backend_app
+        self.workers = workers
+        self.threads = threads
+        self.listener = socket.create_server((host, port), backlog=backlog)
+        self.listener.set_inheritable(True)
+        self.pids = set()
+        self.stopping = False
+
+    def spawn(self):
+        # Until run_worker() installs its own handlers the child would run the
+        # master's stop() on SIGTERM, so the signals stay blocked until then
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        try:
+            pid = os.fork()
+            if pid == 0:
+                exit_code = 0
+                try:
+                    run_worker(self.backend_app, self.listener, self.threads)
+                except BaseException:
+                    logger.exception("Worker %d failed", os.getpid())
+                    exit_code = 1
+                finally:
+                    logging.shutdown()
+                    os._exit(exit_code)
+        finally:
+            # Only reached in the master; workers leave through os._exit()
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+        self.pids.add(pid)
+        return pid
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        """Fork the workers and supervise them until SIGTERM/SIGINT."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        host, port = self.listener.getsockname()[:2]
+        logger.info("Serving on http://%s:%d with %d workers x %d threads (master %d)",
+                    host, port, self.workers, self.threads, os.getpid())
+
+        last_restart = 0.0
+        while self.pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            self.pids.discard(pid)
+            self.backend_app.worker_exchange.remove_worker(pid)
+            self.backend_app.job_store.fail_orphaned('Interrupted: the worker computing it exited')
+            if self.stopping:
+                continue
+            logger.warning("Worker %d exited with status %d; restarting", pid, os.waitstatus_to_exitcode(status))
+            time.sleep(max(0.0, last_restart + self.RESTART_DELAY - time.monotonic()))
+            last_restart = time.monotonic()
+            self.spawn()
+        self.listener.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(levelname)s %(message)s')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from dotenv import load_dotenv
+
+    # The app configures itself from FLASK_ENV: production unless .env or the
+    # environment say otherwise. The listen address and process layout below
+    # come from the same configuration object
+    load_dotenv()
+    os.environ.setdefault('FLASK_ENV', 'production')
+    import app as backend_app
+    from Services.WorkerExchange import WorkerExchange
+
+    config = backend_app.config
+    backend_app.worker_exchange = WorkerExchange(config.WORKER_STATE_DIR)
+    backend_app.worker_exchange.clear()
+    backend_app.worker_exchange.set_control('profiler', backend_app.profiler_control)
+    backend_app.job_store.fail_orphaned('Interrupted by a server restart')
+    load_shared_state(backend_app)
+    PreforkServer(backend_app, config.HOST, config.PORT, config.SERVER_WORKERS, config.SERVER_THREADS,
+                  config.SERVER_BACKLOG).run()
+
+
+if __name__ == '__main__':
+    main()
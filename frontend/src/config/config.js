@@ -23,6 +23,7 @@ const config = {
         units: "/api/lookup/units",
 
         // Data endpoints
+        bootstrap: "/api/bootstrap",
         suppliers: "/api/suppliers",
         fuelTypes: "/api/fuel_types",
         vehicleAndSize: "/api/vehicle_and_size",
@@ -69,6 +70,7 @@ const config = {
         modeOfTransport: "/api/lookup/mode_of_transport",
         typeOfActivityData: "/api/lookup/type_of_activity_data",
         units: "/api/lookup/units",
+        bootstrap: "/api/bootstrap",
         suppliers: "/api/suppliers",
         fuelTypes: "/api/fuel_types",
         vehicleAndSize: "/api/vehicle_and_size",
@@ -110,6 +112,7 @@ const config = {
         modeOfTransport: "/api/lookup/mode_of_transport",
         typeOfActivityData: "/api/lookup/type_of_activity_data",
         units: "/api/lookup/units",
+        bootstrap: "/api/bootstrap",
         suppliers: "/api/suppliers",
         fuelTypes: "/api/fuel_types",
         vehicleAndSize: "/api/vehicle_and_size",
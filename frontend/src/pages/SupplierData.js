@@ -819,18 +819,35 @@ function SupplierData() {
     }
   }, []); // Only run on mount
 
-  // Fetch suppliers from backend API
+  // Fetch suppliers and every dropdown catalog (region, mode_of_transport, scope,
+  // type_of_activity_data, units, fuel types, unit of fuel amount) in one request
   useEffect(() => {
-    const fetchSuppliers = async () => {
+    const catalogSetters = [
+      [setLoading, setError, "Failed to load suppliers. Please try again later."],
+      [setRegionLoading, setRegionError, "Failed to load regions."],
+      [setMotLoading, setMotError, "Failed to load modes of transport."],
+      [setScopeLoading, setScopeError, "Failed to load scopes."],
+      [setActivityTypeLoading, setActivityTypeError, "Failed to load activity types."],
+      [setUnitsLoading, setUnitsError, "Failed to load units."],
+      [setFuelLoading, setFuelError, "Failed to load fuel types."],
+      [
+        setUnitOfFuelAmountLoading,
+        setUnitOfFuelAmountError,
+        "Failed to load unit of fuel amount options.",
+      ],
+    ];
+
+    const fetchBootstrap = async () => {
       try {
-        setLoading(true);
-        const response = await fetch(getApiUrl("suppliers"));
+        catalogSetters.forEach(([setCatalogLoading]) => setCatalogLoading(true));
+        const response = await fetch(getApiUrl("bootstrap"));
 
         if (!response.ok) {
           throw new Error(`HTTP error! Status: ${response.status}`);
         }
 
         const data = await response.json();
+        const lookups = data.lookups || {};
         setSuppliers(data.suppliers || []);
 
         // Set default supplier if available and no supplier is already selected
@@ -841,124 +858,23 @@ function SupplierData() {
           }));
         }
 
-        setLoading(false);
-      } catch (err) {
-        console.error("Error fetching suppliers:", err);
-        setError("Failed to load suppliers. Please try again later.");
-        setLoading(false);
-      }
-    };
-
-    fetchSuppliers();
-  }, []);
-
-  // Fetch region, mode_of_transport, scope, and type_of_activity_data options for dropdowns
-  useEffect(() => {
-    const fetchRegions = async () => {
-      try {
-        setRegionLoading(true);
-        const response = await fetch(getApiUrl("region"));
-        if (!response.ok)
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        const data = await response.json();
-        setRegionOptions(data.values || []);
-        setRegionLoading(false);
-      } catch (err) {
-        setRegionError("Failed to load regions.");
-        setRegionLoading(false);
-      }
-    };
-    const fetchMot = async () => {
-      try {
-        setMotLoading(true);
-        const response = await fetch(getApiUrl("modeOfTransport"));
-        if (!response.ok)
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        const data = await response.json();
-        setMotOptions(data.values || []);
-        setMotLoading(false);
-      } catch (err) {
-        setMotError("Failed to load modes of transport.");
-        setMotLoading(false);
-      }
-    };
-    const fetchScope = async () => {
-      try {
-        setScopeLoading(true);
-        const response = await fetch(getApiUrl("scope"));
-        if (!response.ok)
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        const data = await response.json();
-        setScopeOptions(data.values || []);
-        setScopeLoading(false);
-      } catch (err) {
-        setScopeError("Failed to load scopes.");
-        setScopeLoading(false);
-      }
-    };
-    const fetchActivityType = async () => {
-      try {
-        setActivityTypeLoading(true);
-        const response = await fetch(getApiUrl("typeOfActivityData"));
-        if (!response.ok)
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        const data = await response.json();
-        setActivityTypeOptions(data.values || []);
-        setActivityTypeLoading(false);
-      } catch (err) {
-        setActivityTypeError("Failed to load activity types.");
-        setActivityTypeLoading(false);
-      }
-    };
-    const fetchUnits = async () => {
-      try {
-        setUnitsLoading(true);
-        const response = await fetch(getApiUrl("units"));
-        if (!response.ok)
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        const data = await response.json();
-        setUnitsOptions(data.values || []);
-        setUnitsLoading(false);
-      } catch (err) {
-        setUnitsError("Failed to load units.");
-        setUnitsLoading(false);
-      }
-    };
-    const fetchFuelTypes = async () => {
-      try {
-        setFuelLoading(true);
-        const response = await fetch(getApiUrl("fuelTypes"));
-        if (!response.ok)
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        const data = await response.json();
+        setRegionOptions(lookups.region || []);
+        setMotOptions(lookups.mode_of_transport || []);
+        setScopeOptions(lookups.scope || []);
+        setActivityTypeOptions(lookups.type_of_activity_data || []);
+        setUnitsOptions(lookups.units || []);
         setFuelOptions(data.fuel_types || []);
-        setFuelLoading(false);
-      } catch (err) {
-        setFuelError("Failed to load fuel types.");
-        setFuelLoading(false);
-      }
-    };
-    const fetchUnitOfFuelAmount = async () => {
-      try {
-        setUnitOfFuelAmountLoading(true);
-        const response = await fetch(getApiUrl("unitOfFuelAmount"));
-        if (!response.ok)
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        const data = await response.json();
-        setUnitOfFuelAmountOptions(data.values || []);
-        setUnitOfFuelAmountLoading(false);
+        setUnitOfFuelAmountOptions(lookups.unit_of_fuel_amount || []);
       } catch (err) {
-        setUnitOfFuelAmountError("Failed to load unit of fuel amount options.");
-        setUnitOfFuelAmountLoading(false);
+        console.error("Error fetching dropdown data:", err);
+        catalogSetters.forEach(([, setCatalogError, message]) =>
+          setCatalogError(message)
+        );
       }
+      catalogSetters.forEach(([setCatalogLoading]) => setCatalogLoading(false));
     };
-    fetchRegions();
-    fetchMot();
-    fetchScope();
-    fetchActivityType();
-    fetchUnits();
-    fetchFuelTypes();
-    fetchUnitOfFuelAmount();
+
+    fetchBootstrap();
   }, []);
 
   // Effect: fetch vehicle type options when region, modeOfTransport, or typeOfActivityData changes for any row